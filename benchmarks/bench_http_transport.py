@@ -0,0 +1,133 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the HTTP transport backends under concurrent load.
+
+Serves a local HTTPS API with hypercorn (HTTP/1.1 and HTTP/2 via ALPN) and
+compares the connection count and latency of the aiohttp backend and the
+httpx backend over HTTP/1.1 and HTTP/2. Needs hypercorn, h2 and openssl.
+
+Run with: PYTHONPATH=src python benchmarks/bench_http_transport.py [requests] [concurrency]
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+from cwaf_external_mcp.httpclient import aiohttp_client
+
+UPSTREAM_DELAY = 0.02
+BODY = b'{"data":[' + b",".join(b'{"id":%d}' % i for i in range(200)) + b'],"meta":{}}'
+PEERS = set()
+
+
+async def app(scope, receive, send):
+    """ASGI upstream API recording the client connections."""
+    if scope["type"] != "http":
+        return
+    PEERS.add(tuple(scope["client"]))
+    await asyncio.sleep(UPSTREAM_DELAY)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def make_certificate(directory: str) -> tuple[str, str]:
+    """Create a self-signed certificate for localhost."""
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=localhost", "-keyout", key, "-out", cert],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+async def run(label: str, url: str, requests: int, concurrency: int) -> None:
+    """Send the requests through the configured backend and print the results."""
+    PEERS.clear()
+    aiohttp_client.SESSION = None
+    client = aiohttp_client.get_async_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def fetch():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url)
+            await response.read()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    latencies.sort()
+    print(
+        f"  {label:<16} connections={len(PEERS):<4}"
+        f" p50={statistics.median(latencies) * 1000:7.1f} ms"
+        f" p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms"
+        f" throughput={requests / elapsed:7.0f} req/s"
+    )
+
+
+async def main():
+    """Compare the backends against the local server."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as directory:
+        config = Config()
+        config.bind = ["127.0.0.1:8443"]
+        config.certfile, config.keyfile = make_certificate(directory)
+        config.loglevel = "WARNING"
+        shutdown = asyncio.Event()
+        server = asyncio.ensure_future(
+            serve(app, config, shutdown_trigger=shutdown.wait)
+        )
+        await asyncio.sleep(0.5)
+
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        os.environ["DISABLE_SSL_VERIFICATION"] = "true"
+        url = "https://localhost:8443/sites"
+        print(f"{requests} requests, {concurrency} concurrent, {UPSTREAM_DELAY}s delay")
+        backends = [
+            ("aiohttp", "aiohttp", "false"),
+            ("httpx HTTP/1.1", "httpx", "false"),
+            ("httpx HTTP/2", "httpx", "true"),
+        ]
+        for label, backend, http2 in backends:
+            os.environ["HTTP_CLIENT_BACKEND"] = backend
+            os.environ["HTTP2_ENABLED"] = http2
+            await run(label, url, requests, concurrency)
+
+        shutdown.set()
+        await server
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro-benchmark of the JSON codecs on /v3/policies?extended=true payloads.
+
+Run with: PYTHONPATH=src python benchmarks/bench_json_codec.py [policies] [ips]
+"""
+
+import random
+import sys
+import timeit
+
+import pydantic_core
+
+from cwaf_external_mcp.mcp_tools.cwaf_tools import get_policy_from_response
+from cwaf_external_mcp.model.cwaf_response import CWAFResponse, Meta
+from cwaf_external_mcp.utilities.json_codec import JsonCodec, OrjsonCodec
+
+
+def build_policies_payload(policies: int, ips: int) -> dict:
+    """Build an extended policies response with large IP and geo settings."""
+    rnd = random.Random(0)
+    data = []
+    for policy_id in range(policies):
+        settings = [
+            {
+                "id": policy_id * 10 + setting,
+                "policyId": policy_id,
+                "settingsAction": "BLOCK",
+                "policySettingType": "IP",
+                "data": {
+                    "ips": [
+                        f"{rnd.randint(1, 223)}.{rnd.randint(0, 255)}."
+                        f"{rnd.randint(0, 255)}.{rnd.randint(0, 255)}"
+                        for _ in range(ips)
+                    ],
+                    "geo": {"countries": ["FR", "US", "IL"], "continents": ["EU"]},
+                },
+                "policyDataExceptions": [
+                    {
+                        "id": policy_id * 100 + setting,
+                        "policySettingsId": policy_id * 10 + setting,
+                        "lastModifiedBy": 42,
+                        "lastModified": "2026-01-01T00:00:00Z",
+                        "comment": "allow the monitoring probes",
+                        "data": [
+                            {"exceptionType": "IP", "values": ["10.0.0.1", "10.0.0.2"]}
+                        ],
+                    }
+                ],
+            }
+            for setting in range(3)
+        ]
+        data.append(
+            {
+                "id": policy_id,
+                "name": f"policy-{policy_id}",
+                "description": "Blocks the known bad actors",
+                "enabled": True,
+                "accountId": 1234,
+                "policyType": "ACL",
+                "lastModified": "2026-01-01T00:00:00Z",
+                "lastModifiedBy": 42,
+                "isMarkedAsDefault": False,
+                "policySettings": settings,
+                "defaultPolicyConfig": [],
+                "assetsIds": [rnd.randint(1, 10**6) for _ in range(20)],
+                "subaccountIds": [],
+            }
+        )
+    return {"data": data, "meta": {"size": policies, "page": 0}}
+
+
+def bench(label: str, func, number: int) -> float:
+    """Time a function and print the mean duration in milliseconds."""
+    mean = min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+    print(f"  {label:<40} {mean:8.2f} ms")
+    return mean
+
+
+def main():
+    """Compare the codecs on upstream decode and tool result encode."""
+    policies = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    ips = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    payload = build_policies_payload(policies, ips)
+    raw = JsonCodec().dumps(payload).encode()
+    codecs = [JsonCodec()]
+    try:
+        codecs.append(OrjsonCodec())
+    except ImportError:
+        print("orjson is not installed, only the stdlib codec is measured")
+    number = 10
+    print(f"payload: {policies} policies, {ips} IPs per setting, {len(raw)} bytes")
+
+    print("upstream decode (loads):")
+    results = {c.name: bench(c.name, lambda c=c: c.loads(raw), number) for c in codecs}
+
+    response = CWAFResponse(
+        data=[get_policy_from_response(p) for p in payload["data"]],
+        meta=Meta(size=policies, page=0, totalElements=None, totalPages=None),
+    )
+    dumped = response.model_dump()
+    print("tool result encode (model -> JSON text):")
+    bench(
+        "pydantic_core.to_json",
+        lambda: pydantic_core.to_json(response, by_alias=True),
+        number,
+    )
+    for c in codecs:
+        bench(
+            f"to_jsonable_python + {c.name}",
+            lambda c=c: c.dumps(
+                pydantic_core.to_jsonable_python(response, by_alias=True)
+            ),
+            number,
+        )
+    print("tool result encode (dict -> JSON text):")
+    for c in codecs:
+        bench(c.name, lambda c=c: c.dumps(dumped), number)
+
+    if "orjson" in results:
+        print(f"decode speed-up: {results['stdlib'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
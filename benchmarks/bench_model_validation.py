@@ -0,0 +1,358 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Items per second mapping 10k-row pages of sites, policies and rules into DTOs.
+
+Compares the hand-written per-row mappers the tools used to build the DTOs with,
+per-item model_validate, one TypeAdapter(list[Model]) call per page, and
+model_construct on pre-renamed keys (skipping validation for a trusted upstream).
+
+Run with: PYTHONPATH=src python benchmarks/bench_model_validation.py [rows]
+"""
+
+import sys
+import timeit
+from datetime import datetime, timezone
+
+from cwaf_external_mcp.mcp_tools.cwaf_tools import (
+    get_policy_from_response,
+    get_rules_from_response,
+    get_site_from_response,
+)
+from cwaf_external_mcp.model.policy_dto import (
+    ExceptionData,
+    GeoDto,
+    Policy,
+    PolicyConfig,
+    PolicyDataException,
+    PolicySettingData,
+    PolicySettings,
+    UrlsDto,
+)
+from cwaf_external_mcp.model.rule_dto import Rule
+from cwaf_external_mcp.model.site import Site
+from cwaf_external_mcp.model.timestamps import format_epoch_millis
+
+RULE_KEYS = {
+    "rule_id": "rule_id",
+    "name": "name",
+    "action": "action",
+    "enabled": "enabled",
+    "filter": "filter",
+    "dcId": "dc_id",
+    "rateInterval": "rate_interval",
+    "rateContext": "rate_context",
+    "to": "to_url",
+    "from": "from_url",
+    "responseCode": "response_code",
+}
+
+
+def build_sites(rows: int) -> list[dict]:
+    """Site items as returned by /sites-mgmt/v3/sites/extended."""
+    return [
+        {
+            "id": i,
+            "name": f"site{i}.example.com",
+            "accountId": 1234,
+            "type": "CLOUD_WAF",
+            "refId": f"ref-{i}",
+            "active": True,
+            "cname": f"{i}.x.impervadns.net",
+            "attributes": {"env": "prod"},
+            "creationTime": 1700000000000 + i,
+            "siteStatus": "fully_configured",
+            "deploymentKeys": ["key"],
+        }
+        for i in range(rows)
+    ]
+
+
+def build_policies(rows: int) -> list[dict]:
+    """Policy items as returned by /policies/v2/policies?extended=true."""
+    return [
+        {
+            "id": i,
+            "policyType": "ACL",
+            "name": f"policy {i}",
+            "accountId": 1234,
+            "enabled": True,
+            "description": "Block countries",
+            "lastModified": "2025-01-01T00:00:00Z",
+            "lastModifiedBy": 42,
+            "policySettings": [
+                {
+                    "id": i * 10 + j,
+                    "policyId": i,
+                    "settingsAction": "BLOCK",
+                    "policySettingType": setting_type,
+                    "data": data,
+                    "policyDataExceptions": [
+                        {
+                            "id": i,
+                            "policySettingsId": i * 10 + j,
+                            "lastModifiedBy": 42,
+                            "lastModified": "2025-01-01T00:00:00Z",
+                            "data": [{"exceptionType": "IP", "values": ["1.1.1.1"]}],
+                            "exceptionAssetMapping": [
+                                {
+                                    "id": i,
+                                    "policyDataExceptionsId": i,
+                                    "assetId": 7,
+                                    "assetType": "WEBSITE",
+                                }
+                            ],
+                        }
+                    ],
+                }
+                for j, (setting_type, data) in enumerate(
+                    (
+                        ("GEO", {"geo": {"countries": ["FR", "DE"]}}),
+                        ("IP", {"ips": ["10.0.0.1", "10.0.0.2"]}),
+                        ("URL", {"urls": [{"url": "/admin", "UrlPattern": "PREFIX"}]}),
+                    )
+                )
+            ],
+            "defaultPolicyConfig": [
+                {"id": i, "policyId": i, "accountId": 1234, "assetType": "WEBSITE"}
+            ],
+            "assetsIds": [7, 8],
+            "subaccountIds": [],
+        }
+        for i in range(rows)
+    ]
+
+
+def build_rules(rows: int) -> list[dict]:
+    """Rule items as returned by /api/prov/v3/rules."""
+    return [
+        {
+            "site_id": i % 50,
+            "account_id": 1234,
+            "rule": {
+                "rule_id": i,
+                "name": f"rule {i}",
+                "action": "RULE_ACTION_REDIRECT",
+                "enabled": True,
+                "filter": "URL == '/old'",
+                "from": "/old",
+                "to": "/new",
+                "responseCode": 302,
+            },
+        }
+        for i in range(rows)
+    ]
+
+
+def legacy_site(r: dict) -> Site:
+    """The hand-written Site mapper replaced by the alias-based model."""
+    return Site(
+        id=r["id"],
+        name=r["name"],
+        isDefaultSite=r["isDefaultSite"] if "isDefaultSite" in r else None,
+        accountId=r["accountId"],
+        refId=r["refId"] if "refId" in r else None,
+        cloud=r["cloud"] if "cloud" in r else None,
+        active=r["active"],
+        cnames=r["cname"] if "cname" in r else None,
+        siteStatus=r["siteStatus"] if "siteStatus" in r else None,
+        creationTime=(
+            datetime.fromtimestamp(r["creationTime"] / 1000, tz=timezone.utc)
+        ).strftime("%Y-%m-%d %H:%M:%S"),
+        attributes=r["attributes"] if "attributes" in r else None,
+        type=r["type"],
+        deploymentKeys=r["deploymentKeys"] if "deploymentKeys" in r else None,
+    )
+
+
+def legacy_policy(r: dict) -> Policy:
+    """The hand-written Policy mapper replaced by the alias-based model."""
+    return Policy(
+        id=r["id"],
+        policyType=r["policyType"],
+        name=r["name"],
+        accountId=r["accountId"],
+        enabled=r["enabled"],
+        description=r["description"],
+        lastModified=r["lastModified"],
+        lastModifiedBy=r["lastModifiedBy"],
+        policySettings=(
+            [
+                PolicySettings(
+                    id=s["id"],
+                    policyId=s["policyId"],
+                    settingsAction=s["settingsAction"],
+                    policySettingType=s["policySettingType"],
+                    data=s["data"] if "data" in s else None,
+                    policyDataExceptions=(
+                        s["policyDataExceptions"]
+                        if "policyDataExceptions" in s
+                        else None
+                    ),
+                )
+                for s in r["policySettings"]
+            ]
+            if r.get("policySettings") is not None
+            else None
+        ),
+        defaultPolicyConfig=(
+            [
+                PolicyConfig(
+                    id=c["id"],
+                    policyId=c["policyId"],
+                    accountId=c["accountId"],
+                    assetType=c["assetType"],
+                )
+                for c in r["defaultPolicyConfig"]
+            ]
+            if r.get("defaultPolicyConfig") is not None
+            else None
+        ),
+        assetsIds=r["assetsIds"],
+        subaccountIds=r["subaccountIds"],
+    )
+
+
+def legacy_rule(r: dict) -> Rule:
+    """The hand-written Rule mapper replaced by the alias-based model."""
+    rule = r["rule"]
+    return Rule(
+        rule_id=rule["rule_id"],
+        site_id=r["site_id"],
+        account_id=r["account_id"],
+        name=rule["name"],
+        action=rule["action"],
+        enabled=rule["enabled"],
+        filter=rule["filter"] if "filter" in rule else None,
+        dc_id=rule["dcId"] if "dcId" in rule else None,
+        overrideWafRule=rule["overrideWafRule"] if "overrideWafRule" in rule else None,
+        overrideWafAction=(
+            rule["overrideWafAction"] if "overrideWafAction" in rule else None
+        ),
+        rate_interval=rule["rateInterval"] if "rateInterval" in rule else None,
+        rate_context=rule["rateContext"] if "rateContext" in rule else None,
+        to=rule["to"] if "to" in rule else None,
+        response_code=rule["responseCode"] if "responseCode" in rule else None,
+        port_forwarding_value=(
+            rule["portForwardingValue"] if "portForwardingValue" in rule else None
+        ),
+        port_forwarding_context=(
+            rule["portForwardingContext"] if "portForwardingContext" in rule else None
+        ),
+        multiple_deletions=(
+            rule["multipleDeletions"] if "multipleDeletions" in rule else None
+        ),
+        rewrite_existing=rule["rewriteExisting"] if "rewriteExisting" in rule else None,
+        add_missing=rule["addMissing"] if "addMissing" in rule else None,
+        rewrite_name=rule["rewriteName"] if "rewriteName" in rule else None,
+        **{"from": rule["from"] if "from" in rule else None},
+    )
+
+
+def trusted_site(r: dict) -> Site:
+    """Build a Site without validation, renaming the keys by hand."""
+    values = dict(r)
+    values["cnames"] = values.pop("cname", None)
+    values["creationTime"] = format_epoch_millis(values["creationTime"])
+    return Site.model_construct(**values)
+
+
+def trusted_policy(r: dict) -> Policy:
+    """Build a Policy and its nested DTOs without validation."""
+    settings = []
+    for setting in r["policySettings"]:
+        data = setting["data"]
+        exceptions = [
+            PolicyDataException.model_construct(
+                **{
+                    **exception,
+                    "data": [
+                        ExceptionData.model_construct(**d) for d in exception["data"]
+                    ],
+                }
+            )
+            for exception in setting["policyDataExceptions"]
+        ]
+        settings.append(
+            PolicySettings.model_construct(
+                **{
+                    **setting,
+                    "data": PolicySettingData.model_construct(
+                        geo=(
+                            GeoDto.model_construct(**data["geo"])
+                            if "geo" in data
+                            else None
+                        ),
+                        ips=data.get("ips"),
+                        urls=[
+                            UrlsDto.model_construct(**u) for u in data.get("urls", ())
+                        ],
+                    ),
+                    "policyDataExceptions": exceptions,
+                }
+            )
+        )
+    return Policy.model_construct(
+        **{
+            **r,
+            "policySettings": settings,
+            "defaultPolicyConfig": [
+                PolicyConfig.model_construct(**c) for c in r["defaultPolicyConfig"]
+            ],
+        }
+    )
+
+
+def trusted_rule(r: dict) -> Rule:
+    """Build a Rule without validation, renaming the keys by hand."""
+    values = {RULE_KEYS[key]: value for key, value in r["rule"].items()}
+    return Rule.model_construct(
+        site_id=r["site_id"], account_id=r["account_id"], **values
+    )
+
+
+def report(name: str, rows: list[dict], func) -> None:
+    """Print the best items per second out of 10 runs."""
+    best = min(timeit.repeat(lambda: func(rows), number=1, repeat=10))
+    print(f"  {name:<24} {len(rows) / best:>12,.0f} items/s")
+
+
+def main(rows: int) -> None:
+    for label, items, legacy, mapper, trusted in (
+        ("sites", build_sites(rows), legacy_site, get_site_from_response, trusted_site),
+        (
+            "policies",
+            build_policies(rows),
+            legacy_policy,
+            get_policy_from_response,
+            trusted_policy,
+        ),
+        (
+            "rules",
+            build_rules(rows),
+            legacy_rule,
+            get_rules_from_response,
+            trusted_rule,
+        ),
+    ):
+        assert mapper.map_page(items[:100]) == [legacy(r) for r in items[:100]]
+        print(f"{rows} {label}")
+        report("hand-written mapper", items, lambda page: [legacy(r) for r in page])
+        report("model_validate per item", items, lambda page: [mapper(r) for r in page])
+        report("TypeAdapter per page", items, mapper.map_page)
+        report("model_construct", items, lambda page: [trusted(r) for r in page])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
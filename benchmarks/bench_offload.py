@@ -0,0 +1,90 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Event loop lag while decoding large /v3/policies pages inline or offloaded.
+
+Run with: PYTHONPATH=src python benchmarks/bench_offload.py [pages] [policies]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bench_json_codec import build_policies_payload
+
+from cwaf_external_mcp.httpclient.offload import Offloader
+from cwaf_external_mcp.httpclient.upstream_client import _decode_and_map
+from cwaf_external_mcp.mcp_tools.cwaf_tools import get_policy_from_response
+
+
+async def probe_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Measure how late the loop wakes up a 1ms sleep."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def decode_pages(raw: bytes, pages: int, offloader: Offloader | None) -> float:
+    """Decode and map the pages, returning the max loop lag seen meanwhile."""
+    stop = asyncio.Event()
+    lags: list[float] = []
+    probe = asyncio.create_task(probe_lag(stop, lags))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    for _ in range(pages):
+        if offloader is None:
+            _decode_and_map(200, raw, get_policy_from_response)
+        else:
+            await offloader.run(
+                "policies", _decode_and_map, 200, raw, get_policy_from_response
+            )
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    lags.sort()
+    print(
+        f"  total {elapsed * 1000:8.1f} ms  loop lag max {max(lags) * 1000:7.1f} ms"
+        f"  p99 {lags[int(len(lags) * 0.99)] * 1000:6.1f} ms"
+        f"  median {statistics.median(lags) * 1000:5.2f} ms"
+    )
+
+
+async def main(pages: int, policies: int) -> None:
+    raw = json.dumps(build_policies_payload(policies, 200)).encode()
+    print(f"{pages} pages of {policies} policies, {len(raw) / 2**20:.1f} MiB each")
+    print("inline")
+    await decode_pages(raw, pages, None)
+    for name, executor in (
+        ("thread pool", ThreadPoolExecutor(2)),
+        ("process pool", ProcessPoolExecutor(2)),
+    ):
+        print(name)
+        offloader = Offloader(executor, 0)
+        await offloader.run("policies", len, b"warm up")
+        await decode_pages(raw, pages, offloader)
+        offloader.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+        )
+    )
@@ -0,0 +1,69 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bytes and serialization time of site and rule pages as JSON objects or tables.
+
+Serializes a CWAFResponse the way the tools do (to_jsonable_python then the
+configured JSON codec), once as is and once converted with to_table().
+
+Run with: PYTHONPATH=src python benchmarks/bench_table_format.py [rows ...]
+"""
+
+import sys
+import timeit
+
+import pydantic_core
+from bench_model_validation import build_rules, build_sites
+
+from cwaf_external_mcp.mcp_tools.cwaf_tools import (
+    get_rules_from_response,
+    get_site_from_response,
+)
+from cwaf_external_mcp.model.cwaf_response import CWAFResponse, Meta
+from cwaf_external_mcp.utilities.json_codec import get_json_codec
+
+
+def serialize(response) -> bytes:
+    """Encode a tool result like JsonCodecTool."""
+    return get_json_codec().dumps(pydantic_core.to_jsonable_python(response))
+
+
+def main(sizes: list[int]) -> None:
+    meta = Meta(size=None, page=0, totalElements=None, totalPages=1)
+    for rows in sizes:
+        for label, items, mapper in (
+            ("sites", build_sites(rows), get_site_from_response),
+            ("rules", build_rules(rows), get_rules_from_response),
+        ):
+            response = CWAFResponse(data=mapper.map_page(items), meta=meta)
+            json_size = len(serialize(response))
+            table_size = len(serialize(response.to_table()))
+            json_time = min(
+                timeit.repeat(lambda: serialize(response), number=10, repeat=5)
+            )
+            table_time = min(
+                timeit.repeat(
+                    lambda: serialize(response.to_table()), number=10, repeat=5
+                )
+            )
+            print(
+                f"{rows:>5} {label}: json {json_size:>9,} B {json_time * 100:7.2f} ms"
+                f"  table {table_size:>9,} B {table_time * 100:7.2f} ms"
+                f"  ({table_size / json_size:.0%} of the bytes,"
+                f" {table_time / json_time:.0%} of the time)"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000])
@@ -14,8 +14,9 @@
 
 """Context manager for handling MCPContext using contextvars."""
 
+import time
 from contextvars import ContextVar, Token
-from typing import Dict
+from typing import Dict, Optional
 
 from cwaf_external_mcp.context.mcp_context import MCPContext
 
@@ -42,9 +43,7 @@ class ContextManager:
 
     def set_current_trace_id(self, trace_id: str) -> Token:
         """Set the current trace ID in the context."""
-        context = MCPContext()
-        context.trace_id = trace_id
-        context.headers = self.get_current_context().headers
+        context = self.get_current_context().model_copy(update={"trace_id": trace_id})
         return self.set_current_context(context)
 
     def get_current_trace_id(self) -> str:
@@ -53,14 +52,33 @@ class ContextManager:
 
     def set_headers(self, headers: Dict[str, str]) -> Token:
         """Set the headers in the current context."""
-        context = MCPContext()
-        context.headers = headers
-        context.trace_id = self.get_current_context().trace_id
+        context = self.get_current_context().model_copy(update={"headers": headers})
         return self.set_current_context(context)
 
     def get_headers(self) -> Dict[str, str]:
         """Get the headers from the current context."""
         return self.get_current_context().headers
 
+    def set_deadline(self, deadline: Optional[float]) -> Token:
+        """Set the time.monotonic() deadline of the current tool call."""
+        context = self.get_current_context().model_copy(update={"deadline": deadline})
+        return self.set_current_context(context)
+
+    def get_remaining_time(self) -> Optional[float]:
+        """Get the seconds left before the deadline, None when there is none."""
+        deadline = self.get_current_context().deadline
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    def set_priority(self, priority: str) -> Token:
+        """Set the lane (interactive or background) of the upstream requests."""
+        context = self.get_current_context().model_copy(update={"priority": priority})
+        return self.set_current_context(context)
+
+    def get_priority(self) -> str:
+        """Get the lane of the upstream requests of the current context."""
+        return self.get_current_context().priority
+
 
 context_manager = ContextManager()
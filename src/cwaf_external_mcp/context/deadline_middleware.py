@@ -0,0 +1,68 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""MCP middleware setting the deadline of the tool calls."""
+
+import os
+import time
+from typing import Any, Optional
+
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+TIMEOUT_ARGUMENT_NAME = "timeout_seconds"
+
+
+class DeadlineMiddleware(Middleware):
+    """
+    Set the deadline of a tool call in the MCPContext.
+
+    The time budget is taken from the timeout_seconds tool argument, then from
+    the MCP_TIMEOUT_HEADER_NAME HTTP header, then from TOOL_CALL_TIMEOUT.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        budget = get_time_budget(context.message.arguments or {})
+        if budget is None:
+            return await call_next(context)
+        token = context_manager.set_deadline(time.monotonic() + budget)
+        try:
+            return await call_next(context)
+        finally:
+            context_manager.reset_token(token)
+
+
+def get_time_budget(arguments: dict[str, Any]) -> Optional[float]:
+    """Get the time budget in seconds of a tool call, None when it has none."""
+    header_name = os.environ.get("MCP_TIMEOUT_HEADER_NAME", "x-request-timeout").lower()
+    for source, value in (
+        ("argument", arguments.get(TIMEOUT_ARGUMENT_NAME)),
+        ("header", get_http_headers().get(header_name)),
+        ("config", os.environ.get("TOOL_CALL_TIMEOUT")),
+    ):
+        if value is None or value == "":
+            continue
+        try:
+            budget = float(value)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring invalid %s timeout %r", source, value)
+            continue
+        if budget > 0:
+            return budget
+    return None
@@ -20,7 +20,14 @@ from pydantic import BaseModel
 
 
 class MCPContext(BaseModel):
-    """Context information for MCP execution."""
+    """
+    Context information for MCP execution.
+
+    deadline is the time.monotonic() time by which the tool call must complete.
+    priority is the lane of the upstream requests, interactive or background.
+    """
 
     trace_id: Optional[str] = None
     headers: dict[str, str] = {}
+    deadline: Optional[float] = None
+    priority: str = "interactive"
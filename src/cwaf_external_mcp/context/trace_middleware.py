@@ -0,0 +1,45 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""MCP middleware setting the trace id of the tool calls."""
+
+import os
+import uuid
+
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from cwaf_external_mcp.context.context_manager import context_manager
+
+
+class TraceIdMiddleware(Middleware):
+    """
+    Set the trace id of a tool call in the MCPContext.
+
+    The trace id is taken from the MCP_TRACE_ID_HEADER_NAME HTTP header, a new
+    one is generated when the client does not send it.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        token = context_manager.set_current_trace_id(get_trace_id())
+        try:
+            return await call_next(context)
+        finally:
+            context_manager.reset_token(token)
+
+
+def get_trace_id() -> str:
+    """Get the trace id sent by the client, or generate one."""
+    header_name = os.environ.get("MCP_TRACE_ID_HEADER_NAME", "x-trace-id").lower()
+    return get_http_headers().get(header_name) or uuid.uuid4().hex
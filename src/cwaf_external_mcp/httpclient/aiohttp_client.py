@@ -14,6 +14,7 @@
 
 """Asynchronous HTTP client using aiohttp with connection pooling and metrics."""
 
+import asyncio
 import logging
 import os
 import ssl
@@ -22,24 +23,64 @@ import aiohttp
 from aiohttp import ClientTimeout
 from prometheus_client import Gauge
 
+from cwaf_external_mcp.httpclient.httpx_client import HttpxSession, build_httpx_session
+from cwaf_external_mcp.httpclient.pool_tuner import (
+    TunedTCPConnector,
+    get_pool_tuner,
+)
+from cwaf_external_mcp.httpclient.pool_tuner import host_label as _host_label
+from cwaf_external_mcp.httpclient.request_tracing import build_trace_config
+from cwaf_external_mcp.utilities.json_codec import get_json_codec
+
 SESSION = None
+SSL_CONTEXT = None
 
 
-def _build_session() -> aiohttp.ClientSession:
-    """Build and configure the aiohttp ClientSession with connection pooling."""
+def get_ssl_context() -> ssl.SSLContext:
+    """Get the SSL context shared by all the sessions, built once per process."""
+    global SSL_CONTEXT
+    if SSL_CONTEXT is None:
+        SSL_CONTEXT = _build_ssl_context()
+    return SSL_CONTEXT
+
+
+def _build_ssl_context() -> ssl.SSLContext:
+    """Build the SSL context used to connect to the upstream APIs."""
     ssl_context = ssl.create_default_context()
 
     if os.environ.get("DISABLE_SSL_VERIFICATION", "false").lower() == "true":
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
 
-    connector = aiohttp.TCPConnector(
+def _build_client() -> aiohttp.ClientSession | HttpxSession:
+    """Build the client of the transport backend selected by HTTP_CLIENT_BACKEND."""
+    backend = os.environ.get("HTTP_CLIENT_BACKEND", "aiohttp").lower()
+    if backend == "aiohttp":
+        return _build_session()
+    if backend == "httpx":
+        return build_httpx_session(get_ssl_context())
+    raise ValueError(f"Unknown HTTP_CLIENT_BACKEND: {backend!r}")
+
+
+def _build_session() -> aiohttp.ClientSession:
+    """Build and configure the aiohttp ClientSession with connection pooling."""
+    ssl_context = get_ssl_context()
+
+    limit_per_host = int(os.environ.get("CONNECTION_POOL_MAX_KEEP_ALIVE", "20"))
+    connector_options = dict(
         limit=int(os.environ.get("CONNECTION_POOL_SIZE", "50")),  #
-        limit_per_host=int(os.environ.get("CONNECTION_POOL_MAX_KEEP_ALIVE", "20")),
-        keepalive_timeout=30,
+        keepalive_timeout=float(os.environ.get("CONNECTION_KEEP_ALIVE_TIMEOUT", 30)),
         ttl_dns_cache=300,
         ssl=ssl_context,
     )
+    if get_pool_tuner() is None:
+        connector = aiohttp.TCPConnector(
+            limit_per_host=limit_per_host, **connector_options
+        )
+    else:
+        connector = TunedTCPConnector(host_limit=limit_per_host, **connector_options)
 
     timeout = ClientTimeout(
         total=float(os.environ.get("READ_TIME_OUT", 30.0)),
@@ -61,6 +102,8 @@ def _build_session() -> aiohttp.ClientSession:
         connector=connector,
         timeout=timeout,
         raise_for_status=False,  # optional: auto-raise on 4xx/5xx
+        json_serialize=get_json_codec().dumps,
+        trace_configs=[build_trace_config()],
     )
 
 
@@ -68,14 +111,14 @@ async def setup_session() -> None:
     """Initialise the global SESSION exactly once."""
     global SESSION
     if SESSION is None or SESSION.closed:
-        SESSION = _build_session()
+        SESSION = _build_client()
 
 
-def get_async_client() -> aiohttp.ClientSession:
+def get_async_client() -> aiohttp.ClientSession | HttpxSession:
     """Get the configured HTTP client for making asynchronous requests."""
     global SESSION
     if SESSION is None or SESSION.closed:
-        SESSION = _build_session()
+        SESSION = _build_client()
     return SESSION
 
 
@@ -84,16 +127,13 @@ IDLE = Gauge("aiohttp_pool_idle", "Idle keep-alive connections", ["host"])
 TOTAL = Gauge("aiohttp_pool_total", "Total open sockets", ["host"])
 
 
-def _host_label(key: aiohttp.client_reqrep.ConnectionKey) -> str:
-    """Generate a host label for Prometheus metrics from a ConnectionKey."""
-    # key.host already includes the port for Unix / proxy cases
-    return f"{key.host}:{key.port or (443 if key.ssl else 80)}"
-
-
 def collect_pool_metrics() -> None:
     """Collect metrics for the aiohttp connection pool."""
     if SESSION is None or SESSION.closed:
         return
+    if isinstance(SESSION, HttpxSession):
+        _collect_httpx_pool_metrics(SESSION)
+        return
     c = SESSION.connector  # type: aiohttp.BaseConnector
     busy_total = len(c._acquired)  # used across all hosts
     idle_total = sum(len(q) for q in c._conns.values())
@@ -109,3 +149,27 @@ def collect_pool_metrics() -> None:
         USED.labels(host=host).set(busy)
         IDLE.labels(host=host).set(idle)
         TOTAL.labels(host=host).set(busy + idle)
+
+
+def _collect_httpx_pool_metrics(session: HttpxSession) -> None:
+    """Collect metrics for the httpx connection pool."""
+    stats = session.pool_stats()
+    busy_total = sum(busy for busy, _ in stats.values())
+    idle_total = sum(idle for _, idle in stats.values())
+    TOTAL.labels(host="*").set(busy_total + idle_total)
+    USED.labels(host="*").set(busy_total)
+    IDLE.labels(host="*").set(idle_total)
+    for host, (busy, idle) in stats.items():
+        USED.labels(host=host).set(busy)
+        IDLE.labels(host=host).set(idle)
+        TOTAL.labels(host=host).set(busy + idle)
+
+
+async def tune_connection_pools(interval: float) -> None:
+    """Resize the per host connection limits of the aiohttp session every interval."""
+    tuner = get_pool_tuner()
+    while tuner is not None:
+        await asyncio.sleep(interval)
+        connector = getattr(SESSION, "connector", None)
+        if isinstance(connector, TunedTCPConnector):
+            tuner.tune(connector)
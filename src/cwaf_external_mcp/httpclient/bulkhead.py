@@ -0,0 +1,122 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulkheads isolating the concurrency of the upstream APIs from one another."""
+
+import os
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+
+from cwaf_external_mcp.httpclient.slot_queue import SlotQueue
+
+IN_FLIGHT = Gauge(
+    "cwaf_upstream_bulkhead_in_flight",
+    "Upstream calls running in the bulkhead of an API",
+    ["upstream"],
+)
+QUEUE_DEPTH = Gauge(
+    "cwaf_upstream_bulkhead_queue_depth",
+    "Upstream calls waiting in the bulkhead of an API",
+    ["upstream"],
+)
+SATURATION = Gauge(
+    "cwaf_upstream_bulkhead_saturation",
+    "Share of the concurrency and queue of the bulkhead of an API in use",
+    ["upstream"],
+)
+REJECTED = Counter(
+    "cwaf_upstream_bulkhead_rejected_total",
+    "Upstream calls rejected by a full bulkhead",
+    ["upstream"],
+)
+
+BULKHEADS: dict[str, "Bulkhead"] = {}
+
+
+class BulkheadFullError(Exception):
+    """Raised when a call is rejected because the bulkhead of its API is full."""
+
+    def __init__(self, upstream: str):
+        super().__init__(f"bulkhead of {upstream} upstream is full")
+        self.upstream = upstream
+
+
+class Bulkhead:
+    """
+    Concurrency and queue limits of the calls to one upstream API.
+
+    Up to max_concurrent calls run at once and up to max_queue wait for a slot,
+    further calls are rejected at once so a degraded API cannot hold the
+    resources the other APIs need.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters = SlotQueue(self._export)
+        self._export()
+
+    async def acquire(self) -> None:
+        """Wait for a slot, raise BulkheadFullError when the queue is full."""
+        if not self._waiters and self._can_start():
+            self._start()
+            return
+        if len(self._waiters) >= self.max_queue:
+            REJECTED.labels(upstream=self.name).inc()
+            raise BulkheadFullError(self.name)
+        await self._waiters.wait(self.release)
+
+    def release(self) -> None:
+        """Release a slot, handing it over to the next waiting call."""
+        self.in_flight -= 1
+        self._waiters.wake_up(self._can_start, self._start)
+        self._export()
+
+    def _can_start(self) -> bool:
+        return self.in_flight < self.max_concurrent
+
+    def _start(self) -> None:
+        self.in_flight += 1
+        self._export()
+
+    def _export(self) -> None:
+        IN_FLIGHT.labels(upstream=self.name).set(self.in_flight)
+        QUEUE_DEPTH.labels(upstream=self.name).set(len(self._waiters))
+        SATURATION.labels(upstream=self.name).set(
+            (self.in_flight + len(self._waiters))
+            / max(1, self.max_concurrent + self.max_queue)
+        )
+
+
+def get_bulkhead(upstream: str) -> Optional[Bulkhead]:
+    """Get the bulkhead of an upstream API, None when bulkheads are disabled."""
+    if os.environ.get("BULKHEAD_ENABLED", "false").lower() != "true":
+        return None
+    bulkhead = BULKHEADS.get(upstream)
+    if bulkhead is None:
+        suffix = upstream.upper()
+        max_concurrent = os.environ.get("BULKHEAD_MAX_CONCURRENT", "10")
+        max_queue = os.environ.get("BULKHEAD_MAX_QUEUE", "20")
+        bulkhead = Bulkhead(
+            name=upstream,
+            max_concurrent=int(
+                os.environ.get(f"BULKHEAD_MAX_CONCURRENT_{suffix}", max_concurrent)
+            ),
+            max_queue=int(os.environ.get(f"BULKHEAD_MAX_QUEUE_{suffix}", max_queue)),
+        )
+        BULKHEADS[upstream] = bulkhead
+    return bulkhead
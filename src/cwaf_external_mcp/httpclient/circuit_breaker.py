@@ -0,0 +1,194 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Circuit breaker per upstream API."""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+from prometheus_client import Counter, Gauge
+
+from cwaf_external_mcp.httpclient.bulkhead import BulkheadFullError
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE = Gauge(
+    "cwaf_upstream_circuit_state",
+    "Circuit breaker state (0 closed, 1 half open, 2 open)",
+    ["upstream"],
+)
+REJECTED = Counter(
+    "cwaf_upstream_circuit_rejected_total",
+    "Requests failed fast by an open circuit breaker",
+    ["upstream"],
+)
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKERS: dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected by an open circuit breaker."""
+
+    def __init__(self, upstream: str):
+        super().__init__(f"circuit breaker of {upstream} upstream is open")
+        self.upstream = upstream
+
+
+# errors a stale cached response can be served instead of
+UPSTREAM_ERRORS = (
+    CircuitOpenError,
+    BulkheadFullError,
+    asyncio.TimeoutError,
+    aiohttp.ClientError,
+)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of request outcomes.
+
+    A request fails when it raises, returns a 5xx/429 status or takes longer than
+    slow_call_seconds. The circuit opens when the failure ratio of the window
+    reaches failure_ratio, rejects requests for open_seconds, then lets a single
+    probe through (half open) which closes or re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_ratio: float,
+        min_calls: int,
+        window_size: int,
+        slow_call_seconds: float,
+        open_seconds: float,
+    ):
+        self.name = name
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._probe_in_flight = False
+        self._set_state(CLOSED)
+
+    async def call(
+        self, func: Callable[[], Awaitable[T]], is_failure: Callable[[T], bool]
+    ) -> T:
+        """Call func through the breaker, raise CircuitOpenError when open."""
+        probe = self._before_call()
+        start = time.monotonic()
+        failed = True
+        try:
+            result = await func()
+            failed = is_failure(result)
+            return result
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            raise
+        except Exception:
+            # the upstream answered, its body could not be handled
+            failed = False
+            raise
+        except asyncio.CancelledError:
+            failed = None
+            raise
+        finally:
+            if failed is None:
+                if probe:
+                    self._probe_in_flight = False
+            else:
+                slow = time.monotonic() - start > self.slow_call_seconds
+                self._on_result(failed or slow, probe)
+
+    def _before_call(self) -> bool:
+        """Check the breaker state, return whether the call is a half open probe."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                REJECTED.labels(upstream=self.name).inc()
+                raise CircuitOpenError(self.name)
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                REJECTED.labels(upstream=self.name).inc()
+                raise CircuitOpenError(self.name)
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _on_result(self, failed: bool, probe: bool) -> None:
+        if probe:
+            self._probe_in_flight = False
+            if failed:
+                self._open()
+            else:
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+            return
+        if self.state != CLOSED:
+            return
+        self._outcomes.append(failed)
+        failures = sum(self._outcomes)
+        if len(
+            self._outcomes
+        ) >= self.min_calls and failures >= self.failure_ratio * len(self._outcomes):
+            self._open()
+
+    def _open(self) -> None:
+        logger.warning("Opening circuit breaker of %s upstream", self.name)
+        self.opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        STATE.labels(upstream=self.name).set(STATE_VALUES[state])
+
+
+def is_failure_status(status: int) -> bool:
+    """Whether an upstream status counts as a failure for the breaker."""
+    return status >= 500 or status == 429
+
+
+def get_circuit_breaker(upstream: str) -> Optional[CircuitBreaker]:
+    """Get the breaker of an upstream API, None when circuit breaking is disabled."""
+    if os.environ.get("CIRCUIT_BREAKER_ENABLED", "false").lower() != "true":
+        return None
+    breaker = BREAKERS.get(upstream)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name=upstream,
+            failure_ratio=float(os.environ.get("CIRCUIT_BREAKER_FAILURE_RATIO", "0.5")),
+            min_calls=int(os.environ.get("CIRCUIT_BREAKER_MIN_CALLS", "10")),
+            window_size=int(os.environ.get("CIRCUIT_BREAKER_WINDOW_SIZE", "20")),
+            slow_call_seconds=float(
+                os.environ.get("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "10")
+            ),
+            open_seconds=float(os.environ.get("CIRCUIT_BREAKER_OPEN_SECONDS", "30")),
+        )
+        BREAKERS[upstream] = breaker
+    return breaker
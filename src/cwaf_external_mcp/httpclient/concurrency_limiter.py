@@ -0,0 +1,166 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Latency-driven adaptive concurrency limiter per upstream API."""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+from prometheus_client import Gauge
+
+from cwaf_external_mcp.httpclient.slot_queue import SlotQueue
+
+T = TypeVar("T")
+
+LIMIT = Gauge(
+    "cwaf_upstream_concurrency_limit",
+    "Adaptive in-flight request limit",
+    ["upstream"],
+)
+IN_FLIGHT = Gauge(
+    "cwaf_upstream_concurrency_in_flight", "In-flight upstream requests", ["upstream"]
+)
+QUEUE_DEPTH = Gauge(
+    "cwaf_upstream_concurrency_queue_depth",
+    "Requests waiting for an in-flight slot",
+    ["upstream"],
+)
+
+LIMITERS: dict[str, "AdaptiveConcurrencyLimiter"] = {}
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Gradient concurrency limiter.
+
+    The limit grows by one while the requests use it and the latency stays within
+    `tolerance` times the no-load latency. It shrinks with the latency gradient
+    when the latency rises, and by `backoff_ratio` on throttling or timeouts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        smoothing: float = 0.2,
+        rtt_reset_samples: int = 1000,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.tolerance = tolerance
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+        self.rtt_reset_samples = rtt_reset_samples
+        self.in_flight = 0
+        self.rtt_noload: Optional[float] = None
+        self._samples = 0
+        self._waiters = SlotQueue(self._export)
+        self._export()
+
+    async def run(
+        self, func: Callable[[], Awaitable[T]], is_dropped: Callable[[T], bool]
+    ) -> T:
+        """Run func within the limit and feed its latency back to the limiter."""
+        await self.acquire()
+        start = time.monotonic()
+        rtt = None
+        dropped = False
+        try:
+            result = await func()
+            rtt = time.monotonic() - start
+            dropped = is_dropped(result)
+            return result
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            dropped = True
+            raise
+        finally:
+            self.release(rtt, dropped)
+
+    async def acquire(self) -> None:
+        """Wait for an in-flight slot."""
+        if not self._waiters and self._can_start():
+            self._start()
+            self._export()
+            return
+        await self._waiters.wait(self.release)
+
+    def release(self, rtt: Optional[float] = None, dropped: bool = False) -> None:
+        """Release a slot and update the limit with the request outcome."""
+        self.in_flight -= 1
+        if dropped:
+            self._set_limit(self.limit * self.backoff_ratio)
+        elif rtt is not None:
+            self._on_sample(rtt)
+        self._waiters.wake_up(self._can_start, self._start)
+        self._export()
+
+    def _on_sample(self, rtt: float) -> None:
+        self._samples += 1
+        if self.rtt_noload is None or self._samples >= self.rtt_reset_samples:
+            self.rtt_noload = rtt
+            self._samples = 0
+        self.rtt_noload = min(self.rtt_noload, rtt)
+        gradient = max(0.5, min(1.0, self.tolerance * self.rtt_noload / max(rtt, 1e-6)))
+        if gradient < 1.0:
+            new_limit = self.limit * gradient
+        elif (self.in_flight + 1) * 2 >= self.limit or self._waiters:
+            new_limit = self.limit + 1
+        else:
+            return
+        self._set_limit((1 - self.smoothing) * self.limit + self.smoothing * new_limit)
+
+    def _set_limit(self, limit: float) -> None:
+        self.limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+
+    def _can_start(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _start(self) -> None:
+        self.in_flight += 1
+
+    def _export(self) -> None:
+        LIMIT.labels(upstream=self.name).set(self.limit)
+        IN_FLIGHT.labels(upstream=self.name).set(self.in_flight)
+        QUEUE_DEPTH.labels(upstream=self.name).set(len(self._waiters))
+
+
+def get_concurrency_limiter(upstream: str) -> Optional[AdaptiveConcurrencyLimiter]:
+    """Get the limiter of an upstream API, None when adaptive limiting is disabled."""
+    if os.environ.get("ADAPTIVE_CONCURRENCY_ENABLED", "false").lower() != "true":
+        return None
+    limiter = LIMITERS.get(upstream)
+    if limiter is None:
+        limiter = AdaptiveConcurrencyLimiter(
+            name=upstream,
+            initial_limit=int(os.environ.get("ADAPTIVE_CONCURRENCY_INITIAL", "10")),
+            min_limit=int(os.environ.get("ADAPTIVE_CONCURRENCY_MIN", "1")),
+            max_limit=int(
+                os.environ.get(
+                    "ADAPTIVE_CONCURRENCY_MAX",
+                    os.environ.get("CONNECTION_POOL_MAX_KEEP_ALIVE", "20"),
+                )
+            ),
+            tolerance=float(os.environ.get("ADAPTIVE_CONCURRENCY_TOLERANCE", "2.0")),
+        )
+        LIMITERS[upstream] = limiter
+    return limiter
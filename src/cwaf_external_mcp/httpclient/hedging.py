@@ -0,0 +1,184 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hedged upstream requests, cutting the tail latency of the read endpoints."""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+from cwaf_external_mcp.httpclient.retry import RetryBudget
+
+T = TypeVar("T")
+
+HEDGED_REQUESTS = Counter(
+    "cwaf_upstream_hedged_requests_total",
+    "Duplicate requests sent because the first one was slow",
+    ["upstream"],
+)
+HEDGE_WINS = Counter(
+    "cwaf_upstream_hedge_wins_total",
+    "Hedged requests answered first by the duplicate request",
+    ["upstream"],
+)
+HEDGES_SKIPPED = Counter(
+    "cwaf_upstream_hedges_skipped_total",
+    "Slow requests not hedged because the hedging budget is exhausted",
+    ["upstream"],
+)
+HEDGE_THRESHOLD = Gauge(
+    "cwaf_upstream_hedge_threshold_seconds",
+    "Latency after which a request is hedged",
+    ["upstream"],
+)
+HEDGE_BUDGET_TOKENS = Gauge(
+    "cwaf_upstream_hedge_budget_tokens", "Available hedging tokens"
+)
+
+HEDGING_POLICIES: dict[str, "HedgingPolicy"] = {}
+HEDGE_BUDGET = None
+
+
+class HedgingPolicy:
+    """
+    Send a duplicate request when the first one is slower than usual.
+
+    The hedging threshold is a percentile of the latencies of the last
+    window_size requests of the upstream, floored at min_delay. The first
+    successful response wins and the other request is cancelled. A failed
+    response only wins when the other request failed too.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: RetryBudget,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        window_size: int = 200,
+        min_delay: float = 0.05,
+    ):
+        self.name = name
+        self.budget = budget
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latencies: deque[float] = deque(maxlen=window_size)
+
+    def get_threshold(self) -> Optional[float]:
+        """Get the hedging threshold, None until enough latencies are known."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        latencies = sorted(self.latencies)
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        threshold = max(self.min_delay, latencies[max(0, index)])
+        HEDGE_THRESHOLD.labels(upstream=self.name).set(threshold)
+        return threshold
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        is_failure: Callable[[T], bool] = lambda result: False,
+    ) -> T:
+        """Call func, hedging it with a second call once the threshold passes."""
+        self.budget.deposit()
+        threshold = self.get_threshold()
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(func())]
+        try:
+            if threshold is not None:
+                done, _ = await asyncio.wait(tasks, timeout=threshold)
+                if not done:
+                    if self.budget.withdraw():
+                        HEDGED_REQUESTS.labels(upstream=self.name).inc()
+                        tasks.append(asyncio.ensure_future(func()))
+                    else:
+                        HEDGES_SKIPPED.labels(upstream=self.name).inc()
+            winner = await _first_success(tasks, is_failure)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                task.add_done_callback(_consume_exception)
+        # when the hedge wins, the elapsed time is a lower bound of the latency
+        # of the first request
+        self.latencies.append(time.monotonic() - start)
+        if winner is not tasks[0]:
+            HEDGE_WINS.labels(upstream=self.name).inc()
+        return winner.result()
+
+
+async def _first_success(
+    tasks: list[asyncio.Future], is_failure: Callable[[T], bool]
+) -> asyncio.Future:
+    """
+    Wait for the first task to succeed.
+
+    When all fail, the first failed result is returned, else the first error raised.
+    """
+    pending = set(tasks)
+    failed = None
+    error = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in sorted(done, key=tasks.index):
+            if task.exception() is not None:
+                error = error or task.exception()
+            elif not is_failure(task.result()):
+                return task
+            else:
+                failed = failed or task
+    if failed is not None:
+        return failed
+    raise error
+
+
+def _consume_exception(task: asyncio.Future) -> None:
+    """Mark the exception of a losing request as retrieved."""
+    if not task.cancelled():
+        task.exception()
+
+
+def get_hedging_policy(upstream: str) -> Optional[HedgingPolicy]:
+    """Get the hedging policy of an upstream API, None when it is not hedged."""
+    global HEDGE_BUDGET
+    if os.environ.get("HEDGING_ENABLED", "false").lower() != "true":
+        return None
+    endpoints = os.environ.get("HEDGING_ENDPOINTS", "sites,rules").split(",")
+    if upstream not in [endpoint.strip() for endpoint in endpoints]:
+        return None
+    policy = HEDGING_POLICIES.get(upstream)
+    if policy is None:
+        if HEDGE_BUDGET is None:
+            HEDGE_BUDGET = RetryBudget(
+                ratio=float(os.environ.get("HEDGING_BUDGET_RATIO", "0.05")),
+                min_tokens=0,
+                max_tokens=float(os.environ.get("HEDGING_BUDGET_MAX_TOKENS", "10")),
+                gauge=HEDGE_BUDGET_TOKENS,
+            )
+        policy = HedgingPolicy(
+            name=upstream,
+            budget=HEDGE_BUDGET,
+            percentile=float(os.environ.get("HEDGING_PERCENTILE", "95")),
+            min_samples=int(os.environ.get("HEDGING_MIN_SAMPLES", "20")),
+            window_size=int(os.environ.get("HEDGING_WINDOW_SIZE", "200")),
+            min_delay=float(os.environ.get("HEDGING_MIN_DELAY", "0.05")),
+        )
+        HEDGING_POLICIES[upstream] = policy
+    return policy
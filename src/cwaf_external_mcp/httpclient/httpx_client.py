@@ -0,0 +1,222 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""httpx transport backend, multiplexing the requests over HTTP/2 when available."""
+
+import asyncio
+import contextlib
+import importlib.util
+import os
+import ssl
+import time
+from typing import Any, AsyncIterator, Iterator, Mapping, Optional
+
+import aiohttp
+import httpx
+
+from cwaf_external_mcp.httpclient.request_tracing import RequestTimings
+
+# responses being closed in the background, referenced until they are closed
+CLOSING_RESPONSES: set[asyncio.Task] = set()
+
+
+@contextlib.contextmanager
+def _translate_errors() -> Iterator[None]:
+    """Raise the httpx errors as the aiohttp errors the upstream pipeline handles."""
+    try:
+        yield
+    except httpx.TimeoutException as e:
+        raise aiohttp.ServerTimeoutError(str(e)) from e
+    except httpx.RemoteProtocolError as e:
+        raise aiohttp.ServerDisconnectedError(str(e)) from e
+    except httpx.ConnectError as e:
+        raise aiohttp.ClientConnectionError(str(e)) from e
+    except httpx.NetworkError as e:
+        raise aiohttp.ClientOSError(str(e)) from e
+    except httpx.TransportError as e:
+        raise aiohttp.ClientError(str(e)) from e
+
+
+@contextlib.asynccontextmanager
+async def _total_timeout(deadline: Optional[float]) -> AsyncIterator[None]:
+    """Bound a step of the exchange by its total deadline, as aiohttp does."""
+    timeout = asyncio.timeout_at(deadline)
+    try:
+        async with timeout:
+            with _translate_errors():
+                yield
+    except TimeoutError as e:
+        if not timeout.expired():
+            raise
+        raise aiohttp.ServerTimeoutError("Total timeout exceeded") from e
+
+
+class HttpxResponse:
+    """Streamed httpx response exposing the subset of aiohttp.ClientResponse in use."""
+
+    def __init__(self, response: httpx.Response, deadline: Optional[float] = None):
+        self._response = response
+        self._deadline = deadline
+        self.status = response.status_code
+        self.headers = response.headers
+        self.content = self
+        content_length = response.headers.get("content-length")
+        self.content_length = int(content_length) if content_length else None
+
+    def __repr__(self) -> str:
+        return f"<HttpxResponse({self._response.url}) [{self.status}] {self._response.http_version}>"
+
+    async def read(self) -> bytes:
+        """Read the whole body, the connection is released once it is read."""
+        async with _total_timeout(self._deadline):
+            return await self._response.aread()
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Iterate over the body in chunks of at most n bytes."""
+        chunks = self._response.aiter_bytes(n)
+        while True:
+            # the timeout must not span the yields, they run the caller's code
+            try:
+                async with _total_timeout(self._deadline):
+                    chunk = await anext(chunks)
+            except StopAsyncIteration:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        """Close the response without reading the rest of the body."""
+        task = asyncio.ensure_future(self._response.aclose())
+        CLOSING_RESPONSES.add(task)
+        task.add_done_callback(CLOSING_RESPONSES.discard)
+
+
+class HttpxSession:
+    """httpx.AsyncClient exposing the subset of aiohttp.ClientSession in use."""
+
+    def __init__(
+        self, client: httpx.AsyncClient, total_timeout: Optional[float] = None
+    ):
+        self._client = client
+        self.total_timeout = total_timeout
+
+    @property
+    def closed(self) -> bool:
+        """Whether the underlying client is closed."""
+        return self._client.is_closed
+
+    @property
+    def http2(self) -> bool:
+        """Whether the requests may be multiplexed over HTTP/2."""
+        return self._client._transport._pool._http2
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        trace_request_ctx: Optional[RequestTimings] = None,
+    ) -> HttpxResponse:
+        """
+        Send a GET request, the body is streamed by the returned response.
+
+        httpx has no per phase hooks, so the whole exchange up to the response
+        headers is recorded as ttfb in the timings.
+        """
+        started_at = time.monotonic()
+        response = await self._send("GET", url, headers, params)
+        if trace_request_ctx is not None:
+            trace_request_ctx.observe("ttfb", time.monotonic() - started_at)
+        return response
+
+    async def head(
+        self, url: str, headers: Optional[Mapping[str, str]] = None
+    ) -> HttpxResponse:
+        """Send a HEAD request."""
+        return await self._send("HEAD", url, headers)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> HttpxResponse:
+        """
+        Send a request, the body is streamed by the returned response.
+
+        The total timeout bounds the whole exchange, reading the body included.
+        """
+        deadline = None
+        if self.total_timeout is not None:
+            deadline = asyncio.get_running_loop().time() + self.total_timeout
+        request = self._client.build_request(
+            method, url, headers=headers, params=params
+        )
+        async with _total_timeout(deadline):
+            response = await self._client.send(request, stream=True)
+        return HttpxResponse(response, deadline)
+
+    async def close(self) -> None:
+        """Close the client and its connections."""
+        await self._client.aclose()
+
+    def pool_stats(self) -> dict[str, tuple[int, int]]:
+        """Number of busy and idle connections per host."""
+        stats: dict[str, tuple[int, int]] = {}
+        for connection in list(self._client._transport._pool.connections):
+            origin = connection._origin
+            host = f"{origin.host.decode()}:{origin.port}"
+            busy, idle = stats.get(host, (0, 0))
+            if connection.is_idle():
+                idle += 1
+            else:
+                busy += 1
+            stats[host] = (busy, idle)
+        return stats
+
+
+def is_http2_available() -> bool:
+    """Whether the h2 package needed by httpx for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_httpx_session(ssl_context: ssl.SSLContext) -> HttpxSession:
+    """Build the httpx client with the same pool and timeout settings as aiohttp."""
+    http2 = (
+        os.environ.get("HTTP2_ENABLED", "true").lower() == "true"
+        and is_http2_available()
+    )
+    limits = httpx.Limits(
+        max_connections=int(os.environ.get("CONNECTION_POOL_SIZE", "50")),
+        max_keepalive_connections=int(
+            os.environ.get("CONNECTION_POOL_MAX_KEEP_ALIVE", "20")
+        ),
+        keepalive_expiry=float(os.environ.get("CONNECTION_KEEP_ALIVE_TIMEOUT", 30)),
+    )
+    connect_timeout = float(os.environ.get("CONNECTION_TIME_OUT", 15.0))
+    timeout = httpx.Timeout(
+        connect=connect_timeout,  # TCP + TLS handshake
+        pool=connect_timeout,  # queue-in-pool
+        read=5.0,  # gap allowed between successive reads
+        write=5.0,  # gap allowed between successive writes
+    )
+    return HttpxSession(
+        httpx.AsyncClient(
+            http2=http2,
+            verify=ssl_context,
+            limits=limits,
+            timeout=timeout,
+        ),
+        total_timeout=float(os.environ.get("READ_TIME_OUT", 30.0)),
+    )
@@ -0,0 +1,267 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental decoding of paginated JSON responses."""
+
+import codecs
+import json
+import re
+from typing import Any, Callable, Optional
+
+_WHITESPACE = " \t\n\r"
+# the rest of an open string, the next bracket outside strings, the end of a scalar
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*("|\\?\Z)', re.DOTALL)
+_NEXT_BRACKET = re.compile(
+    r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*'
+    r'(?:([{}\[\]])|"[^"\\]*(?:\\.[^"\\]*)*(\\?)\Z|\Z)',
+    re.DOTALL,
+)
+_SCALAR_END = re.compile(r"[,\]}\s]")
+
+# parser states
+_OBJECT_START = 0
+_KEY = 1
+_COLON = 2
+_VALUE = 3
+_AFTER_VALUE = 4
+_ITEM = 5
+_AFTER_ITEM = 6
+_DONE = 7
+_RAW = 8
+
+_INCOMPLETE = object()
+
+
+class StreamingJsonDecoder:
+    """
+    Decode a JSON object fed in chunks, mapping the items of one array as they
+    arrive.
+
+    Only the items of the `array_key` array are handed to `item_mapper`, the raw
+    item is dropped right after, so the decoded tree of the whole response is
+    never held in memory. The other members are decoded as usual. Bodies that are
+    not JSON objects are buffered and decoded when the decoder is closed.
+
+    A value is only decoded once it is complete: the chunks of an unfinished value
+    are scanned once, tracking the nesting depth and the string state, and kept
+    aside until its end arrives, so decoding stays linear in the item size.
+    """
+
+    def __init__(
+        self,
+        item_mapper: Optional[Callable[[Any], Any]] = None,
+        array_key: str = "data",
+    ):
+        self.item_mapper = item_mapper or (lambda item: item)
+        self.array_key = array_key
+        self.result: dict[str, Any] = {}
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _OBJECT_START
+        self._key: Optional[str] = None
+        self._items: list = []
+        # scan of the value being received
+        self._scanning = False
+        self._parts: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._scalar = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Feed the next chunk of the body."""
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(chunk)
+        self._pos = 0
+        self._parse(final=False)
+
+    def close(self) -> Any:
+        """Signal the end of the body and return the decoded value."""
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(
+            b"", final=True
+        )
+        self._pos = 0
+        if self._state == _RAW:
+            return json.loads(self._buffer)
+        self._parse(final=True)
+        if self._state != _DONE:
+            raise json.JSONDecodeError("Unexpected end of data", self._buffer, 0)
+        return self.result
+
+    def _parse(self, final: bool) -> None:
+        while True:
+            if self._state == _RAW:
+                return
+            if self._scanning:
+                # resume the value left unfinished by the previous chunk
+                if not self._receive_value(final):
+                    return
+                continue
+            char = self._next_char()
+            if char is None:
+                return
+            if self._state == _OBJECT_START:
+                if char != "{":
+                    self._state = _RAW
+                    return
+                self._pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == "}" and not self.result:
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                if not self._receive_value(final):
+                    return
+            elif self._state == _COLON:
+                self._expect(char, ":")
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if char == "[" and self._key == self.array_key:
+                    self._pos += 1
+                    self._items = []
+                    self.result[self._key] = self._items
+                    self._state = _ITEM
+                    continue
+                if not self._receive_value(final):
+                    return
+            elif self._state == _AFTER_VALUE:
+                self._pos += 1
+                if char == ",":
+                    self._state = _KEY
+                elif char == "}":
+                    self._state = _DONE
+                else:
+                    self._raise(f"Expecting ',' or '}}', got {char!r}")
+            elif self._state == _ITEM:
+                if char == "]" and not self._items:
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                    continue
+                if not self._receive_value(final):
+                    return
+            elif self._state == _AFTER_ITEM:
+                self._pos += 1
+                if char == ",":
+                    self._state = _ITEM
+                elif char == "]":
+                    self._state = _AFTER_VALUE
+                else:
+                    self._raise(f"Expecting ',' or ']', got {char!r}")
+            elif self._state == _DONE:
+                self._raise("Extra data")
+
+    def _next_char(self) -> Optional[str]:
+        """Skip whitespace and return the next char, None when more data is needed."""
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        if self._pos >= len(self._buffer):
+            return None
+        return self._buffer[self._pos]
+
+    def _receive_value(self, final: bool) -> bool:
+        """Decode the key, value or item at the current position, if complete."""
+        value = self._decode_value(final)
+        if value is _INCOMPLETE:
+            return False
+        if self._state == _KEY:
+            self._key = value
+            self._state = _COLON
+        elif self._state == _VALUE:
+            self.result[self._key] = value
+            self._state = _AFTER_VALUE
+        else:
+            self._items.append(self.item_mapper(value))
+            self._state = _AFTER_ITEM
+        return True
+
+    def _decode_value(self, final: bool) -> Any:
+        """Decode the value at the current position, if it is complete."""
+        pos = self._pos
+        if not self._scanning:
+            self._start_scan()
+            # the opening char of a string, object or array is consumed
+            pos += not self._scalar
+        end = self._scan(self._buffer, pos)
+        if end is None and final and self._scalar:
+            end = len(self._buffer)
+        if end is None:
+            if final:
+                self._raise("Unterminated value")
+            # keep the unfinished value aside, only the next chunks are scanned
+            self._parts.append(self._buffer[self._pos :])
+            self._buffer = ""
+            self._pos = 0
+            return _INCOMPLETE
+        if self._parts:
+            self._buffer = "".join(self._parts) + self._buffer
+            self._parts = []
+            self._pos = 0
+        self._scanning = False
+        value, self._pos = self._json_decoder.raw_decode(self._buffer, self._pos)
+        return value
+
+    def _start_scan(self) -> None:
+        """Start scanning the value beginning at the current position."""
+        char = self._buffer[self._pos]
+        self._scanning = True
+        self._depth = 1 if char in "{[" else 0
+        self._in_string = char == '"'
+        self._escaped = False
+        self._scalar = char not in '{["'
+
+    def _scan(self, text: str, pos: int) -> Optional[int]:
+        """Scan text from pos, return the end of the value or None if it goes on."""
+        if self._scalar:
+            match = _SCALAR_END.search(text, pos)
+            return match.start() if match else None
+        if self._in_string:
+            # finish the string left open by the previous chunk
+            if self._escaped:
+                if pos >= len(text):
+                    return None
+                pos += 1
+            match = _STRING_TAIL.match(text, pos)
+            if match.group(1) != '"':
+                self._escaped = match.group(1) == "\\"
+                return None
+            self._in_string = False
+            pos = match.end()
+            if not self._depth:
+                return pos
+        while True:
+            # the regex skips whole strings, only brackets need to be looked at
+            match = _NEXT_BRACKET.match(text, pos)
+            bracket = match.group(1)
+            if bracket is None:
+                if match.group(2) is not None:
+                    self._in_string = True
+                    self._escaped = match.group(2) == "\\"
+                return None
+            pos = match.end()
+            if bracket in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if not self._depth:
+                    return pos
+
+    def _expect(self, char: str, expected: str) -> None:
+        if char != expected:
+            self._raise(f"Expecting {expected!r}, got {char!r}")
+        self._pos += 1
+
+    def _raise(self, message: str) -> None:
+        raise json.JSONDecodeError(message, self._buffer, self._pos)
@@ -0,0 +1,130 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offload of CPU heavy work, like decoding large upstream responses, to an executor."""
+
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+OFFLOADED = Counter(
+    "cwaf_offloaded_tasks_total", "Tasks run in the offload executor", ["endpoint"]
+)
+PENDING = Gauge(
+    "cwaf_offload_pending_tasks", "Tasks queued or running in the offload executor"
+)
+QUEUE_TIME = Histogram(
+    "cwaf_offload_queue_seconds",
+    "Time offloaded tasks waited for a worker",
+    ["endpoint"],
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+RUN_TIME = Histogram(
+    "cwaf_offload_run_seconds",
+    "Time offloaded tasks ran in a worker",
+    ["endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+OFFLOADER = None
+
+
+def _run_timed(
+    func: Callable[..., T], args: tuple, submitted_at: float
+) -> tuple[float, float, T]:
+    """Run func in a worker, returning its queue and run times along its result."""
+    started_at = time.monotonic()
+    result = func(*args)
+    return started_at - submitted_at, time.monotonic() - started_at, result
+
+
+class Offloader:
+    """
+    Run CPU heavy work in a thread or process pool, off the event loop.
+
+    Work above `threshold` bytes is worth offloading, smaller work runs faster
+    inline than the hand-off to a worker.
+    """
+
+    def __init__(self, executor: Executor, threshold: int):
+        self.executor = executor
+        self.threshold = threshold
+
+    async def run(self, endpoint: str, func: Callable[..., T], *args: Any) -> T:
+        """Run func(*args) in the executor."""
+        OFFLOADED.labels(endpoint=endpoint).inc()
+        PENDING.inc()
+        try:
+            (
+                queue_time,
+                run_time,
+                result,
+            ) = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _run_timed, func, args, time.monotonic()
+            )
+        finally:
+            PENDING.dec()
+        QUEUE_TIME.labels(endpoint=endpoint).observe(max(0.0, queue_time))
+        RUN_TIME.labels(endpoint=endpoint).observe(run_time)
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_offloader_from_config() -> Offloader:
+    """Create the offloader configured by the OFFLOAD_* environment variables."""
+    kind = os.environ.get("OFFLOAD_EXECUTOR", "thread").lower()
+    max_workers = int(
+        os.environ.get("OFFLOAD_MAX_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    if kind == "thread":
+        executor = ThreadPoolExecutor(max_workers, thread_name_prefix="cwaf-offload")
+    elif kind == "process":
+        executor = ProcessPoolExecutor(max_workers)
+    else:
+        raise ValueError(f"Unknown OFFLOAD_EXECUTOR: {kind!r}")
+    logger.info("Offloading large responses to a %s pool of %d", kind, max_workers)
+    return Offloader(
+        executor, int(os.environ.get("OFFLOAD_THRESHOLD_BYTES", "1048576"))
+    )
+
+
+def get_offloader() -> Optional[Offloader]:
+    """Get the process wide offloader, None when offloading is disabled."""
+    global OFFLOADER
+    if os.environ.get("OFFLOAD_ENABLED", "false").lower() != "true":
+        return None
+    if OFFLOADER is None:
+        OFFLOADER = create_offloader_from_config()
+    return OFFLOADER
+
+
+def shutdown_offloader() -> None:
+    """Stop the workers of the offloader, if one was started."""
+    global OFFLOADER
+    if OFFLOADER is not None:
+        OFFLOADER.shutdown()
+        OFFLOADER = None
@@ -0,0 +1,180 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Self-tuning connection limits per upstream host."""
+
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+from aiohttp.client_reqrep import ConnectionKey
+from prometheus_client import Counter, Gauge
+
+from cwaf_external_mcp.httpclient.priority_lanes import resize_priority_gate
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+HOST_LIMIT = Gauge(
+    "cwaf_connection_pool_host_limit", "Connection limit of an upstream host", ["host"]
+)
+RESIZES = Counter(
+    "cwaf_connection_pool_resizes_total",
+    "Connection limit changes of an upstream host",
+    ["host", "direction"],
+)
+
+POOL_TUNER = None
+
+
+def host_label(key: ConnectionKey) -> str:
+    """Generate a host label for Prometheus metrics from a ConnectionKey."""
+    # key.host already includes the port for Unix / proxy cases
+    return f"{key.host}:{key.port or (443 if key.ssl else 80)}"
+
+
+@dataclass
+class HostPoolStats:
+    """Pool usage of a host since the last tuning."""
+
+    peak_busy: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+
+
+class TunedTCPConnector(aiohttp.TCPConnector):
+    """
+    TCPConnector with its own connection limit per host.
+
+    It records the peak of busy connections and the pool waits of each host,
+    from which the PoolTuner resizes the limits. It overrides private members
+    of aiohttp.TCPConnector, hence the upper bound of the aiohttp dependency.
+    """
+
+    def __init__(self, host_limit: int, **kwargs):
+        super().__init__(limit_per_host=host_limit, **kwargs)
+        self.default_host_limit = host_limit
+        self.host_limits: dict[ConnectionKey, int] = {}
+        self.host_stats: defaultdict[ConnectionKey, HostPoolStats] = defaultdict(
+            HostPoolStats
+        )
+
+    def get_host_limit(self, key: ConnectionKey) -> int:
+        """Get the connection limit of a host."""
+        return self.host_limits.get(key, self.default_host_limit)
+
+    def set_host_limit(self, key: ConnectionKey, limit: int) -> None:
+        """Resize the connection limit of a host."""
+        added = limit - self.get_host_limit(key)
+        self.host_limits[key] = limit
+        # hand the new slots over to the requests already waiting
+        for _ in range(added):
+            self._release_waiter()
+
+    async def connect(self, req, traces, timeout) -> aiohttp.connector.Connection:
+        connection = await super().connect(req, traces, timeout)
+        key = req.connection_key
+        stats = self.host_stats[key]
+        busy = len(self._acquired_per_host.get(key, ()))
+        stats.peak_busy = max(stats.peak_busy, busy)
+        return connection
+
+    def _available_connections(self, key: ConnectionKey) -> int:
+        total_remain = 1
+        if self._limit and (total_remain := self._limit - len(self._acquired)) <= 0:
+            return total_remain
+        acquired = len(self._acquired_per_host.get(key, ()))
+        return min(total_remain, self.get_host_limit(key) - acquired)
+
+    async def _wait_for_available_connection(self, key: ConnectionKey, traces) -> None:
+        started_at = time.monotonic()
+        try:
+            await super()._wait_for_available_connection(key, traces)
+        finally:
+            stats = self.host_stats[key]
+            stats.waits += 1
+            stats.wait_seconds += time.monotonic() - started_at
+
+
+class PoolTuner:
+    """
+    Resize the connection limit of each host between floor and ceiling.
+
+    A host whose requests waited on average more than wait_threshold for a
+    connection grows by half. A host that did not wait, used less than half of
+    its limit at peak and kept idle connections shrinks by a quarter.
+    """
+
+    def __init__(self, floor: int, ceiling: int, wait_threshold: float):
+        self.floor = floor
+        self.ceiling = max(ceiling, floor)
+        self.wait_threshold = wait_threshold
+
+    def tune(self, connector: TunedTCPConnector) -> None:
+        """Resize the limits from the pool usage since the last tuning."""
+        for key in set(connector._conns) | set(connector.host_stats):
+            stats = connector.host_stats.pop(key, HostPoolStats())
+            idle = len(connector._conns.get(key, ()))
+            stats.peak_busy = max(
+                stats.peak_busy, len(connector._acquired_per_host.get(key, ()))
+            )
+            limit = connector.get_host_limit(key)
+            new_limit = self.get_limit(limit, stats, idle)
+            host = host_label(key)
+            if new_limit != limit:
+                logger.info(
+                    "Resizing the connection pool of %s from %d to %d "
+                    "(peak busy %d, idle %d, %d waits of %.3fs on average)",
+                    host,
+                    limit,
+                    new_limit,
+                    stats.peak_busy,
+                    idle,
+                    stats.waits,
+                    stats.wait_seconds / stats.waits if stats.waits else 0.0,
+                )
+                direction = "up" if new_limit > limit else "down"
+                RESIZES.labels(host=host, direction=direction).inc()
+                connector.set_host_limit(key, new_limit)
+                resize_priority_gate(host, new_limit)
+            HOST_LIMIT.labels(host=host).set(new_limit)
+
+    def get_limit(self, limit: int, stats: HostPoolStats, idle: int) -> int:
+        """Get the new connection limit of a host."""
+        if stats.waits and stats.wait_seconds / stats.waits >= self.wait_threshold:
+            limit += max(1, limit // 2)
+        elif not stats.waits and idle and stats.peak_busy * 2 < limit:
+            limit -= max(1, limit // 4)
+        return min(self.ceiling, max(self.floor, limit))
+
+
+def get_pool_tuner() -> Optional[PoolTuner]:
+    """Get the process wide pool tuner, None when pool tuning is disabled."""
+    global POOL_TUNER
+    if os.environ.get("POOL_TUNING_ENABLED", "false").lower() != "true":
+        return None
+    if POOL_TUNER is None:
+        POOL_TUNER = PoolTuner(
+            floor=int(os.environ.get("POOL_TUNING_MIN", "2")),
+            ceiling=int(
+                os.environ.get(
+                    "POOL_TUNING_MAX", os.environ.get("CONNECTION_POOL_SIZE", "50")
+                )
+            ),
+            wait_threshold=float(os.environ.get("POOL_TUNING_WAIT_THRESHOLD", "0.01")),
+        )
+    return POOL_TUNER
@@ -0,0 +1,143 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Interactive and background lanes sharing the connections of each upstream host."""
+
+import os
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from prometheus_client import Gauge, Histogram
+
+from cwaf_external_mcp.httpclient.slot_queue import SlotQueue
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+QUEUE_TIME = Histogram(
+    "cwaf_upstream_lane_queue_seconds",
+    "Time upstream requests waited for a connection slot of their lane",
+    ["host", "lane"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+IN_FLIGHT = Gauge(
+    "cwaf_upstream_lane_in_flight",
+    "In-flight upstream requests per host and lane",
+    ["host", "lane"],
+)
+QUEUE_DEPTH = Gauge(
+    "cwaf_upstream_lane_queue_depth",
+    "Upstream requests waiting for a connection slot per host and lane",
+    ["host", "lane"],
+)
+
+PRIORITY_GATES: dict[str, "PriorityGate"] = {}
+
+
+class PriorityGate:
+    """
+    Connection slots of one upstream host shared by the interactive and
+    background lanes.
+
+    Interactive requests are always served first. Background requests only use
+    the slots left over, and never the `reserved` slots kept for interactive ones.
+    """
+
+    def __init__(self, host: str, capacity: int, reserved: int):
+        self.host = host
+        self.capacity = capacity
+        self.background_limit = max(0, capacity - reserved)
+        self.in_flight = {lane: 0 for lane in LANES}
+        self._waiters = {lane: SlotQueue(self._export) for lane in LANES}
+        self._export()
+
+    async def acquire(self, lane: str) -> None:
+        """Wait for a slot of the lane."""
+        started_at = time.monotonic()
+        if self._can_start(lane) and not self._waiters[INTERACTIVE]:
+            if lane == INTERACTIVE or not self._waiters[BACKGROUND]:
+                self._start(lane)
+                QUEUE_TIME.labels(host=self.host, lane=lane).observe(0)
+                return
+        await self._waiters[lane].wait(lambda: self.release(lane))
+        QUEUE_TIME.labels(host=self.host, lane=lane).observe(
+            time.monotonic() - started_at
+        )
+
+    def release(self, lane: str) -> None:
+        """Release a slot and hand the free slots over, interactive lane first."""
+        self.in_flight[lane] -= 1
+        self._wake_up()
+
+    def resize(self, capacity: int, reserved: int) -> None:
+        """Follow a new connection limit of the host."""
+        self.capacity = capacity
+        self.background_limit = max(0, capacity - reserved)
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        for waiting_lane in LANES:
+            self._waiters[waiting_lane].wake_up(
+                lambda: self._can_start(waiting_lane),
+                lambda: self._start(waiting_lane),
+            )
+        self._export()
+
+    def _can_start(self, lane: str) -> bool:
+        if sum(self.in_flight.values()) >= self.capacity:
+            return False
+        return lane == INTERACTIVE or self.in_flight[lane] < self.background_limit
+
+    def _start(self, lane: str) -> None:
+        self.in_flight[lane] += 1
+        self._export()
+
+    def _export(self) -> None:
+        for lane in LANES:
+            IN_FLIGHT.labels(host=self.host, lane=lane).set(self.in_flight[lane])
+            QUEUE_DEPTH.labels(host=self.host, lane=lane).set(len(self._waiters[lane]))
+
+
+def url_host(url: str) -> str:
+    """Get the host:port label of a URL, as the connection pool labels its hosts."""
+    parts = urlsplit(url)
+    return f"{parts.hostname}:{parts.port or (443 if parts.scheme == 'https' else 80)}"
+
+
+def _reserved(capacity: int) -> int:
+    return int(
+        os.environ.get("PRIORITY_INTERACTIVE_RESERVED", str(max(1, capacity // 4)))
+    )
+
+
+def get_priority_gate(host: str) -> Optional[PriorityGate]:
+    """Get the priority gate of an upstream host, None when the lanes are disabled."""
+    if os.environ.get("PRIORITY_LANES_ENABLED", "false").lower() != "true":
+        return None
+    gate = PRIORITY_GATES.get(host)
+    if gate is None:
+        # the per host limit of the connector, resized with it by the pool tuner
+        capacity = int(os.environ.get("CONNECTION_POOL_MAX_KEEP_ALIVE", "20"))
+        gate = PriorityGate(host, capacity=capacity, reserved=_reserved(capacity))
+        PRIORITY_GATES[host] = gate
+    return gate
+
+
+def resize_priority_gate(host: str, capacity: int) -> None:
+    """Resize the priority gate of a host to its new connection limit."""
+    gate = PRIORITY_GATES.get(host)
+    if gate is not None:
+        gate.resize(capacity, _reserved(capacity))
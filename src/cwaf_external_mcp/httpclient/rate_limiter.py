@@ -0,0 +1,159 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Client-side token bucket per API credential, tuned from the upstream rate-limit headers."""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Mapping, Optional
+
+from prometheus_client import Counter, Histogram
+
+from cwaf_external_mcp.httpclient.retry import parse_retry_after
+
+QUEUE_WAIT = Histogram(
+    "cwaf_upstream_rate_limit_wait_seconds",
+    "Time upstream requests waited for a rate limit token",
+    ["endpoint"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+THROTTLED = Counter(
+    "cwaf_upstream_throttled_total",
+    "Upstream requests queued by the local rate limiter or throttled by the upstream",
+    ["endpoint", "source"],
+)
+
+# bound on the number of credentials whose bucket is kept
+_MAX_BUCKETS = 1024
+
+RATE_LIMITERS: Optional["RateLimiters"] = None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, up to `burst` tokens.
+
+    The waiters are served in order. The bucket is paused, without tokens, until
+    the upstream rate-limit window resets.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.default_rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, endpoint: str) -> None:
+        """Wait for a token."""
+        started_at = time.monotonic()
+        async with self._lock:
+            wait = self._get_wait()
+            if wait > 0:
+                THROTTLED.labels(endpoint=endpoint, source="local").inc()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self._get_wait()
+            self.tokens -= 1
+        QUEUE_WAIT.labels(endpoint=endpoint).observe(time.monotonic() - started_at)
+
+    def update(
+        self, endpoint: str, status: int, headers: Optional[Mapping[str, str]]
+    ) -> None:
+        """Tune the bucket with the rate-limit headers of an upstream response."""
+        if status == 429:
+            THROTTLED.labels(endpoint=endpoint, source="upstream").inc()
+            self.pause(parse_retry_after(headers) or 1 / self.rate)
+            return
+        remaining = _get_number(headers, "RateLimit-Remaining")
+        reset = _get_number(headers, "RateLimit-Reset")
+        if remaining is None or not reset:
+            return
+        if reset > time.time() / 2:
+            # X-RateLimit-Reset is commonly sent as an epoch timestamp
+            reset = max(0.0, reset - time.time())
+        if remaining < 1:
+            self.pause(reset)
+            return
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        self.rate = remaining / reset if reset else self.default_rate
+
+    def pause(self, seconds: float) -> None:
+        """Take all the tokens until seconds from now."""
+        self.tokens = 0.0
+        self.updated_at = max(self.updated_at, time.monotonic() + seconds)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now > self.updated_at:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+
+    def _get_wait(self) -> float:
+        """Seconds before a token is available."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        paused = max(0.0, self.updated_at - time.monotonic())
+        return paused + (1 - self.tokens) / self.rate
+
+
+class RateLimiters:
+    """Token buckets per credential fingerprint, least recently used evicted first."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def get_bucket(self, credential: str) -> TokenBucket:
+        """Get the bucket of a credential."""
+        bucket = self._buckets.get(credential)
+        if bucket is None:
+            bucket = self._buckets[credential] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > _MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(credential)
+        return bucket
+
+
+def _get_number(headers: Optional[Mapping[str, str]], name: str) -> Optional[float]:
+    """Read a numeric rate-limit header, with or without the X- prefix."""
+    if not headers:
+        return None
+    value = headers.get(name, headers.get(f"X-{name}"))
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def get_rate_limiters() -> Optional[RateLimiters]:
+    """Get the process wide rate limiters, None when rate limiting is disabled."""
+    global RATE_LIMITERS
+    if os.environ.get("RATE_LIMIT_ENABLED", "false").lower() != "true":
+        return None
+    if RATE_LIMITERS is None:
+        rate = float(os.environ.get("RATE_LIMIT_REQUESTS_PER_SECOND", "10"))
+        RATE_LIMITERS = RateLimiters(
+            rate=rate, burst=float(os.environ.get("RATE_LIMIT_BURST", str(rate)))
+        )
+    return RATE_LIMITERS
@@ -0,0 +1,122 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per phase timings of the upstream requests (pool wait, DNS, connect, TTFB, body)."""
+
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional
+
+import aiohttp
+from prometheus_client import Histogram
+
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+PHASE_DURATION = Histogram(
+    "cwaf_upstream_phase_duration_seconds",
+    "Duration of the phases of the upstream requests",
+    ["endpoint", "phase"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+@dataclass
+class RequestTimings:
+    """
+    Phase durations of one upstream request, tagged with the current trace id.
+
+    The durations are exported with the trace id as exemplar, so a slow tool
+    call can be broken down afterwards.
+    """
+
+    endpoint: str
+    trace_id: Optional[str] = field(
+        default_factory=context_manager.get_current_trace_id
+    )
+    phases: dict[str, float] = field(default_factory=dict)
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """Record the duration of a phase."""
+        self.phases[phase] = seconds
+        # OpenMetrics caps the exemplar labels at 128 characters
+        exemplar = {"trace_id": self.trace_id[:64]} if self.trace_id else None
+        PHASE_DURATION.labels(endpoint=self.endpoint, phase=phase).observe(
+            seconds, exemplar
+        )
+
+    def log(self) -> None:
+        """Log the phase durations of the request."""
+        logger.info(
+            "upstream %s timings: %s",
+            self.endpoint,
+            " ".join(
+                f"{phase}={seconds:.4f}s" for phase, seconds in self.phases.items()
+            ),
+        )
+
+
+def build_trace_config() -> aiohttp.TraceConfig:
+    """
+    Build the TraceConfig timing the phases of the requests.
+
+    The requests must pass a RequestTimings as trace_request_ctx. connect
+    covers the TCP and TLS handshakes, which aiohttp does not tell apart.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def on(signal, name: str):
+        async def record(
+            session: aiohttp.ClientSession, ctx: SimpleNamespace, params
+        ) -> None:
+            if isinstance(ctx.trace_request_ctx, RequestTimings):
+                setattr(ctx, name, time.monotonic())
+
+        signal.append(record)
+
+    on(trace_config.on_request_start, "request_start")
+    on(trace_config.on_connection_queued_start, "queued_start")
+    on(trace_config.on_connection_queued_end, "queued_end")
+    on(trace_config.on_dns_resolvehost_start, "dns_start")
+    on(trace_config.on_dns_resolvehost_end, "dns_end")
+    on(trace_config.on_connection_create_start, "connect_start")
+    on(trace_config.on_connection_create_end, "connect_end")
+    on(trace_config.on_request_headers_sent, "headers_sent")
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+async def _on_request_end(
+    session: aiohttp.ClientSession,
+    ctx: SimpleNamespace,
+    params: aiohttp.TraceRequestEndParams,
+) -> None:
+    """Observe the phases once the response headers are received."""
+    timings = ctx.trace_request_ctx
+    if not isinstance(timings, RequestTimings):
+        return
+    now = time.monotonic()
+    phases = vars(ctx)
+    if "queued_end" in phases:
+        timings.observe("pool_wait", ctx.queued_end - ctx.queued_start)
+    dns = 0.0
+    if "dns_end" in phases:
+        dns = ctx.dns_end - ctx.dns_start
+        timings.observe("dns", dns)
+    if "connect_end" in phases:
+        timings.observe("connect", ctx.connect_end - ctx.connect_start - dns)
+    timings.observe("ttfb", now - phases.get("headers_sent", ctx.request_start))
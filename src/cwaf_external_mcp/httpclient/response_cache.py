@@ -0,0 +1,192 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process TTL + LRU cache for decoded upstream responses."""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+from prometheus_client import Counter, Gauge
+
+CACHE_HITS = Counter(
+    "cwaf_response_cache_hits_total", "Response cache hits", ["endpoint"]
+)
+CACHE_STALE_HITS = Counter(
+    "cwaf_response_cache_stale_hits_total",
+    "Response cache hits served stale while revalidating",
+    ["endpoint"],
+)
+CACHE_MISSES = Counter(
+    "cwaf_response_cache_misses_total", "Response cache misses", ["endpoint"]
+)
+CACHE_STALE_IF_ERROR = Counter(
+    "cwaf_response_cache_stale_if_error_total",
+    "Stale responses served because the upstream failed",
+    ["endpoint"],
+)
+CACHE_EVICTIONS = Counter(
+    "cwaf_response_cache_evictions_total", "Response cache LRU evictions"
+)
+CACHE_REVALIDATIONS = Counter(
+    "cwaf_response_cache_revalidations_total",
+    "Conditional revalidations of expired responses by result (not_modified/modified)",
+    ["endpoint", "result"],
+)
+CACHE_BYTES = Gauge("cwaf_response_cache_bytes", "Bytes held by the response cache")
+
+RESPONSE_CACHE = None
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its size and freshness deadlines."""
+
+    value: Any
+    size: int
+    expires_at: float
+    stale_until: float
+    error_until: float
+
+    def is_fresh(self, now: float) -> bool:
+        """Whether the entry can be served without revalidation."""
+        return now < self.expires_at
+
+    def is_usable(self, now: float) -> bool:
+        """Whether the entry can still be served, possibly as stale."""
+        return now < self.stale_until
+
+    def is_retained(self, now: float) -> bool:
+        """Whether the entry can still be served when the upstream fails."""
+        return now < self.error_until
+
+
+class ResponseCache:
+    """LRU cache bounded by the total byte size of the cached responses."""
+
+    def __init__(
+        self, max_bytes: int, stale_ttl: float, stale_if_error_ttl: float = 0.0
+    ):
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.stale_if_error_ttl = max(stale_ttl, stale_if_error_ttl)
+        self.current_bytes = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, endpoint: str = "*") -> Optional[CacheEntry]:
+        """Get a usable entry (fresh or stale) and count the hit or miss."""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and not entry.is_usable(now):
+            if not entry.is_retained(now):
+                self._remove(key)
+            entry = None
+        if entry is None:
+            CACHE_MISSES.labels(endpoint=endpoint).inc()
+            return None
+        self._entries.move_to_end(key)
+        if entry.is_fresh(now):
+            CACHE_HITS.labels(endpoint=endpoint).inc()
+        else:
+            CACHE_STALE_HITS.labels(endpoint=endpoint).inc()
+        return entry
+
+    def get_if_error(self, key: Hashable, endpoint: str = "*") -> Optional[CacheEntry]:
+        """Get an entry, however stale, to serve instead of an upstream error."""
+        entry = self._entries.get(key)
+        if entry is None or not entry.is_retained(time.monotonic()):
+            return None
+        CACHE_STALE_IF_ERROR.labels(endpoint=endpoint).inc()
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Get a retained entry, however stale, without counting a hit or miss."""
+        entry = self._entries.get(key)
+        if entry is None or not entry.is_retained(time.monotonic()):
+            return None
+        return entry
+
+    def put(self, key: Hashable, value: Any, size: int, ttl: float) -> None:
+        """Store a value for ttl seconds, evicting least recently used entries."""
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        now = time.monotonic()
+        self._entries[key] = CacheEntry(
+            value=value,
+            size=size,
+            expires_at=now + ttl,
+            stale_until=now + ttl + self.stale_ttl,
+            error_until=now + ttl + self.stale_if_error_ttl,
+        )
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            CACHE_EVICTIONS.inc()
+        CACHE_BYTES.set(self.current_bytes)
+
+    def clear(self) -> None:
+        """Drop all the cached entries."""
+        self._entries.clear()
+        self.current_bytes = 0
+        CACHE_BYTES.set(0)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+        CACHE_BYTES.set(self.current_bytes)
+
+
+def credential_fingerprint(headers: dict[str, str]) -> str:
+    """Hash the request headers so credentials are never kept in cache keys."""
+    digest = hashlib.sha256()
+    for name, value in sorted((k.lower(), v) for k, v in headers.items()):
+        digest.update(f"{name}={value}\n".encode())
+    return digest.hexdigest()
+
+
+def build_cache_key(url: str, params: dict, headers: dict[str, str]) -> tuple:
+    """Build the cache key out of the URL, normalized params and credentials."""
+    normalized_params = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+    return url, normalized_params, credential_fingerprint(headers)
+
+
+def get_ttl(endpoint: str) -> float:
+    """Get the TTL in seconds configured for an upstream endpoint."""
+    default_ttl = os.environ.get("RESPONSE_CACHE_TTL", "30")
+    return float(os.environ.get(f"RESPONSE_CACHE_TTL_{endpoint.upper()}", default_ttl))
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process wide response cache, None when caching is disabled."""
+    global RESPONSE_CACHE
+    if os.environ.get("RESPONSE_CACHE_ENABLED", "false").lower() != "true":
+        return None
+    if RESPONSE_CACHE is None:
+        RESPONSE_CACHE = ResponseCache(
+            max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", "67108864")),
+            stale_ttl=float(os.environ.get("RESPONSE_CACHE_STALE_TTL", "30")),
+            stale_if_error_ttl=float(
+                os.environ.get("RESPONSE_CACHE_STALE_IF_ERROR_TTL", "300")
+            ),
+        )
+    return RESPONSE_CACHE
@@ -0,0 +1,206 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Retry policy for idempotent upstream GET requests."""
+
+import asyncio
+import email.utils
+import os
+import random
+import time
+from typing import Awaitable, Callable, Mapping, Optional, TypeVar
+
+import aiohttp
+from prometheus_client import Counter, Gauge
+
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+# error raised when a pooled keep-alive connection was closed by the server, other
+# OS errors (connection refused, reset, DNS) go through the budgeted retries
+STALE_CONNECTION_ERRORS = (aiohttp.ServerDisconnectedError,)
+
+RETRIES = Counter(
+    "cwaf_upstream_retries_total", "Upstream request retries", ["endpoint", "reason"]
+)
+GIVE_UPS = Counter(
+    "cwaf_upstream_retry_give_ups_total",
+    "Upstream requests that failed after retrying or without retry budget",
+    ["endpoint", "reason"],
+)
+BUDGET_TOKENS = Gauge("cwaf_upstream_retry_budget_tokens", "Available retry tokens")
+
+RETRY_POLICY = None
+
+
+class RetryBudget:
+    """
+    Per-process retry budget.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so
+    retries stay a bounded fraction of the traffic and do not amplify outages.
+    """
+
+    def __init__(
+        self,
+        ratio: float,
+        min_tokens: float,
+        max_tokens: float,
+        gauge: Gauge = BUDGET_TOKENS,
+    ):
+        self.ratio = ratio
+        self.max_tokens = max(max_tokens, min_tokens)
+        self.tokens = float(min_tokens)
+        self.gauge = gauge
+        self.gauge.set(self.tokens)
+
+    def deposit(self) -> None:
+        """Account a new request."""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+        self.gauge.set(self.tokens)
+
+    def withdraw(self) -> bool:
+        """Take a token for a retry, False when the budget is exhausted."""
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.gauge.set(self.tokens)
+        return True
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring Retry-After."""
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: RetryBudget,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    async def call(self, func: Callable[[], Awaitable[T]], endpoint: str = "*") -> T:
+        """
+        Call func, retrying transient failures.
+
+        func must return an object with `status` and `headers` attributes.
+        Responses with a retryable status are returned as is once the retries are
+        exhausted, connection errors are raised.
+        """
+        self.budget.deposit()
+        attempt = 1
+        stale_connection_retried = False
+        while True:
+            error = None
+            response = None
+            retry_after = None
+            try:
+                response = await func()
+            except STALE_CONNECTION_ERRORS as e:
+                if not stale_connection_retried:
+                    # the pooled connection was closed while idle, retry at once
+                    stale_connection_retried = True
+                    RETRIES.labels(endpoint=endpoint, reason="stale_connection").inc()
+                    continue
+                error = e
+                reason = "connection_error"
+            except aiohttp.ClientConnectionError as e:
+                error = e
+                reason = "connection_error"
+            else:
+                if response.status not in RETRYABLE_STATUSES:
+                    return response
+                reason = str(response.status)
+                retry_after = parse_retry_after(response.headers)
+
+            delay = self.get_delay(attempt, retry_after)
+            remaining = context_manager.get_remaining_time()
+            if (
+                attempt >= self.max_attempts
+                or delay is None
+                or (remaining is not None and delay >= remaining)
+                or not self.budget.withdraw()
+            ):
+                GIVE_UPS.labels(endpoint=endpoint, reason=reason).inc()
+                if error is not None:
+                    raise error
+                return response
+
+            logger.warning(
+                "Retrying %s request in %.2fs (attempt %s, reason %s)",
+                endpoint,
+                delay,
+                attempt,
+                reason,
+            )
+            RETRIES.labels(endpoint=endpoint, reason=reason).inc()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def get_delay(
+        self, attempt: int, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Get the delay before the next attempt.
+
+        Returns None when the upstream asked to wait longer than max_delay.
+        """
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get the process wide retry policy."""
+    global RETRY_POLICY
+    if RETRY_POLICY is None:
+        RETRY_POLICY = RetryPolicy(
+            max_attempts=int(os.environ.get("RETRY_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.environ.get("RETRY_BASE_DELAY", "0.2")),
+            max_delay=float(os.environ.get("RETRY_MAX_DELAY", "5.0")),
+            budget=RetryBudget(
+                ratio=float(os.environ.get("RETRY_BUDGET_RATIO", "0.1")),
+                min_tokens=float(os.environ.get("RETRY_BUDGET_MIN_TOKENS", "10")),
+                max_tokens=float(os.environ.get("RETRY_BUDGET_MAX_TOKENS", "100")),
+            ),
+        )
+    return RETRY_POLICY
@@ -0,0 +1,79 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Single-flight coalescing of identical in-flight requests."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from prometheus_client import Counter
+
+COALESCED = Counter(
+    "cwaf_single_flight_coalesced_total",
+    "Requests served by joining an identical in-flight request",
+    ["endpoint"],
+)
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers of the same key."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        endpoint: str = "*",
+    ) -> Any:
+        """
+        Run func, or join the call already running for the same key.
+
+        The call runs in its own task, so a cancelled caller does not cancel it
+        for the callers still waiting on it. It is cancelled once no caller
+        waits for it anymore.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            COALESCED.labels(endpoint=endpoint).inc()
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # mark the exception as retrieved when every caller was cancelled
+            task.exception()
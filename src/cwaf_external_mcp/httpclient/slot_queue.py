@@ -0,0 +1,64 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Queue of the requests waiting for a slot of a concurrency limit."""
+
+import asyncio
+from collections import deque
+from typing import Callable
+
+
+class SlotQueue:
+    """
+    Requests waiting for a slot, served in arrival order.
+
+    The owner of the slots counts them: it hands the free slots over with
+    wake_up, and gets back the slot handed over to a request cancelled meanwhile.
+    on_change is called whenever the queue grows or shrinks.
+    """
+
+    def __init__(self, on_change: Callable[[], None] = lambda: None):
+        self._on_change = on_change
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    async def wait(self, give_back: Callable[[], None]) -> None:
+        """Wait for a slot, calling give_back when it comes after a cancellation."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._on_change()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over after the cancellation, give it back
+                give_back()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._on_change()
+            raise
+
+    def wake_up(self, can_start: Callable[[], bool], start: Callable[[], None]) -> None:
+        """Hand slots over to the waiting requests while can_start allows it."""
+        woken = False
+        while self._waiters and can_start():
+            waiter = self._waiters.popleft()
+            woken = True
+            if not waiter.done():
+                start()
+                waiter.set_result(None)
+        if woken:
+            self._on_change()
@@ -0,0 +1,559 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Upstream GET pipeline in front of the aiohttp client."""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Hashable, Mapping, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.httpclient.aiohttp_client import get_async_client
+from cwaf_external_mcp.httpclient.bulkhead import get_bulkhead
+from cwaf_external_mcp.httpclient.circuit_breaker import (
+    UPSTREAM_ERRORS,
+    get_circuit_breaker,
+    is_failure_status,
+)
+from cwaf_external_mcp.httpclient.concurrency_limiter import get_concurrency_limiter
+from cwaf_external_mcp.httpclient.hedging import get_hedging_policy
+from cwaf_external_mcp.httpclient.json_stream import StreamingJsonDecoder
+from cwaf_external_mcp.httpclient.offload import get_offloader
+from cwaf_external_mcp.httpclient.priority_lanes import (
+    BACKGROUND,
+    INTERACTIVE,
+    get_priority_gate,
+    url_host,
+)
+from cwaf_external_mcp.httpclient.rate_limiter import get_rate_limiters
+from cwaf_external_mcp.httpclient.request_tracing import RequestTimings
+from cwaf_external_mcp.httpclient.response_cache import (
+    CACHE_REVALIDATIONS,
+    ResponseCache,
+    build_cache_key,
+    credential_fingerprint,
+    get_response_cache,
+    get_ttl,
+)
+from cwaf_external_mcp.httpclient.retry import get_retry_policy
+from cwaf_external_mcp.httpclient.single_flight import SingleFlight
+from cwaf_external_mcp.utilities.json_codec import get_json_codec
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+UPSTREAM_ENDPOINTS = ("sites", "domains", "policies", "rules")
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+REFRESH_TASKS: dict[Hashable, asyncio.Task] = {}
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+@dataclass
+class UpstreamResponse:
+    """
+    Status and decoded body of an upstream response.
+
+    stale is set on cached responses served because the upstream failed. source
+    tells where the response was served from: upstream, cache, coalesced (by
+    joining an identical in-flight request) or batched (split out of a multi-ID
+    request).
+    """
+
+    status: int
+    body: Any
+    size: int = 0
+    headers: Mapping[str, str] = field(default_factory=dict)
+    stale: bool = False
+    source: str = "upstream"
+
+
+@dataclass
+class UpstreamRequest:
+    """
+    A GET request to an upstream API.
+
+    item_mapper, when given, is applied to each item of the `data` array of a
+    successful response as it is decoded. conditional_headers are sent along
+    with headers but are not part of the cache key.
+    """
+
+    url: str
+    params: dict
+    headers: dict
+    item_mapper: Optional[Callable[[Any], Any]] = None
+    conditional_headers: dict = field(default_factory=dict)
+    endpoint: str = field(init=False)
+    key: tuple = field(init=False)
+
+    def __post_init__(self):
+        self.endpoint = endpoint_label(self.url)
+        mapper_name = (
+            f"{self.item_mapper.__module__}.{self.item_mapper.__qualname__}"
+            if self.item_mapper is not None
+            else None
+        )
+        self.key = (*build_cache_key(self.url, self.params, self.headers), mapper_name)
+
+
+class ResponseTooLargeError(Exception):
+    """Raised when an upstream response exceeds MAX_RESPONSE_BYTES."""
+
+    def __init__(self, url: str, max_bytes: int):
+        super().__init__(f"response of {url} exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class DeadlineExceededError(Exception):
+    """Raised when the deadline of the tool call passes before the response."""
+
+    def __init__(self, url: str):
+        super().__init__(f"deadline exceeded requesting {url}")
+
+
+def endpoint_label(url: str) -> str:
+    """Get the upstream endpoint template (sites/domains/policies/rules) of a URL."""
+    path = urlparse(url).path
+    for endpoint in UPSTREAM_ENDPOINTS:
+        if f"/v3/{endpoint}" in path:
+            return endpoint
+    return "other"
+
+
+async def get_json(
+    url: str,
+    params: dict,
+    headers: dict,
+    item_mapper: Optional[Callable[[Any], Any]] = None,
+) -> UpstreamResponse:
+    """
+    GET an upstream URL and decode its JSON body.
+
+    When the response cache is enabled, successful responses are cached per
+    (URL, params, credentials). Expired entries are still served during the
+    stale window while a background refresh revalidates them, and served marked as
+    stale when the upstream fails, its circuit breaker is open or its bulkhead full.
+    Concurrent identical requests share a single upstream call.
+    """
+    request = UpstreamRequest(url, params, headers, item_mapper)
+    cache = get_response_cache()
+    if cache is None:
+        return await _load(cache, request)
+
+    cached = _get_cached(cache, request)
+    if cached is not None:
+        return cached
+
+    try:
+        response = await _load(cache, request)
+    except UPSTREAM_ERRORS:
+        stale_response = _get_stale_if_error(cache, request)
+        if stale_response is None:
+            raise
+        return stale_response
+    if is_failure_status(response.status):
+        return _get_stale_if_error(cache, request) or response
+    return response
+
+
+def get_cached_json(
+    url: str,
+    params: dict,
+    headers: dict,
+    item_mapper: Optional[Callable[[Any], Any]] = None,
+) -> Optional[UpstreamResponse]:
+    """Get the cached response of a GET request, None when it is not cached."""
+    cache = get_response_cache()
+    if cache is None:
+        return None
+    return _get_cached(cache, UpstreamRequest(url, params, headers, item_mapper))
+
+
+def cache_json(
+    url: str,
+    params: dict,
+    headers: dict,
+    item_mapper: Optional[Callable[[Any], Any]],
+    response: UpstreamResponse,
+) -> None:
+    """Cache the response of a GET request obtained without get_json."""
+    cache = get_response_cache()
+    if cache is not None:
+        _store(cache, UpstreamRequest(url, params, headers, item_mapper), response)
+
+
+def _get_cached(
+    cache: ResponseCache, request: UpstreamRequest
+) -> Optional[UpstreamResponse]:
+    """Get a usable cached response, refreshing it in the background when stale."""
+    entry = cache.get(request.key, request.endpoint)
+    if entry is None:
+        return None
+    if not entry.is_fresh(time.monotonic()):
+        _schedule_refresh(cache, request)
+    return replace(entry.value, source="cache")
+
+
+def _get_stale_if_error(
+    cache: ResponseCache, request: UpstreamRequest
+) -> Optional[UpstreamResponse]:
+    """Get the cached response marked as stale, to serve instead of an error."""
+    entry = cache.get_if_error(request.key, request.endpoint)
+    if entry is None:
+        return None
+    logger.warning(
+        "Serving stale %s response because the upstream failed", request.endpoint
+    )
+    return replace(entry.value, stale=True, source="cache")
+
+
+async def _load(
+    cache: Optional[ResponseCache], request: UpstreamRequest
+) -> UpstreamResponse:
+    """
+    Request the URL, coalescing identical in-flight requests, and cache it.
+
+    The shared call runs in its own task without the deadline of the caller that
+    started it, each caller only waits for it until its own deadline. Without
+    single-flight the request runs in the caller's task, under its deadline.
+    """
+
+    async def load() -> UpstreamResponse:
+        cached = _get_revalidation_candidate(cache, request)
+        if cached is None:
+            response = await _request(request)
+        else:
+            response = await _revalidate(request, cached)
+        if cache is not None:
+            _store(cache, request, response)
+        return response
+
+    async def load_shared() -> UpstreamResponse:
+        # the context of the single-flight task is a copy, the caller keeps its own
+        context_manager.set_deadline(None)
+        return await load()
+
+    if os.environ.get("SINGLE_FLIGHT_ENABLED", "true").lower() != "true":
+        return await load()
+    joined = request.key in SINGLE_FLIGHT
+    timeout = asyncio.timeout(context_manager.get_remaining_time())
+    try:
+        async with timeout:
+            response = await SINGLE_FLIGHT.do(
+                request.key, load_shared, request.endpoint
+            )
+    except TimeoutError as e:
+        if timeout.expired():
+            raise DeadlineExceededError(request.url) from e
+        raise
+    return replace(response, source="coalesced") if joined else response
+
+
+def _get_revalidation_candidate(
+    cache: Optional[ResponseCache], request: UpstreamRequest
+) -> Optional[UpstreamResponse]:
+    """Get the expired cached response to revalidate, if it has validators."""
+    if (
+        cache is None
+        or os.environ.get("RESPONSE_CACHE_REVALIDATION_ENABLED", "true").lower()
+        != "true"
+    ):
+        return None
+    entry = cache.peek(request.key)
+    if entry is None or not _conditional_headers(entry.value):
+        return None
+    return entry.value
+
+
+def _conditional_headers(response: UpstreamResponse) -> dict[str, str]:
+    """Build the If-None-Match / If-Modified-Since headers of a cached response."""
+    headers = {}
+    if response.headers.get("ETag"):
+        headers["If-None-Match"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        headers["If-Modified-Since"] = response.headers["Last-Modified"]
+    return headers
+
+
+async def _revalidate(
+    request: UpstreamRequest, cached: UpstreamResponse
+) -> UpstreamResponse:
+    """Send a conditional request, reusing the cached entities on 304."""
+    response = await _request(
+        replace(request, conditional_headers=_conditional_headers(cached))
+    )
+    if response.status == 304:
+        CACHE_REVALIDATIONS.labels(
+            endpoint=request.endpoint, result="not_modified"
+        ).inc()
+        return cached
+    if response.status == 200:
+        CACHE_REVALIDATIONS.labels(endpoint=request.endpoint, result="modified").inc()
+    return response
+
+
+async def _request(request: UpstreamRequest) -> UpstreamResponse:
+    """Send the GET request, retrying transient failures."""
+    return await get_retry_policy().call(
+        lambda: _send_throttled(request), request.endpoint
+    )
+
+
+async def _send_throttled(request: UpstreamRequest) -> UpstreamResponse:
+    """
+    Send one GET attempt once the rate limiter of the credential allows it.
+
+    The token is taken before the bulkhead slot and the circuit breaker, so
+    the wait for it neither holds a slot nor counts as a slow call.
+    """
+    rate_limiters = get_rate_limiters()
+    if rate_limiters is None:
+        return await _send_in_bulkhead(request)
+    bucket = rate_limiters.get_bucket(
+        credential_fingerprint(context_manager.get_headers())
+    )
+    try:
+        async with asyncio.timeout(context_manager.get_remaining_time()):
+            await bucket.acquire(request.endpoint)
+    except TimeoutError as e:
+        raise DeadlineExceededError(request.url) from e
+    response = await _send_in_bulkhead(request)
+    bucket.update(request.endpoint, response.status, response.headers)
+    return response
+
+
+async def _send_in_bulkhead(request: UpstreamRequest) -> UpstreamResponse:
+    """
+    Send one GET attempt within the bulkhead of its API.
+
+    The slot is held for the attempt only, not for the backoff between retries.
+    """
+    bulkhead = get_bulkhead(request.endpoint)
+    if bulkhead is None:
+        return await _send(request)
+    try:
+        async with asyncio.timeout(context_manager.get_remaining_time()):
+            await bulkhead.acquire()
+    except TimeoutError as e:
+        raise DeadlineExceededError(request.url) from e
+    try:
+        return await _send(request)
+    finally:
+        bulkhead.release()
+
+
+async def _send(request: UpstreamRequest) -> UpstreamResponse:
+    """Send one GET attempt through the circuit breaker of the upstream."""
+    breaker = get_circuit_breaker(request.endpoint)
+    if breaker is None:
+        return await _send_limited(request)
+    return await breaker.call(
+        lambda: _send_limited(request),
+        lambda response: is_failure_status(response.status),
+    )
+
+
+async def _send_limited(request: UpstreamRequest) -> UpstreamResponse:
+    """Send one GET attempt within the adaptive concurrency limit of the upstream."""
+    limiter = get_concurrency_limiter(request.endpoint)
+    if limiter is None:
+        return await _send_in_lane(request)
+    return await limiter.run(
+        lambda: _send_in_lane(request), lambda response: response.status == 429
+    )
+
+
+async def _send_in_lane(request: UpstreamRequest) -> UpstreamResponse:
+    """Send one GET attempt once a connection slot of its priority lane is free."""
+    gate = get_priority_gate(url_host(request.url))
+    if gate is None:
+        return await _send_hedged(request)
+    lane = BACKGROUND if context_manager.get_priority() == BACKGROUND else INTERACTIVE
+    try:
+        async with asyncio.timeout(context_manager.get_remaining_time()):
+            await gate.acquire(lane)
+    except TimeoutError as e:
+        raise DeadlineExceededError(request.url) from e
+    try:
+        return await _send_hedged(request)
+    finally:
+        gate.release(lane)
+
+
+async def _send_hedged(request: UpstreamRequest) -> UpstreamResponse:
+    """
+    Dispatch one GET attempt, hedged with a duplicate when it is unusually slow.
+
+    Hedging wraps the dispatch only, so the time spent queueing for the rate
+    limiter, the concurrency limiter or the priority lane neither counts
+    toward the hedging threshold nor feeds the latency samples.
+    """
+    policy = get_hedging_policy(request.endpoint)
+    if policy is None:
+        return await _get(request)
+    return await policy.call(
+        lambda: _get(request),
+        lambda response: is_failure_status(response.status),
+    )
+
+
+async def _get(request: UpstreamRequest) -> UpstreamResponse:
+    """Send the GET request, bounded by the time left before the call deadline."""
+    remaining = context_manager.get_remaining_time()
+    if remaining is None:
+        return await _get_response(request)
+    if remaining <= 0:
+        raise DeadlineExceededError(request.url)
+    try:
+        async with asyncio.timeout(remaining):
+            return await _get_response(request)
+    except TimeoutError as e:
+        if context_manager.get_remaining_time() <= 0:
+            raise DeadlineExceededError(request.url) from e
+        raise
+
+
+async def _get_response(request: UpstreamRequest) -> UpstreamResponse:
+    """Send the GET request over the shared HTTP session."""
+    timings = RequestTimings(request.endpoint)
+    response = await get_async_client().get(
+        request.url,
+        headers={**request.headers, **request.conditional_headers},
+        params=request.params,
+        trace_request_ctx=timings,
+    )
+    body_started_at = time.monotonic()
+    logger.info(f"response: {response}")
+    max_bytes = int(os.environ.get("MAX_RESPONSE_BYTES", "52428800"))
+    if response.content_length is not None and response.content_length > max_bytes:
+        response.close()
+        raise ResponseTooLargeError(request.url, max_bytes)
+
+    if (
+        response.status == 200
+        and os.environ.get("STREAMING_DECODE_ENABLED", "false").lower() == "true"
+    ):
+        body, size = await _decode_stream(request, response, max_bytes)
+    else:
+        raw = await response.read()
+        size = len(raw)
+        if size > max_bytes:
+            raise ResponseTooLargeError(request.url, max_bytes)
+        offloader = get_offloader()
+        if offloader is not None and size >= offloader.threshold:
+            body = await offloader.run(
+                request.endpoint,
+                _decode_and_map,
+                response.status,
+                raw,
+                request.item_mapper,
+            )
+        else:
+            body = _decode_and_map(response.status, raw, request.item_mapper)
+    timings.observe("body", time.monotonic() - body_started_at)
+    timings.log()
+    return UpstreamResponse(
+        status=response.status,
+        body=body,
+        size=size,
+        headers=response.headers,
+    )
+
+
+async def _decode_stream(
+    request: UpstreamRequest, response: aiohttp.ClientResponse, max_bytes: int
+) -> tuple[Any, int]:
+    """Decode the body as it arrives, mapping the data items one by one."""
+    decoder = StreamingJsonDecoder(request.item_mapper)
+    size = 0
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            response.close()
+            raise ResponseTooLargeError(request.url, max_bytes)
+        decoder.feed(chunk)
+    return decoder.close(), size
+
+
+def _decode(status: int, raw: bytes) -> Any:
+    """Decode a JSON body, error pages that are not JSON are decoded as None."""
+    if not raw.strip():
+        return None
+    try:
+        return get_json_codec().loads(raw)
+    except ValueError:
+        if status == 200:
+            raise
+        return None
+
+
+def _decode_and_map(
+    status: int, raw: bytes, item_mapper: Optional[Callable[[Any], Any]]
+) -> Any:
+    """Decode a JSON body and map the items of successful responses."""
+    body = _decode(status, raw)
+    if status == 200:
+        _map_items(body, item_mapper)
+    return body
+
+
+def _map_items(body: Any, item_mapper: Optional[Callable[[Any], Any]]) -> None:
+    """
+    Map the items of the data array of a decoded body in place.
+
+    A mapper exposing a `map_page` attribute maps the whole array in one call.
+    """
+    if item_mapper is not None and isinstance(body, dict):
+        if isinstance(body.get("data"), list):
+            map_page = getattr(item_mapper, "map_page", None)
+            if map_page is not None:
+                body["data"] = map_page(body["data"])
+            else:
+                body["data"] = [item_mapper(item) for item in body["data"]]
+
+
+def _store(
+    cache: ResponseCache, request: UpstreamRequest, response: UpstreamResponse
+) -> None:
+    """Cache successful responses only."""
+    if response.status == 200:
+        cache.put(request.key, response, response.size, get_ttl(request.endpoint))
+
+
+def _schedule_refresh(cache: ResponseCache, request: UpstreamRequest) -> None:
+    """Refresh a stale entry in the background, once per key."""
+    if request.key in REFRESH_TASKS:
+        return
+
+    async def refresh() -> None:
+        # the refresh outlives the tool call, it is background work without deadline
+        context_manager.set_priority(BACKGROUND)
+        context_manager.set_deadline(None)
+        try:
+            await _load(cache, request)
+        except Exception:
+            logger.warning(
+                "Background refresh of %s failed", request.url, exc_info=True
+            )
+        finally:
+            REFRESH_TASKS.pop(request.key, None)
+
+    REFRESH_TASKS[request.key] = asyncio.create_task(refresh())
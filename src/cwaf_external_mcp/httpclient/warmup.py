@@ -0,0 +1,103 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pre-open keep-alive connections to the upstream APIs at server startup."""
+
+import asyncio
+import time
+from typing import Iterable
+from urllib.parse import urlparse
+
+from prometheus_client import Gauge
+
+from cwaf_external_mcp.httpclient.aiohttp_client import get_async_client
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+WARMUP_CONNECTIONS = Gauge(
+    "cwaf_connection_warmup_connections",
+    "Connections opened by the startup warm-up",
+    ["host"],
+)
+WARMUP_SECONDS = Gauge(
+    "cwaf_connection_warmup_seconds", "Duration of the startup connection warm-up"
+)
+TIME_TO_FIRST_READY = Gauge(
+    "cwaf_time_to_first_ready_seconds",
+    "Seconds from the server start until it is ready to serve tool calls",
+)
+
+
+def get_origins(urls: Iterable[str]) -> list[str]:
+    """Get the distinct scheme://host[:port] origins of the URLs."""
+    origins = {f"{urlparse(url).scheme}://{urlparse(url).netloc}" for url in urls}
+    return sorted(origins)
+
+
+async def warm_up_connections(
+    urls: Iterable[str], connections_per_host: int, timeout: float
+) -> int:
+    """
+    Open connections_per_host keep-alive connections to each upstream origin.
+
+    The connections are opened by concurrent HEAD requests, which also resolve
+    and cache the DNS records and complete the TLS handshakes. Failures are
+    logged and never fail the startup. Returns the number of connections opened.
+    """
+    start = time.monotonic()
+    client = get_async_client()
+
+    async def open_connection(origin: str) -> bool:
+        try:
+            response = await client.head(origin)
+            await response.read()
+            return True
+        except Exception as e:
+            logger.warning("Warm-up connection to %s failed: %s", origin, e)
+            return False
+
+    tasks = {
+        asyncio.ensure_future(open_connection(origin)): origin
+        for origin in get_origins(urls)
+        for _ in range(connections_per_host)
+    }
+    done, pending = set(), set()
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(
+            "Connection warm-up did not complete within %ss, %d connections pending",
+            timeout,
+            len(pending),
+        )
+    opened_per_origin = dict.fromkeys(tasks.values(), 0)
+    for task in done:
+        opened_per_origin[tasks[task]] += task.result()
+    for origin, opened in opened_per_origin.items():
+        WARMUP_CONNECTIONS.labels(host=urlparse(origin).netloc).set(opened)
+    opened = sum(opened_per_origin.values())
+    elapsed = time.monotonic() - start
+    WARMUP_SECONDS.set(elapsed)
+    logger.info(f"Opened {opened} upstream connections in {elapsed:.3f}s")
+    return opened
+
+
+def report_ready(started_at: float) -> None:
+    """Log and export the time from the server start until it is ready."""
+    elapsed = time.monotonic() - started_at
+    TIME_TO_FIRST_READY.set(elapsed)
+    logger.info(f"Server ready to serve tool calls {elapsed:.3f}s after start")
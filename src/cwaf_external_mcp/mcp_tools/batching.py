@@ -0,0 +1,310 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro-batching of single-ID lookups into multi-ID upstream requests."""
+
+import asyncio
+import os
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Optional
+
+from prometheus_client import Counter, Histogram
+
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.httpclient.priority_lanes import BACKGROUND, INTERACTIVE
+from cwaf_external_mcp.httpclient.response_cache import build_cache_key
+from cwaf_external_mcp.httpclient.upstream_client import (
+    DeadlineExceededError,
+    UpstreamResponse,
+    cache_json,
+    endpoint_label,
+    get_cached_json,
+)
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+Fetch = Callable[[str, dict, dict, Callable], Awaitable[UpstreamResponse]]
+
+# ID filters of each upstream endpoint, with the item attribute they match. Only
+# filters matching at most one item per ID, so a batch fits in a single page.
+BATCHABLE_FILTERS = {
+    "sites": {"siteIds": "id"},
+    "domains": {"domainIds": "id"},
+    "policies": {"policyIds": "id"},
+    "rules": {"ruleIds": "rule_id"},
+}
+PAGE_PARAMS = ("page", "page_num")
+# Page size parameter of each endpoint, set on the multi-ID requests
+PAGE_SIZE_PARAMS = {
+    "sites": "size",
+    "domains": "size",
+    "policies": "size",
+    "rules": "page_size",
+}
+BATCH_PAGE_SIZE = 100
+
+BATCH_SIZE = Histogram(
+    "cwaf_upstream_batch_size",
+    "Number of IDs of the multi-ID requests sent for batched lookups",
+    ["endpoint"],
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+LOOKUPS = Counter(
+    "cwaf_upstream_batched_lookups_total",
+    "Single-ID lookups answered from a multi-ID request or sent on their own",
+    ["endpoint", "result"],
+)
+
+POINT_LOOKUP_BATCHER = None
+
+
+@dataclass
+class PointLookup:
+    """A request filtering its endpoint by a single ID."""
+
+    id_param: str
+    id_value: str
+    attribute: str
+    params: dict
+
+
+@dataclass
+class _Batch:
+    url: str
+    headers: dict
+    mapper: Callable
+    lookup: PointLookup
+    priority: str = INTERACTIVE
+    futures: dict[str, list[asyncio.Future]] = field(default_factory=dict)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+def get_point_lookup(url: str, params: dict) -> Optional[PointLookup]:
+    """Get the point lookup of a first page request by a single ID, if it is one."""
+    filters = BATCHABLE_FILTERS.get(endpoint_label(url), {})
+    id_params = [name for name in filters if name in params]
+    if len(id_params) != 1 or any(params.get(name) for name in PAGE_PARAMS):
+        return None
+    [id_param] = id_params
+    id_value = str(params[id_param])
+    if not id_value or "," in id_value:
+        return None
+    others = {name: value for name, value in params.items() if name != id_param}
+    return PointLookup(id_param, id_value, filters[id_param], others)
+
+
+class PointLookupBatcher:
+    """
+    Collect the point lookups arriving within `window` seconds into one request.
+
+    Lookups with the same URL, filters and credentials are sent as a single
+    multi-ID request, up to max_ids IDs, whose items are split back by ID. When
+    the merged response fails or spans several pages, each lookup is sent on
+    its own instead. Cached lookups are answered from the response cache, and
+    the split responses are cached as the single-ID requests.
+    """
+
+    def __init__(self, window: float, max_ids: int):
+        self.window = window
+        self.max_ids = max_ids
+        self._batches: dict[tuple, _Batch] = {}
+        self._sending: set[asyncio.Task] = set()
+
+    async def load(
+        self, fetch: Fetch, url: str, params: dict, headers: dict, mapper: Callable
+    ) -> UpstreamResponse:
+        """Fetch the first page of a request, batched when it is a point lookup."""
+        lookup = get_point_lookup(url, params)
+        if lookup is None:
+            return await fetch(url, params, headers, mapper)
+        cached = get_cached_json(url, params, headers, mapper)
+        if cached is not None:
+            return cached
+        priority = context_manager.get_priority()
+        key = (
+            *build_cache_key(url, lookup.params, headers),
+            lookup.id_param,
+            mapper,
+        )
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(url, headers, mapper, lookup, priority)
+            batch.timer = loop.call_later(self.window, self._dispatch, key, fetch)
+        elif priority != BACKGROUND:
+            batch.priority = INTERACTIVE
+        future = loop.create_future()
+        batch.futures.setdefault(lookup.id_value, []).append(future)
+        if len(batch.futures) >= self.max_ids:
+            batch.timer.cancel()
+            self._dispatch(key, fetch)
+        # the batch is shared, each lookup only waits for it until its deadline
+        timeout = asyncio.timeout(context_manager.get_remaining_time())
+        try:
+            async with timeout:
+                return await asyncio.shield(future)
+        except TimeoutError as e:
+            if timeout.expired():
+                raise DeadlineExceededError(url) from e
+            raise
+
+    def _dispatch(self, key: tuple, fetch: Fetch) -> None:
+        batch = self._batches.pop(key, None)
+        if batch is not None:
+            task = asyncio.ensure_future(self._send(batch, fetch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: _Batch, fetch: Fetch) -> None:
+        """
+        Send the batch and resolve the futures of its lookups.
+
+        The batch runs without the deadline of the lookup that opened it, in the
+        interactive lane unless all its lookups are background work.
+        """
+        context_manager.set_deadline(None)
+        context_manager.set_priority(batch.priority)
+        endpoint = endpoint_label(batch.url)
+        ids = list(batch.futures)
+        BATCH_SIZE.labels(endpoint=endpoint).observe(len(ids))
+        lookup = batch.lookup
+        try:
+            params = {**lookup.params, lookup.id_param: ",".join(ids)}
+            if len(ids) > 1:
+                params[PAGE_SIZE_PARAMS[endpoint]] = BATCH_PAGE_SIZE
+            response = await fetch(batch.url, params, batch.headers, batch.mapper)
+        except Exception as e:
+            for futures in batch.futures.values():
+                _resolve(futures, exception=e)
+            return
+        if len(ids) == 1:
+            LOOKUPS.labels(endpoint=endpoint, result="single").inc()
+            _resolve(batch.futures[ids[0]], response)
+            return
+        responses = split_response(response, lookup.attribute, ids)
+        if responses is None:
+            logger.info(
+                "Sending the %d %s lookups of an incomplete batch one by one",
+                len(ids),
+                endpoint,
+            )
+            LOOKUPS.labels(endpoint=endpoint, result="fallback").inc(len(ids))
+            await asyncio.gather(
+                *(self._send_alone(batch, fetch, id_value) for id_value in ids)
+            )
+            return
+        LOOKUPS.labels(endpoint=endpoint, result="batched").inc(len(ids))
+        for id_value, futures in batch.futures.items():
+            if response.source != "cache" and not response.stale:
+                # cached as the single-ID request the lookup would have sent
+                cache_json(
+                    batch.url,
+                    {**lookup.params, lookup.id_param: id_value},
+                    batch.headers,
+                    batch.mapper,
+                    responses[id_value],
+                )
+            _resolve(futures, responses[id_value])
+
+    async def _send_alone(self, batch: _Batch, fetch: Fetch, id_value: str) -> None:
+        lookup = batch.lookup
+        try:
+            response = await fetch(
+                batch.url,
+                {**lookup.params, lookup.id_param: id_value},
+                batch.headers,
+                batch.mapper,
+            )
+        except Exception as e:
+            _resolve(batch.futures[id_value], exception=e)
+        else:
+            _resolve(batch.futures[id_value], response)
+
+
+def split_response(
+    response: UpstreamResponse, attribute: str, ids: list[str]
+) -> Optional[dict[str, UpstreamResponse]]:
+    """
+    Split a multi-ID response by ID, None when it failed or is incomplete.
+
+    Items are DTOs, or dicts when projected on some fields, a projection
+    without the ID attribute cannot be split either.
+    """
+    body = response.body
+    if response.status != 200 or not isinstance(body, dict):
+        return None
+    data, meta = body.get("data"), body.get("meta") or {}
+    if not isinstance(data, list):
+        return None
+    total = meta.get("totalElements")
+    if (total is not None and total > len(data)) or (meta.get("totalPages") or 1) > 1:
+        return None
+    items: dict[str, list[Any]] = {id_value: [] for id_value in ids}
+    for item in data:
+        value = (
+            item.get(attribute)
+            if isinstance(item, dict)
+            else getattr(item, attribute, None)
+        )
+        if value is None:
+            return None
+        value = str(value)
+        if value in items:
+            items[value].append(item)
+    return {
+        id_value: replace(
+            response,
+            body={
+                # the links of the merged request list the IDs of every lookup
+                **{key: value for key, value in body.items() if key != "links"},
+                "data": id_items,
+                "meta": {
+                    **meta,
+                    "totalElements": len(id_items),
+                    "totalPages": 1 if id_items else 0,
+                },
+            },
+            size=response.size * len(id_items) // max(1, len(data)),
+            source="batched",
+        )
+        for id_value, id_items in items.items()
+    }
+
+
+def _resolve(
+    futures: list[asyncio.Future],
+    response: Optional[UpstreamResponse] = None,
+    exception: Optional[BaseException] = None,
+) -> None:
+    for future in futures:
+        if future.done():
+            continue
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(response)
+
+
+def get_point_lookup_batcher() -> Optional[PointLookupBatcher]:
+    """Get the process wide batcher, None when batching is disabled."""
+    global POINT_LOOKUP_BATCHER
+    if os.environ.get("BATCHING_ENABLED", "false").lower() != "true":
+        return None
+    if POINT_LOOKUP_BATCHER is None:
+        POINT_LOOKUP_BATCHER = PointLookupBatcher(
+            window=float(os.environ.get("BATCHING_WINDOW_MS", "5")) / 1000,
+            max_ids=min(int(os.environ.get("BATCHING_MAX_IDS", "20")), BATCH_PAGE_SIZE),
+        )
+    return POINT_LOOKUP_BATCHER
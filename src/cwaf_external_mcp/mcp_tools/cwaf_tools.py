@@ -14,19 +14,36 @@
 
 """CWAF Tools"""
 
+import asyncio
+import math
 import os
-from datetime import datetime, timezone
-from typing import Callable, Optional, List, Union
+import time
+from typing import Any, Callable, Optional, List, Union
 
 from dotenv import load_dotenv
 from fastmcp import Context
+from prometheus_client import Histogram
 
 from cwaf_external_mcp.context.context_manager import context_manager
-from cwaf_external_mcp.httpclient.aiohttp_client import get_async_client
+from cwaf_external_mcp.httpclient.bulkhead import BulkheadFullError
+from cwaf_external_mcp.httpclient.circuit_breaker import CircuitOpenError
+from cwaf_external_mcp.httpclient.upstream_client import (
+    DeadlineExceededError,
+    ResponseTooLargeError,
+    UpstreamResponse,
+    endpoint_label,
+    get_json,
+)
+from cwaf_external_mcp.mcp_tools.batching import get_point_lookup_batcher
+from cwaf_external_mcp.mcp_tools.page_mapper import page_mapper, projected_mapper
 from cwaf_external_mcp.model.api_error import ApiError
 from cwaf_external_mcp.model.cwaf_error_response import CWAFErrorResponse
-from cwaf_external_mcp.model.cwaf_response import CWAFResponse, Meta
-from cwaf_external_mcp.model.policy_dto import Policy, PolicySettings, PolicyConfig
+from cwaf_external_mcp.model.cwaf_response import (
+    CWAFResponse,
+    CWAFTableResponse,
+    Meta,
+)
+from cwaf_external_mcp.model.policy_dto import Policy
 from cwaf_external_mcp.model.rule_dto import Rule
 from cwaf_external_mcp.model.site import Site
 from cwaf_external_mcp.model.site_domain import SiteDomain
@@ -35,6 +52,7 @@ from cwaf_external_mcp.utilities.parameters_parser import (
     _coerce_list,
     _to_int,
     _to_bool,
+    _to_str,
 )
 
 load_dotenv()
@@ -49,6 +67,29 @@ BASE_POLICIES_URL = os.environ.get(
 )
 BASE_RULES_URL = os.environ.get("BASE_RULES_URL", "https://my.imperva.com/api/prov")
 
+PAGINATION_MAX_CONCURRENCY = int(os.environ.get("PAGINATION_MAX_CONCURRENCY", "5"))
+PAGINATION_MAX_PAGES = int(os.environ.get("PAGINATION_MAX_PAGES", "100"))
+RESPONSE_FORMATS = ("json", "table")
+
+REQUEST_LATENCY = Histogram(
+    "cwaf_upstream_request_duration_seconds",
+    "Duration of the upstream page requests, by where they were served from",
+    ["endpoint", "status_class", "source"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RESPONSE_BYTES = Histogram(
+    "cwaf_upstream_response_bytes",
+    "Body size of the upstream page responses, by where they were served from",
+    ["endpoint", "status_class", "source"],
+    buckets=tuple(1024 * 4**i for i in range(9)),
+)
+RESPONSE_ITEMS = Histogram(
+    "cwaf_upstream_response_items",
+    "Number of items returned by the upstream page responses",
+    ["endpoint", "status_class"],
+    buckets=(0, 1, 10, 50, 100, 250, 500, 1000, 5000),
+)
+
 
 async def get_rules_api(
     account_id: Optional[Union[int, str]],
@@ -60,7 +101,16 @@ async def get_rules_api(
     categories: Optional[Union[List[str], str]] = None,
     page_num: Union[int, str] = 0,
     page_size: Union[int, str] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    response_format: Optional[str] = None,
+) -> (
+    CWAFResponse[Rule]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     get site domains api
 
@@ -72,6 +122,10 @@ async def get_rules_api(
     :param names: list of rules names.
     :param page_num: The page number to fetch.
     :param page_size: The number of items per page.
+    :param all_pages: whether to fetch all the pages starting at page_num.
+    :param max_items: maximum number of items to return across pages.
+    :param fields: fields of the items to return, all of them when empty.
+    :param response_format: "json" (default) or "table" to return the items as rows.
     """
     logger.info(
         "Fetching rules for account %s, with filters site_ids: %s, subaccount_ids: %s, policies_ids: %s, names: %s, policy_types: %s",
@@ -94,6 +148,12 @@ async def get_rules_api(
         categories_n = _coerce_list(categories, str)
         page_num_n = _to_int(page_num)
         page_size_n = _to_int(page_size)
+        all_pages_n = _to_bool(all_pages)
+        max_items_n = _to_int(max_items)
+        response_format_n = _to_response_format(response_format)
+        mapper_func, response_model = _select_mapper(
+            get_rules_from_response, Rule, _coerce_list(fields, str)
+        )
     except Exception as e:
         logger.error("Error parsing parameters for get_rules_api: %s", e, exc_info=True)
         return CWAFErrorResponse(
@@ -128,9 +188,16 @@ async def get_rules_api(
         params["categories"] = ",".join(categories_n)
 
     res, _ = await invoke_request_with_pagination_handling(
-        url, params, get_rules_from_response, context
+        url,
+        params,
+        mapper_func,
+        context,
+        response_model=response_model,
+        page_param="page_num",
+        all_pages=all_pages_n,
+        max_items=max_items_n,
     )
-    return res
+    return _format_response(res, response_format_n)
 
 
 async def get_polices_of_account_by_filter_api(
@@ -144,7 +211,16 @@ async def get_polices_of_account_by_filter_api(
     names: Optional[list[str]] = None,
     page_num: Union[int, str] = 0,
     page_size: Union[int, str] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    response_format: Optional[str] = None,
+) -> (
+    CWAFResponse[Policy]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     Fetches the list of policies for a given account by filters.
 
@@ -157,6 +233,10 @@ async def get_polices_of_account_by_filter_api(
     :param names: list of policies names.
     :param page_num: The page number to fetch.
     :param page_size: The number of items per page.
+    :param all_pages: whether to fetch all the pages starting at page_num.
+    :param max_items: maximum number of items to return across pages.
+    :param fields: fields of the items to return, all of them when empty.
+    :param response_format: "json" (default) or "table" to return the items as rows.
 
     :return: A list of dictionaries containing site details.
     """
@@ -183,6 +263,12 @@ async def get_polices_of_account_by_filter_api(
         extended_n = _to_bool(extended)
         page_num_n = _to_int(page_num)
         page_size_n = _to_int(page_size)
+        all_pages_n = _to_bool(all_pages)
+        max_items_n = _to_int(max_items)
+        response_format_n = _to_response_format(response_format)
+        mapper_func, response_model = _select_mapper(
+            get_policy_from_response, Policy, _coerce_list(fields, str)
+        )
     except Exception as e:
         logger.error(
             "Error parsing parameters for get_polices_of_account_by_filter_api: %s",
@@ -218,9 +304,15 @@ async def get_polices_of_account_by_filter_api(
         params["types"] = ",".join(policy_types_n)
 
     res, _ = await invoke_request_with_pagination_handling(
-        url, params, get_policy_from_response, context
+        url,
+        params,
+        mapper_func,
+        context,
+        response_model=response_model,
+        all_pages=all_pages_n,
+        max_items=max_items_n,
     )
-    return res
+    return _format_response(res, response_format_n)
 
 
 async def get_site_domains_api(
@@ -231,7 +323,16 @@ async def get_site_domains_api(
     names: Optional[Union[List[str], str]] = None,
     page_num: Union[int, str] = 0,
     page_size: Union[int, str] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    response_format: Optional[str] = None,
+) -> (
+    CWAFResponse[SiteDomain]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     get site domains api
 
@@ -241,6 +342,10 @@ async def get_site_domains_api(
     :param names: list of domain names.
     :param page_num: The page number to fetch.
     :param page_size: The number of items per page.
+    :param all_pages: whether to fetch all the pages starting at page_num.
+    :param max_items: maximum number of items to return across pages.
+    :param fields: fields of the items to return, all of them when empty.
+    :param response_format: "json" (default) or "table" to return the items as rows.
     """
     logger.info("Fetching domains for account %s", account_id)
 
@@ -251,6 +356,12 @@ async def get_site_domains_api(
         names_n = _coerce_list(names, str)
         page_num_n = _to_int(page_num)
         page_size_n = _to_int(page_size)
+        all_pages_n = _to_bool(all_pages)
+        max_items_n = _to_int(max_items)
+        response_format_n = _to_response_format(response_format)
+        mapper_func, response_model = _select_mapper(
+            get_site_domain_from_response, SiteDomain, _coerce_list(fields, str)
+        )
     except Exception as e:
         logger.error(
             "Error parsing parameters for get_site_domains_api: %s", e, exc_info=True
@@ -280,9 +391,15 @@ async def get_site_domains_api(
     if page_size_n:
         params["size"] = page_size_n
     res, _ = await invoke_request_with_pagination_handling(
-        url, params, get_site_domain_from_response, context
+        url,
+        params,
+        mapper_func,
+        context,
+        response_model=response_model,
+        all_pages=all_pages_n,
+        max_items=max_items_n,
     )
-    return res
+    return _format_response(res, response_format_n)
 
 
 async def get_account_sites(
@@ -293,7 +410,16 @@ async def get_account_sites(
     sub_account_ids: Optional[Union[List[int], str]] = None,
     page_num: Union[int, str] = 0,
     page_size: Union[int, str] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    response_format: Optional[str] = None,
+) -> (
+    CWAFResponse[Site]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     Fetches the list of sites for a given account.
 
@@ -303,6 +429,10 @@ async def get_account_sites(
     :param sub_account_ids: list of subaccount IDs.
     :param page_num: The page number to fetch.
     :param page_size: The number of items per page.
+    :param all_pages: whether to fetch all the pages starting at page_num.
+    :param max_items: maximum number of items to return across pages.
+    :param fields: fields of the items to return, all of them when empty.
+    :param response_format: "json" (default) or "table" to return the items as rows.
 
     :return: A list of dictionaries containing site details.
     """
@@ -315,6 +445,12 @@ async def get_account_sites(
         names_n = _coerce_list(names, str)
         page_num_n = _to_int(page_num)
         page_size_n = _to_int(page_size)
+        all_pages_n = _to_bool(all_pages)
+        max_items_n = _to_int(max_items)
+        response_format_n = _to_response_format(response_format)
+        mapper_func, response_model = _select_mapper(
+            get_site_from_response, Site, _coerce_list(fields, str)
+        )
     except Exception as e:
         logger.error(
             "Error parsing parameters for get_account_sites: %s", e, exc_info=True
@@ -345,9 +481,51 @@ async def get_account_sites(
 
     url = BASE_SITES_URL + "/v3/sites/extended"
     res, _ = await invoke_request_with_pagination_handling(
-        url, params, get_site_from_response, context
+        url,
+        params,
+        mapper_func,
+        context,
+        response_model=response_model,
+        all_pages=all_pages_n,
+        max_items=max_items_n,
+    )
+    return _format_response(res, response_format_n)
+
+
+def _to_response_format(value: Optional[str]) -> str:
+    """Parse the response format of a tool call, json by default."""
+    response_format = (_to_str(value) or "json").lower()
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown response format: {value}")
+    return response_format
+
+
+def _format_response(
+    response: CWAFResponse | CWAFErrorResponse, response_format: str
+) -> CWAFResponse | CWAFTableResponse | CWAFErrorResponse:
+    """Encode a successful response in the requested format."""
+    if response_format == "table" and isinstance(response, CWAFResponse):
+        return response.to_table()
+    return response
+
+
+def _select_mapper(
+    mapper_func: Callable[[dict], SiteDomain | Site | Policy | Rule],
+    model: type[SiteDomain | Site | Policy | Rule],
+    fields: Optional[List[str]],
+) -> tuple[Callable[[dict], Any], type[CWAFResponse]]:
+    """
+    Get the item mapper and the response model of a tool call.
+
+    When fields are requested the items are projected on them as dicts, the
+    other fields are neither validated nor returned.
+    """
+    if not fields:
+        return mapper_func, CWAFResponse[model]
+    return (
+        projected_mapper(model, tuple(dict.fromkeys(fields))),
+        CWAFResponse[dict[str, Any]],
     )
-    return res
 
 
 async def invoke_request_with_pagination_handling(
@@ -355,8 +533,22 @@ async def invoke_request_with_pagination_handling(
     params: dict,
     mapper_func: Callable[[dict], SiteDomain | Site | Policy | Rule],
     context: Optional[Context] = None,
+    page_param: str = "page",
+    all_pages: Optional[bool] = False,
+    max_items: Optional[int] = None,
+    response_model: type[CWAFResponse] = CWAFResponse,
 ) -> tuple[CWAFResponse | CWAFErrorResponse, bool]:
-    """Invoke an HTTP GET request with pagination handling."""
+    """
+    Invoke an HTTP GET request with pagination handling.
+
+    By default only the requested page is fetched. When all_pages or max_items is
+    given, the remaining pages are fetched concurrently (bounded by
+    PAGINATION_MAX_CONCURRENCY) and merged in page order. When the deadline of the
+    call passes or PAGINATION_MAX_PAGES is reached, the pages fetched so far are
+    returned marked as truncated, with the last page returned in meta.
+    The items, already validated by mapper_func, are returned in a
+    response_model (e.g. CWAFResponse[Site]) without being validated again.
+    """
 
     MCP_HEADER_NAME = os.environ.get("MCP_HEADER_NAME", "x-mcp-imperva")
 
@@ -371,45 +563,96 @@ async def invoke_request_with_pagination_handling(
 
     try:
         logger.info("calling %s, with params %s", url, params)
-        full_data = []
-        response = await get_async_client().get(url, headers=HEADERS, params=params)
-        logger.info(f"response: {response}")
-        data = await response.json(content_type=None)
-        logger.info("response from %s, with params %s: %s", url, params, data)
-        if response.status != 200:
-            if context:
-                await context.error(data)
-            response = (
-                data["errors"]
-                if "errors" in data
-                else (
-                    data["body"]["errors"]
-                    if "body" in data and "errors" in data["body"]
-                    else [
-                        CWAFErrorResponse(
-                            errors=[
-                                ApiError(
-                                    status=500,
-                                    title="internal error",
-                                    detail="",
-                                )
-                            ]
-                        )
-                    ]
-                )
+        pages = [
+            await _fetch_page(
+                url,
+                params,
+                HEADERS,
+                mapper_func,
+                batchable=not (all_pages or max_items),
             )
-
-            return (
-                CWAFErrorResponse(
-                    errors=[get_api_error_from_response(r) for r in response]
-                ),
-                False,
+        ]
+        truncated = False
+        if pages[0].status == 200 and (all_pages or max_items):
+            remaining_pages, truncated = await _fetch_remaining_pages(
+                url,
+                params,
+                HEADERS,
+                mapper_func,
+                page_param,
+                get_pagination_data(pages[0].body["meta"]),
+                len(pages[0].body["data"]),
+                max_items,
             )
-        response = data["data"]
+            pages += remaining_pages
+        full_data = []
+        for page in pages:
+            if page.status != 200:
+                return await _get_error_response(page.body, context), False
+            full_data += page.body["data"]
+        data = pages[0].body
         pagination_data = get_pagination_data(data["meta"])
+        if truncated:
+            pagination_data.page = int(params.get(page_param) or 0) + len(pages) - 1
         links = data["links"] if "links" in data else {}
-        full_data += [mapper_func(r) for r in response]
-        return CWAFResponse(data=full_data, meta=pagination_data, links=links), True
+        if max_items:
+            full_data = full_data[:max_items]
+        return (
+            response_model.model_construct(
+                data=full_data,
+                meta=pagination_data,
+                links=links,
+                stale=any(page.stale for page in pages),
+                truncated=truncated,
+            ),
+            True,
+        )
+    except DeadlineExceededError as e:
+        logger.warning(
+            "Deadline exceeded invoking %s with params %s: %s", url, params, e
+        )
+        return (
+            CWAFErrorResponse(
+                errors=[
+                    ApiError(
+                        status=504,
+                        title="deadline exceeded",
+                        detail="The request did not complete within the timeout of "
+                        "the tool call.",
+                    )
+                ]
+            ),
+            False,
+        )
+    except (CircuitOpenError, BulkheadFullError) as e:
+        logger.warning("Failing fast invoking %s with params %s: %s", url, params, e)
+        return (
+            CWAFErrorResponse(
+                errors=[
+                    ApiError(
+                        status=503,
+                        title="service unavailable",
+                        detail=str(e),
+                    )
+                ]
+            ),
+            False,
+        )
+    except ResponseTooLargeError as e:
+        logger.warning("Rejecting response of %s with params %s: %s", url, params, e)
+        return (
+            CWAFErrorResponse(
+                errors=[
+                    ApiError(
+                        status=502,
+                        title="response too large",
+                        detail="The response exceeds the maximum supported size, "
+                        "narrow the filters or use a smaller page_size.",
+                    )
+                ]
+            ),
+            False,
+        )
     except Exception:
         logger.exception("Error invoking %s with params %s", url, params)
         return (
@@ -426,6 +669,139 @@ async def invoke_request_with_pagination_handling(
         )
 
 
+async def _fetch_page(
+    url: str,
+    params: dict,
+    headers: dict,
+    mapper_func: Callable[[dict], SiteDomain | Site | Policy | Rule],
+    batchable: bool = False,
+) -> UpstreamResponse:
+    """
+    Fetch a single page, mapping its items with mapper_func, and observe it.
+
+    A batchable single-ID lookup can be merged with concurrent lookups of the
+    same endpoint into one multi-ID request.
+    """
+    endpoint = endpoint_label(url)
+    batcher = get_point_lookup_batcher() if batchable else None
+    start = time.monotonic()
+    try:
+        if batcher is None:
+            response = await get_json(url, params, headers, mapper_func)
+        else:
+            response = await batcher.load(get_json, url, params, headers, mapper_func)
+    except Exception:
+        REQUEST_LATENCY.labels(
+            endpoint=endpoint, status_class="error", source="upstream"
+        ).observe(time.monotonic() - start)
+        raise
+    status_class = f"{response.status // 100}xx"
+    # cache hits and shared requests are told apart from the upstream requests
+    labels = dict(endpoint=endpoint, status_class=status_class, source=response.source)
+    REQUEST_LATENCY.labels(**labels).observe(time.monotonic() - start)
+    RESPONSE_BYTES.labels(**labels).observe(response.size)
+    if isinstance(response.body, dict) and isinstance(response.body.get("data"), list):
+        RESPONSE_ITEMS.labels(endpoint=endpoint, status_class=status_class).observe(
+            len(response.body["data"])
+        )
+    logger.info("response from %s, with params %s: %s", url, params, response.body)
+    return response
+
+
+async def _fetch_remaining_pages(
+    url: str,
+    params: dict,
+    headers: dict,
+    mapper_func: Callable[[dict], SiteDomain | Site | Policy | Rule],
+    page_param: str,
+    meta: Meta,
+    first_page_count: int,
+    max_items: Optional[int] = None,
+) -> tuple[list[UpstreamResponse], bool]:
+    """
+    Fetch the pages following the first one, in page order.
+
+    When the upstream reports totalPages the pages are fetched concurrently,
+    otherwise they are walked sequentially until a short or failed page is
+    returned. Returns the pages and whether they were truncated because the
+    deadline of the call passed or PAGINATION_MAX_PAGES was reached.
+    """
+    page_size = meta.size or first_page_count
+    if not first_page_count or first_page_count < page_size:
+        return [], False
+
+    first_page = int(params.get(page_param) or 0)
+    max_page = first_page + PAGINATION_MAX_PAGES - 1
+    last_page = max_page
+    if max_items:
+        last_page = min(last_page, first_page + math.ceil(max_items / page_size) - 1)
+    # the pages after max_page are wanted but cut off by PAGINATION_MAX_PAGES
+    capped = not max_items or max_items > PAGINATION_MAX_PAGES * page_size
+
+    async def fetch(page: int) -> Optional[UpstreamResponse]:
+        try:
+            return await _fetch_page(
+                url, {**params, page_param: page}, headers, mapper_func
+            )
+        except DeadlineExceededError:
+            logger.warning("Deadline exceeded fetching page %s of %s", page, url)
+            return None
+
+    if meta.totalPages is not None:
+        last_page = min(last_page, meta.totalPages - 1)
+        semaphore = asyncio.Semaphore(PAGINATION_MAX_CONCURRENCY)
+
+        async def fetch_bounded(page: int) -> Optional[UpstreamResponse]:
+            async with semaphore:
+                return await fetch(page)
+
+        fetched = await asyncio.gather(
+            *(fetch_bounded(page) for page in range(first_page + 1, last_page + 1))
+        )
+        if None not in fetched:
+            return list(fetched), capped and meta.totalPages - 1 > max_page
+        return list(fetched[: fetched.index(None)]), True
+
+    pages = []
+    for page in range(first_page + 1, last_page + 1):
+        response = await fetch(page)
+        if response is None:
+            return pages, True
+        pages.append(response)
+        if response.status != 200 or len(response.body["data"]) < page_size:
+            return pages, False
+    # the last page was full, more pages may follow
+    return pages, capped
+
+
+async def _get_error_response(
+    data: dict, context: Optional[Context] = None
+) -> CWAFErrorResponse:
+    """Build the error response out of a failed upstream response body."""
+    if context:
+        await context.error(data)
+    response = (
+        data["errors"]
+        if "errors" in data
+        else (
+            data["body"]["errors"]
+            if "body" in data and "errors" in data["body"]
+            else [
+                CWAFErrorResponse(
+                    errors=[
+                        ApiError(
+                            status=500,
+                            title="internal error",
+                            detail="",
+                        )
+                    ]
+                )
+            ]
+        )
+    )
+    return CWAFErrorResponse(errors=[get_api_error_from_response(r) for r in response])
+
+
 def get_pagination_data(pagination_data):
     """Get pagination data from response metadata."""
     return Meta(
@@ -442,66 +818,16 @@ def get_pagination_data(pagination_data):
     )
 
 
+@page_mapper(Rule)
 def get_rules_from_response(r: dict) -> Rule:
     """Convert response dictionary to Rule object."""
-    return Rule(
-        rule_id=r["rule"]["rule_id"],
-        site_id=r["site_id"],
-        account_id=r["account_id"],
-        name=r["rule"]["name"],
-        action=r["rule"]["action"],
-        enabled=r["rule"]["enabled"],
-        filter=r["rule"]["filter"] if "filter" in r["rule"] else None,
-        dc_id=r["rule"]["dcId"] if "dcId" in r["rule"] else None,
-        overrideWafRule=(
-            r["rule"]["overrideWafRule"] if "overrideWafRule" in r["rule"] else None
-        ),
-        overrideWafAction=(
-            r["rule"]["overrideWafAction"] if "overrideWafAction" in r["rule"] else None
-        ),
-        rate_interval=(
-            r["rule"]["rateInterval"] if "rateInterval" in r["rule"] else None
-        ),
-        rate_context=r["rule"]["rateContext"] if "rateContext" in r["rule"] else None,
-        to_url=r["rule"]["to"] if "to" in r["rule"] else None,
-        from_url=r["rule"]["from"] if "from" in r["rule"] else None,
-        response_code=(
-            r["rule"]["responseCode"] if "responseCode" in r["rule"] else None
-        ),
-        port_forwarding_value=(
-            r["rule"]["portForwardingValue"]
-            if "portForwardingValue" in r["rule"]
-            else None
-        ),
-        port_forwarding_context=(
-            r["rule"]["portForwardingContext"]
-            if "portForwardingContext" in r["rule"]
-            else None
-        ),
-        multiple_deletions=(
-            r["rule"]["multipleDeletions"] if "multipleDeletions" in r["rule"] else None
-        ),
-        rewrite_existing=(
-            r["rule"]["rewriteExisting"] if "rewriteExisting" in r["rule"] else None
-        ),
-        add_missing=r["rule"]["addMissing"] if "addMissing" in r["rule"] else None,
-        rewrite_name=r["rule"]["rewriteName"] if "rewriteName" in r["rule"] else None,
-    )
+    return Rule.model_validate(r)
 
 
+@page_mapper(SiteDomain)
 def get_site_domain_from_response(r: dict) -> SiteDomain:
     """Convert response dictionary to SiteDomain object."""
-    return SiteDomain(
-        id=r["id"],
-        name=r["domain"],
-        status=r["status"],
-        site_id=r["siteId"],
-        creation_date=(
-            datetime.fromtimestamp(r["creationDate"] / 1000, tz=timezone.utc)
-        ).strftime("%Y-%m-%d %H:%M:%S"),
-        aRecords=r["arecords"] if "arecords" in r else None,
-        cname=r["cname"],
-    )
+    return SiteDomain.model_validate(r)
 
 
 def get_api_error_from_response(r: dict) -> ApiError:
@@ -515,78 +841,13 @@ def get_api_error_from_response(r: dict) -> ApiError:
     )
 
 
+@page_mapper(Policy)
 def get_policy_from_response(r: dict) -> Policy:
-    """Convert response dictionary to Site object."""
-    return Policy(
-        id=r["id"],
-        policyType=r["policyType"],
-        name=r["name"],
-        accountId=r["accountId"],
-        enabled=r["enabled"],
-        description=r["description"],
-        lastModified=r["lastModified"],
-        lastModifiedBy=r["lastModifiedBy"],
-        policySettings=(
-            get_policy_settings_from_response(r["policySettings"])
-            if "policySettings" in r and r["policySettings"] is not None
-            else None
-        ),
-        defaultPolicyConfig=(
-            get_default_policy_config_from_response(r["defaultPolicyConfig"])
-            if "defaultPolicyConfig" in r and r["defaultPolicyConfig"] is not None
-            else None
-        ),
-        assetsIds=r["assetsIds"],
-        subaccountIds=r["subaccountIds"],
-    )
-
-
-def get_policy_settings_from_response(policy_settings: list) -> list[PolicySettings]:
-    """Convert response dictionary to PolicySettings object."""
-    return [
-        PolicySettings(
-            id=r["id"],
-            policyId=r["policyId"],
-            settingsAction=r["settingsAction"],
-            policySettingType=r["policySettingType"],
-            data=r["data"] if "data" in r else None,
-            policyDataExceptions=(
-                r["policyDataExceptions"] if "policyDataExceptions" in r else None
-            ),
-        )
-        for r in policy_settings
-    ]
-
-
-def get_default_policy_config_from_response(policy_config: list) -> list[PolicyConfig]:
-    """Convert response dictionary to PolicyConfig object."""
-    return [
-        PolicyConfig(
-            id=r["id"],
-            policyId=r["policyId"],
-            accountId=r["accountId"],
-            assetType=r["assetType"],
-        )
-        for r in policy_config
-    ]
+    """Convert response dictionary to Policy object."""
+    return Policy.model_validate(r)
 
 
+@page_mapper(Site)
 def get_site_from_response(r: dict) -> Site:
     """Convert response dictionary to Site object."""
-    return Site(
-        id=r["id"],
-        name=r["name"],
-        isDefaultSite=r["isDefaultSite"] if "isDefaultSite" in r else None,
-        accountId=r["accountId"],
-        refId=r["refId"] if "refId" in r else None,
-        cloud=r["cloud"] if "cloud" in r else None,
-        active=r["active"],
-        cnames=r["cname"] if "cname" in r else None,
-        siteStatus=r["siteStatus"] if "siteStatus" in r else None,
-        creationTime=(
-            datetime.fromtimestamp(r["creationTime"] / 1000, tz=timezone.utc)
-        ).strftime("%Y-%m-%d %H:%M:%S"),
-        attributes=r["attributes"] if "attributes" in r else None,
-        type=r["type"],
-        deploymentKeys=r["deploymentKeys"] if "deploymentKeys" in r else None,
-    )
+    return Site.model_validate(r)
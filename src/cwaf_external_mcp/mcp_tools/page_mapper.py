@@ -0,0 +1,90 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk validation of the items of a page into DTOs."""
+
+from functools import lru_cache
+from typing import Annotated, Any, Callable, NotRequired, Required, TypedDict, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def page_mapper(model: type[M]) -> Callable[[Callable], Callable]:
+    """
+    Give a per-item mapper a `map_page` validating a whole page of `model`.
+
+    `map_page` validates the data array in one TypeAdapter(list[model]) call
+    rather than one model_validate call per item. The decorated function is
+    returned as is, it stays the per-item mapper used by the streaming decoder
+    and still pickles by reference for the process offloader.
+    """
+    adapter = TypeAdapter(list[model])
+
+    def decorate(func: Callable[[Any], M]) -> Callable[[Any], M]:
+        func.map_page = adapter.validate_python
+        return func
+
+    return decorate
+
+
+class ProjectedMapper:
+    """
+    Per-item mapper validating only some fields of a DTO into a dict.
+
+    The items are validated against a TypedDict holding the requested fields of
+    the model, with their aliases, validators and defaults, so the other fields
+    of the upstream payload (e.g. the settings of a policy) are never validated.
+    Fields are named as in the serialized model, by their serialization alias
+    (e.g. `to` for Rule.to_url), both in `fields` and in the returned dicts.
+    Mappers are shared per model and fields, see projected_mapper.
+    """
+
+    def __init__(self, model: type[BaseModel], fields: tuple[str, ...]):
+        names = {
+            info.serialization_alias or name: name
+            for name, info in model.model_fields.items()
+        }
+        unknown = [field for field in fields if field not in names]
+        if unknown:
+            raise ValueError(f"Unknown {model.__name__} fields: {', '.join(unknown)}")
+        self.model = model
+        self.fields = fields
+        self.__qualname__ = f"{model.__qualname__}[{','.join(fields)}]"
+        annotations = {}
+        for field in fields:
+            info = model.model_fields[names[field]]
+            annotation = Annotated[info.annotation, info]
+            annotations[field] = (
+                Required[annotation] if info.is_required() else NotRequired[annotation]
+            )
+        projection = TypedDict(f"{model.__name__}Fields", annotations)
+        projection.__pydantic_config__ = model.model_config
+        self._item_adapter = TypeAdapter(projection)
+        self.map_page = TypeAdapter(list[projection]).validate_python
+
+    def __call__(self, item: Any) -> dict:
+        return self._item_adapter.validate_python(item)
+
+    def __reduce__(self):
+        return projected_mapper, (self.model, self.fields)
+
+
+@lru_cache(maxsize=256)
+def projected_mapper(
+    model: type[BaseModel], fields: tuple[str, ...]
+) -> ProjectedMapper:
+    """Get the mapper of the given fields of model, raising ValueError if unknown."""
+    return ProjectedMapper(model, fields)
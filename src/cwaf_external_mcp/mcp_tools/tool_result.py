@@ -0,0 +1,63 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encode the tool results with the configured JSON codec."""
+
+from typing import Any, Callable
+
+import pydantic_core
+from fastmcp import FastMCP
+from fastmcp.tools import FunctionTool, ToolResult
+from mcp.types import TextContent
+from pydantic import BaseModel
+
+from cwaf_external_mcp.utilities.json_codec import OrjsonCodec, get_json_codec
+
+
+class JsonCodecTool(FunctionTool):
+    """
+    FunctionTool encoding its model results with orjson when it is the codec.
+
+    Otherwise the text is encoded with pydantic_core, like FastMCP does, which is
+    faster than the stdlib json module.
+    """
+
+    def convert_result(self, raw_value: Any) -> ToolResult:
+        """Convert a model result to a ToolResult, other results use FastMCP."""
+        if not isinstance(raw_value, BaseModel):
+            return super().convert_result(raw_value)
+        structured = pydantic_core.to_jsonable_python(raw_value, by_alias=True)
+        codec = get_json_codec()
+        if isinstance(codec, OrjsonCodec):
+            text = codec.dumps(structured)
+        else:
+            text = pydantic_core.to_json(raw_value, by_alias=True).decode()
+        content = [TextContent(type="text", text=text)]
+        if self.output_schema and self.output_schema.get("x-fastmcp-wrap-result"):
+            return ToolResult(
+                content=content,
+                structured_content={"result": structured},
+                meta={"fastmcp": {"wrap_result": True}},
+            )
+        return ToolResult(content=content, structured_content=structured)
+
+
+def json_codec_tool(server: FastMCP) -> Callable[[Callable], Callable]:
+    """Decorator registering a function as a JsonCodecTool of the server."""
+
+    def decorator(fn: Callable) -> Callable:
+        server.add_tool(JsonCodecTool.from_function(fn))
+        return fn
+
+    return decorator
@@ -14,14 +14,11 @@
 
 """CWAF Response DTO Model."""
 
-from typing import Optional, Any
+from typing import Any, Generic, Optional, TypeVar
 
 from pydantic import BaseModel
 
-from cwaf_external_mcp.model.policy_dto import Policy
-from cwaf_external_mcp.model.rule_dto import Rule
-from cwaf_external_mcp.model.site import Site
-from cwaf_external_mcp.model.site_domain import SiteDomain
+T = TypeVar("T")
 
 
 class Meta(BaseModel):
@@ -33,9 +30,64 @@ class Meta(BaseModel):
     totalPages: Optional[int]
 
 
-class CWAFResponse(BaseModel):
-    """Data Transfer Object for CWAF Response."""
+class CWAFResponse(BaseModel, Generic[T]):
+    """
+    Data Transfer Object for CWAF Response.
 
-    data: list[Site | SiteDomain | Policy | Rule | Any]
+    Parametrized with the DTO of its items (CWAFResponse[Site]) so the response
+    is validated, serialized and described in the tool output schema against a
+    single model.
+    """
+
+    data: list[T]
+    meta: Meta
+    links: dict = {}
+    stale: bool = False
+    truncated: bool = False
+
+    def to_table(self) -> "CWAFTableResponse":
+        """Encode the items as a table, see CWAFTableResponse."""
+        # The field values of the models, encoded once with the whole table
+        items = [
+            item.__dict__ if isinstance(item, BaseModel) else item for item in self.data
+        ]
+        fields = list(
+            dict.fromkeys(
+                key
+                for item in items
+                for key, value in item.items()
+                if value is not None
+            )
+        )
+        # Models are serialized by alias, like the tool results
+        aliases = {}
+        if self.data and isinstance(self.data[0], BaseModel):
+            aliases = {
+                name: info.serialization_alias or name
+                for name, info in type(self.data[0]).model_fields.items()
+            }
+        return CWAFTableResponse.model_construct(
+            columns=[aliases.get(field, field) for field in fields],
+            rows=[[item.get(field) for field in fields] for item in items],
+            meta=self.meta,
+            links=self.links,
+            stale=self.stale,
+            truncated=self.truncated,
+        )
+
+
+class CWAFTableResponse(BaseModel):
+    """
+    CWAF Response with its items encoded as a table.
+
+    columns holds the field names of the items once and each row of rows the
+    values of one item in the same order. Columns that are null in every item
+    are left out.
+    """
+
+    columns: list[str]
+    rows: list[list[Any]]
     meta: Meta
     links: dict = {}
+    stale: bool = False
+    truncated: bool = False
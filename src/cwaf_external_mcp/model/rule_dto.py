@@ -15,7 +15,7 @@
 """Rule DTO Model."""
 
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict, Field
 
 
 class SecurityRuleBlockDurationDetails(BaseModel):
@@ -28,35 +28,76 @@ class SecurityRuleBlockDurationDetails(BaseModel):
 
 
 class Rule(BaseModel):
-    """Data Transfer Object for Rule."""
+    """
+    Data Transfer Object for Rule.
 
-    rule_id: int
+    The upstream nests the rule settings under a `rule` key next to the site and
+    account ids, the validation aliases read them from there.
+    """
+
+    model_config = ConfigDict(validate_by_name=True, validate_by_alias=True)
+
+    rule_id: int = Field(validation_alias=AliasPath("rule", "rule_id"))
     site_id: int
     account_id: int
-    name: str
-    action: str
-    enabled: bool = True
-    filter: Optional[str] = None
+    name: str = Field(validation_alias=AliasPath("rule", "name"))
+    action: str = Field(validation_alias=AliasPath("rule", "action"))
+    enabled: bool = Field(default=True, validation_alias=AliasPath("rule", "enabled"))
+    filter: Optional[str] = Field(
+        default=None, validation_alias=AliasPath("rule", "filter")
+    )
     # ForwardRule
-    dc_id: Optional[int] = None
+    dc_id: Optional[int] = Field(
+        default=None, validation_alias=AliasPath("rule", "dcId")
+    )
     # OverrideWafRule
-    overrideWafRule: Optional[str] = None
-    overrideWafAction: Optional[str] = None
+    overrideWafRule: Optional[str] = Field(
+        default=None, validation_alias=AliasPath("rule", "overrideWafRule")
+    )
+    overrideWafAction: Optional[str] = Field(
+        default=None, validation_alias=AliasPath("rule", "overrideWafAction")
+    )
     # RatesRule
-    rate_interval: Optional[int] = None
-    rate_context: Optional[str] = None
+    rate_interval: Optional[int] = Field(
+        default=None, validation_alias=AliasPath("rule", "rateInterval")
+    )
+    rate_context: Optional[str] = Field(
+        default=None, validation_alias=AliasPath("rule", "rateContext")
+    )
     # RedirectRule
-    to_url: Optional[str] = Field(alias="to", default=None)
-    from_url: Optional[str] = Field(alias="from", default=None)
-    response_code: Optional[int] = None
+    to_url: Optional[str] = Field(
+        alias="to",
+        default=None,
+        validation_alias=AliasChoices(AliasPath("rule", "to"), "to"),
+    )
+    from_url: Optional[str] = Field(
+        alias="from",
+        default=None,
+        validation_alias=AliasChoices(AliasPath("rule", "from"), "from"),
+    )
+    response_code: Optional[int] = Field(
+        default=None, validation_alias=AliasPath("rule", "responseCode")
+    )
     # RewritePortRule
-    port_forwarding_value: Optional[str] = None
-    port_forwarding_context: Optional[str] = None
+    port_forwarding_value: Optional[str] = Field(
+        default=None, validation_alias=AliasPath("rule", "portForwardingValue")
+    )
+    port_forwarding_context: Optional[str] = Field(
+        default=None, validation_alias=AliasPath("rule", "portForwardingContext")
+    )
     # RewriteRule
-    multiple_deletions: Optional[bool] = None
-    rewrite_existing: Optional[bool] = None
-    add_missing: Optional[bool] = None
-    rewrite_name: Optional[str] = None
+    multiple_deletions: Optional[bool] = Field(
+        default=None, validation_alias=AliasPath("rule", "multipleDeletions")
+    )
+    rewrite_existing: Optional[bool] = Field(
+        default=None, validation_alias=AliasPath("rule", "rewriteExisting")
+    )
+    add_missing: Optional[bool] = Field(
+        default=None, validation_alias=AliasPath("rule", "addMissing")
+    )
+    rewrite_name: Optional[str] = Field(
+        default=None, validation_alias=AliasPath("rule", "rewriteName")
+    )
     # SecurityRule
     sendNotifications: Optional[bool] = None
     blockDurationDetails: Optional[SecurityRuleBlockDurationDetails] = None
@@ -16,12 +16,16 @@
 
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+from cwaf_external_mcp.model.timestamps import EpochMillisTimestamp
 
 
 class Site(BaseModel):
     """Data Transfer Object for Site."""
 
+    model_config = ConfigDict(validate_by_name=True, validate_by_alias=True)
+
     name: str
     id: int
     accountId: int
@@ -29,9 +33,9 @@ class Site(BaseModel):
     cloud: Optional[str] = None
     refId: Optional[str] = None
     active: bool
-    cnames: Optional[str]
+    cnames: Optional[str] = Field(default=None, validation_alias="cname")
     attributes: Optional[dict[str, str]] = None
-    creationTime: str
+    creationTime: EpochMillisTimestamp
     siteStatus: Optional[str] = None
     isDefaultSite: Optional[bool] = None
     deploymentKeys: Optional[list[str]] = None
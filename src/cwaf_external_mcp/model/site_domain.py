@@ -16,16 +16,20 @@
 
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+from cwaf_external_mcp.model.timestamps import EpochMillisTimestamp
 
 
 class SiteDomain(BaseModel):
     """Data Transfer Object for Site Domain."""
 
-    name: str
+    model_config = ConfigDict(validate_by_name=True, validate_by_alias=True)
+
+    name: str = Field(validation_alias="domain")
     id: int
-    site_id: int
+    site_id: int = Field(validation_alias="siteId")
     status: str
-    creation_date: str
-    aRecords: Optional[list[str]] = None
+    creation_date: EpochMillisTimestamp = Field(validation_alias="creationDate")
+    aRecords: Optional[list[str]] = Field(default=None, validation_alias="arecords")
     cname: str
@@ -0,0 +1,33 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Timestamp types shared by the DTOs."""
+
+import time
+from typing import Annotated
+
+from pydantic import BeforeValidator
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_epoch_millis(value):
+    """Format an epoch timestamp in milliseconds as a UTC date and time."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return time.strftime(TIMESTAMP_FORMAT, time.gmtime(value / 1000))
+    return value
+
+
+# Upstream sends epoch milliseconds, the DTOs expose a formatted UTC string.
+EpochMillisTimestamp = Annotated[str, BeforeValidator(format_epoch_millis)]
@@ -14,28 +14,47 @@
 
 """MCP server Tools"""
 
+import asyncio
 import os
 import threading
-from typing import Optional, Union, List
+import time
+from typing import Any, Optional, Union, List
 
 from dotenv import load_dotenv
 from fastmcp import FastMCP, Context
+from fastmcp.server.lifespan import lifespan
 from starlette.requests import Request
 from starlette.responses import PlainTextResponse
 from prometheus_client import start_http_server
 
 from cwaf_external_mcp.auth.auth_factory import create_auth_from_config
+from cwaf_external_mcp.context.deadline_middleware import DeadlineMiddleware
+from cwaf_external_mcp.context.trace_middleware import TraceIdMiddleware
+from cwaf_external_mcp.httpclient.aiohttp_client import tune_connection_pools
 from cwaf_external_mcp.httpclient.connection_pool_metrics import (
     poll_connection_pool_metrics,
 )
+from cwaf_external_mcp.httpclient.offload import shutdown_offloader
+from cwaf_external_mcp.httpclient.pool_tuner import get_pool_tuner
+from cwaf_external_mcp.httpclient.warmup import report_ready, warm_up_connections
 from cwaf_external_mcp.mcp_tools.cwaf_tools import (
+    BASE_DOMAINS_URL,
+    BASE_POLICIES_URL,
+    BASE_RULES_URL,
+    BASE_SITES_URL,
     get_account_sites,
     get_site_domains_api,
     get_polices_of_account_by_filter_api,
     get_rules_api,
 )
+from cwaf_external_mcp.mcp_tools.tool_result import json_codec_tool
 from cwaf_external_mcp.model.cwaf_error_response import CWAFErrorResponse
-from cwaf_external_mcp.model.cwaf_response import CWAFResponse
+from cwaf_external_mcp.model.cwaf_response import CWAFResponse, CWAFTableResponse
+from cwaf_external_mcp.model.policy_dto import Policy
+from cwaf_external_mcp.model.rule_dto import Rule
+from cwaf_external_mcp.model.site import Site
+from cwaf_external_mcp.model.site_domain import SiteDomain
+from cwaf_external_mcp.utilities.json_codec import get_json_codec
 from cwaf_external_mcp.utilities.logging import get_logger
 
 load_dotenv()
@@ -47,9 +66,37 @@ if os.environ.get("PROMETHEUS_CLIENT_ENABLED", "false").lower() == "true":
 
 SERVER_PORT = int(os.environ.get("SERVER_PORT", "8050"))
 
+STARTED_AT = time.monotonic()
+
+
+@lifespan
+async def upstream_lifespan(server: FastMCP):
+    """
+    Warm up the upstream connections before serving the first tool call, tune
+    the connection pools while the server runs and stop the offload workers.
+    """
+    if os.environ.get("CONNECTION_WARMUP_ENABLED", "false").lower() == "true":
+        await warm_up_connections(
+            [BASE_SITES_URL, BASE_DOMAINS_URL, BASE_POLICIES_URL, BASE_RULES_URL],
+            connections_per_host=int(os.environ.get("CONNECTION_WARMUP_PER_HOST", "2")),
+            timeout=float(os.environ.get("CONNECTION_WARMUP_TIMEOUT", "5")),
+        )
+    report_ready(STARTED_AT)
+    tuning = None
+    if get_pool_tuner() is not None:
+        tuning = asyncio.create_task(
+            tune_connection_pools(float(os.environ.get("POOL_TUNING_INTERVAL", "10")))
+        )
+    try:
+        yield {}
+    finally:
+        if tuning is not None:
+            tuning.cancel()
+        shutdown_offloader()
+
 
 # Create an MCP server
-cwaf_mcp = FastMCP(name="Cloud WAF Tools")
+cwaf_mcp = FastMCP(name="Cloud WAF Tools", lifespan=upstream_lifespan)
 
 MY_routes = ["get_rules_of_account_tool"]
 
@@ -60,7 +107,7 @@ async def health_check(request: Request) -> PlainTextResponse:
     return PlainTextResponse("OK")
 
 
-@cwaf_mcp.tool()
+@json_codec_tool(cwaf_mcp)
 async def get_rules_of_account_tool(
     context: Context,
     account_id: Optional[Union[int, str]],
@@ -71,7 +118,17 @@ async def get_rules_of_account_tool(
     names: Optional[Union[List[str], str]] = None,
     page_num: Optional[Union[int, str]] = None,
     page_size: Optional[Union[int, str]] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    format: Optional[str] = None,
+    timeout_seconds: Optional[Union[float, str]] = None,
+) -> (
+    CWAFResponse[Rule]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     Fetches the custom rules details associated with the sites under the given account.
     The supported type of rules are:
@@ -86,9 +143,14 @@ async def get_rules_of_account_tool(
         categories (list of strings): list of rules categories, only rules with those types will retrieve, if it exists. possible values are "WafOverride","WafOverride","RewriteResponse","SimplifiedRedirect","Security","Rates","Rewrite","Redirect". (Optional)
         page_num (int) Optional: The page number to fetch. Defaults to 0.
         page_size (int) Optional: The number of items per page. Defaults to 100
+        all_pages (bool) Optional: whether to fetch all the pages starting at page_num and return them merged in a single response. Defaults to False.
+        max_items (int) Optional: maximum number of items to return, pages are fetched until this number is reached. Use it together with all_pages on large accounts. (Optional)
+        fields (list of strings) Optional: names of the Rule properties to return, as named in the output, for example ["rule_id", "name", "action", "to"]. Only those properties are returned, which keeps large responses small; use it when you do not need the full rule details. Defaults to all the properties. (Optional)
+        format (str) Optional: "json" (default) or "table". With "table" the items are returned as a CWAFTableResponse: columns (the property names, once) and rows (one list of values per item, in the order of columns), properties that are null in every item are left out. Prefer "table" for long lists, it is about half the size. (Optional)
+        timeout_seconds (float) Optional: maximum time in seconds to wait for the Imperva API. When it runs out while fetching several pages, the pages fetched so far are returned with truncated set to True. (Optional)
 
     Returns:
-        On success: CWAFResponse: an object with the following properties:
+        On success: CWAFResponse[Rule]: an object with the following properties:
             data: a list of Rules objects, if there are no rules associated with the site, an empty list will be returned:
                   For each rule type, a different set of properties is available:
                 Rule:{
@@ -104,8 +166,8 @@ async def get_rules_of_account_tool(
                     overrideWafAction: str --> The action to take when overriding the WAF rule. (only exists on OverrideWafRule)
                     rate_interval: int --> The time interval for rate limiting in seconds. (only exists on RatesRule)
                     rate_context:str --> The context for the rate limiting rule. (only exists on RatesRule)
-                    to_url: str --> The URL to redirect to. (only exists on RedirectRule)
-                    from_url: str --> The URL to redirect from. (only exists on RedirectRule)
+                    to: str --> The URL to redirect to. (only exists on RedirectRule)
+                    from: str --> The URL to redirect from. (only exists on RedirectRule)
                     response_code: int --> The HTTP response code to return for the redirect. (only exists on RedirectRule)
                     port_forwarding_value: str --> The port forwarding value for the rule. (only exists on RewritePortRule)
                     port_forwarding_context: str --> The context for the port forwarding rule. (only exists on RewritePortRule)
@@ -132,6 +194,8 @@ async def get_rules_of_account_tool(
                     totalElements: int --> The total number of elements across all pages. (only available when all_pages is True)
                     totalPages: int --> The total number of pages available. (only available when all_pages is True)
                 }
+            stale: bool --> True when the Imperva API is unavailable and the data is served from cache, it may be outdated.
+            truncated: bool --> True when timeout_seconds ran out or the page limit of the server was reached before all the pages were fetched, only the first pages are returned and meta.page is the last page returned.
 
         On failure: a list of ApiError objects:
             ApiError:{
@@ -150,11 +214,15 @@ async def get_rules_of_account_tool(
         names=names,
         page_num=page_num,
         page_size=page_size,
+        all_pages=all_pages,
+        max_items=max_items,
+        fields=fields,
+        response_format=format,
         context=context,
     )
 
 
-@cwaf_mcp.tool()
+@json_codec_tool(cwaf_mcp)
 async def get_polices_of_account_by_filter_tool(
     context: Context,
     account_id: Optional[Union[int, str]],
@@ -166,7 +234,17 @@ async def get_polices_of_account_by_filter_tool(
     names: Optional[Union[List[str], str]] = None,
     page_num: Optional[Union[int, str]] = None,
     page_size: Optional[Union[int, str]] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    format: Optional[str] = None,
+    timeout_seconds: Optional[Union[float, str]] = None,
+) -> (
+    CWAFResponse[Policy]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     Fetches all policies of a given account.
 
@@ -180,9 +258,14 @@ async def get_polices_of_account_by_filter_tool(
         extended (bool): whether to retrieve the full policy details, or only the basic information (without the policySettings and defaultPolicyConfig fields). Defaults to True. (Optional)
         page_num (int) Optional: The page number to fetch. Default to 0.
         page_size (int) Optional: The number of items per page. Defaults to 20, max 100.
+        all_pages (bool) Optional: whether to fetch all the pages starting at page_num and return them merged in a single response. Defaults to False.
+        max_items (int) Optional: maximum number of items to return, pages are fetched until this number is reached. Use it together with all_pages on large accounts. (Optional)
+        fields (list of strings) Optional: names of the Policy properties to return, for example ["id", "name", "enabled"]. Only those properties are returned, which keeps large responses small; use it when you do not need the full policy details. Defaults to all the properties. (Optional)
+        format (str) Optional: "json" (default) or "table". With "table" the items are returned as a CWAFTableResponse: columns (the property names, once) and rows (one list of values per item, in the order of columns), properties that are null in every item are left out. Prefer "table" for long lists, it is about half the size. (Optional)
+        timeout_seconds (float) Optional: maximum time in seconds to wait for the Imperva API. When it runs out while fetching several pages, the pages fetched so far are returned with truncated set to True. (Optional)
 
     Returns:
-        On success: CWAFResponse: an object with the following properties:
+        On success: CWAFResponse[Policy]: an object with the following properties:
         data: a list of Policy objects (described below), if there are no rules associated with the site, an empty list will be returned
         meta: Meta object containing pagination information:
             Meta:{
@@ -262,6 +345,8 @@ async def get_polices_of_account_by_filter_tool(
                 assetId: int --> The unique identifier of the asset to which the exception applies. (e.g., site ID)
                 assetType: str --> The type of the asset, currently only "WEBSITE" is supported.
             }
+        stale: bool --> True when the Imperva API is unavailable and the data is served from cache, it may be outdated.
+        truncated: bool --> True when timeout_seconds ran out or the page limit of the server was reached before all the pages were fetched, only the first pages are returned and meta.page is the last page returned.
 
         On failure: a list of ApiError objects:
             ApiError:{
@@ -281,11 +366,15 @@ async def get_polices_of_account_by_filter_tool(
         names=names,
         page_num=page_num,
         page_size=page_size,
+        all_pages=all_pages,
+        max_items=max_items,
+        fields=fields,
+        response_format=format,
         context=context,
     )
 
 
-@cwaf_mcp.tool()
+@json_codec_tool(cwaf_mcp)
 async def get_domains_by_filters_tool(
     context: Context,
     account_id: Optional[Union[int, str]],
@@ -294,7 +383,17 @@ async def get_domains_by_filters_tool(
     names: Optional[Union[List[str], str]] = None,
     page_num: Optional[Union[int, str]] = None,
     page_size: Optional[Union[int, str]] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    format: Optional[str] = None,
+    timeout_seconds: Optional[Union[float, str]] = None,
+) -> (
+    CWAFResponse[SiteDomain]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     Fetches the domains associated with a specific site under a given account.
     To get a single domain details provide the domain ID, or the domain name.
@@ -309,9 +408,14 @@ async def get_domains_by_filters_tool(
         names: (list of strings) list of domain names.
         page_num (number) Optional: The page number to fetch. Defaults to 0.
         page_size (number) Optional: The number of items per page. Defaults to 10, valid values are 10,25,50,100.
+        all_pages (bool) Optional: whether to fetch all the pages starting at page_num and return them merged in a single response. Defaults to False.
+        max_items (int) Optional: maximum number of items to return, pages are fetched until this number is reached. Use it together with all_pages on large accounts. (Optional)
+        fields (list of strings) Optional: names of the SiteDomain properties to return, for example ["id", "name", "status"]. Only those properties are returned, which keeps large responses small; use it when you do not need the full domain details. Defaults to all the properties. (Optional)
+        format (str) Optional: "json" (default) or "table". With "table" the items are returned as a CWAFTableResponse: columns (the property names, once) and rows (one list of values per item, in the order of columns), properties that are null in every item are left out. Prefer "table" for long lists, it is about half the size. (Optional)
+        timeout_seconds (float) Optional: maximum time in seconds to wait for the Imperva API. When it runs out while fetching several pages, the pages fetched so far are returned with truncated set to True. (Optional)
 
     Returns:
-        On success: CWAFResponse: an object with the following properties:
+        On success: CWAFResponse[SiteDomain]: an object with the following properties:
             data: a list of SiteDomain objects, if there are no domains associated with the site, an empty list will be returned:
                 SiteDomain:{
                     name: str --> The domain name.
@@ -335,6 +439,8 @@ async def get_domains_by_filters_tool(
                     - last: The URL to the last page of results.
                     - next: The URL to the next page of results, if available.
                     - prev: The URL to the previous page of results, if available.
+            stale: bool --> True when the Imperva API is unavailable and the data is served from cache, it may be outdated.
+            truncated: bool --> True when timeout_seconds ran out or the page limit of the server was reached before all the pages were fetched, only the first pages are returned and meta.page is the last page returned.
 
         On failure: a list of ApiError objects:
             ApiError:{
@@ -351,11 +457,15 @@ async def get_domains_by_filters_tool(
         names=names,
         page_num=page_num,
         page_size=page_size,
+        all_pages=all_pages,
+        max_items=max_items,
+        fields=fields,
+        response_format=format,
         context=context,
     )
 
 
-@cwaf_mcp.tool()
+@json_codec_tool(cwaf_mcp)
 async def get_sites_details_of_a_given_account_tool(
     context: Context,
     account_id: Optional[Union[int, str]],
@@ -364,7 +474,17 @@ async def get_sites_details_of_a_given_account_tool(
     sub_account_ids: Optional[Union[List[int], str]] = None,
     page_num: Optional[Union[int, str]] = None,
     page_size: Optional[Union[int, str]] = None,
-) -> CWAFResponse | CWAFErrorResponse:
+    all_pages: Union[bool, str] = False,
+    max_items: Optional[Union[int, str]] = None,
+    fields: Optional[Union[List[str], str]] = None,
+    format: Optional[str] = None,
+    timeout_seconds: Optional[Union[float, str]] = None,
+) -> (
+    CWAFResponse[Site]
+    | CWAFResponse[dict[str, Any]]
+    | CWAFTableResponse
+    | CWAFErrorResponse
+):
     """
     Fetches the list of sites for a given account.
     To get a single site details provide the site Id or the site name.
@@ -379,9 +499,14 @@ async def get_sites_details_of_a_given_account_tool(
         sub_account_ids (list of numbers): list of subaccount IDs, only sites under the matching subaccounts will retrieve, if exists. (Optional)
         page_num (int) Optional: The page number to fetch. Defaults to 0.
         page_size (int) Optional: The number of items per page. Defaults to 10, valid values are 10,25,50,100.
+        all_pages (bool) Optional: whether to fetch all the pages starting at page_num and return them merged in a single response. Defaults to False.
+        max_items (int) Optional: maximum number of items to return, pages are fetched until this number is reached. Use it together with all_pages on large accounts. (Optional)
+        fields (list of strings) Optional: names of the Site properties to return, for example ["id", "name", "siteStatus"]. Only those properties are returned, which keeps large responses small; use it when you do not need the full site details. Defaults to all the properties. (Optional)
+        format (str) Optional: "json" (default) or "table". With "table" the items are returned as a CWAFTableResponse: columns (the property names, once) and rows (one list of values per item, in the order of columns), properties that are null in every item are left out. Prefer "table" for long lists, it is about half the size. (Optional)
+        timeout_seconds (float) Optional: maximum time in seconds to wait for the Imperva API. When it runs out while fetching several pages, the pages fetched so far are returned with truncated set to True. (Optional)
 
     Returns:
-        On success: CWAFResponse: an object with the following properties:
+        On success: CWAFResponse[Site]: an object with the following properties:
             data: a list of Site objects:
                 Site:{
                     name: str --> The site name. (the site name is not always the domain name, to get the list of domains use the appropriate tool)
@@ -409,6 +534,8 @@ async def get_sites_details_of_a_given_account_tool(
                     - last: The URL to the last page of results.
                     - next: The URL to the next page of results, if available.
                     - prev: The URL to the previous page of results, if available.
+            stale: bool --> True when the Imperva API is unavailable and the data is served from cache, it may be outdated.
+            truncated: bool --> True when timeout_seconds ran out or the page limit of the server was reached before all the pages were fetched, only the first pages are returned and meta.page is the last page returned.
 
         On failure: a list of ApiError objects:
             ApiError:{
@@ -425,6 +552,10 @@ async def get_sites_details_of_a_given_account_tool(
         sub_account_ids=sub_account_ids,
         page_num=page_num,
         page_size=page_size,
+        all_pages=all_pages,
+        max_items=max_items,
+        fields=fields,
+        response_format=format,
         context=context,
     )
 
@@ -433,8 +564,11 @@ async def get_sites_details_of_a_given_account_tool(
 def main():
     """Main method."""
     auth_strategy = create_auth_from_config()
+    get_json_codec()
     for middleware in auth_strategy.get_middlewares():
         cwaf_mcp.add_middleware(middleware)
+    cwaf_mcp.add_middleware(TraceIdMiddleware())
+    cwaf_mcp.add_middleware(DeadlineMiddleware())
     if os.environ.get("PROMETHEUS_CLIENT_ENABLED", "false").lower() == "true":
         threading.Thread(target=poll_connection_pool_metrics, daemon=True).start()
     if os.environ.get("STDIO", "true").lower() == "true":
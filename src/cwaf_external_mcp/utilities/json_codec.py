@@ -0,0 +1,85 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pluggable JSON codec, orjson is used when installed and stdlib json otherwise."""
+
+import importlib
+import json
+import os
+from typing import Any
+
+from cwaf_external_mcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+JSON_CODEC = None
+
+
+class JsonCodec:
+    """JSON codec backed by the stdlib json module."""
+
+    name = "stdlib"
+
+    def loads(self, data: bytes | str) -> Any:
+        """Decode a JSON document, raise ValueError when it is invalid."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        """Encode an object as a compact JSON document."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec backed by orjson."""
+
+    name = "orjson"
+
+    def __init__(self):
+        self._orjson = importlib.import_module("orjson")
+
+    def loads(self, data: bytes | str) -> Any:
+        """Decode a JSON document, raise ValueError when it is invalid."""
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        """Encode an object as a compact JSON document."""
+        return self._orjson.dumps(obj).decode()
+
+
+def create_codec_from_config() -> JsonCodec:
+    """Decide which JsonCodec to use based on config."""
+    mode = os.environ.get("JSON_CODEC", "auto").lower()
+
+    if mode == "stdlib":
+        return JsonCodec()
+
+    if mode == "orjson":
+        return OrjsonCodec()
+
+    if mode == "auto":
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return JsonCodec()
+
+    raise ValueError(f"Unknown JSON_CODEC: {mode!r}")
+
+
+def get_json_codec() -> JsonCodec:
+    """Get the JSON codec selected at startup."""
+    global JSON_CODEC
+    if JSON_CODEC is None:
+        JSON_CODEC = create_codec_from_config()
+        logger.info(f"Using the {JSON_CODEC.name} JSON codec")
+    return JSON_CODEC
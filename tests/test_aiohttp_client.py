@@ -46,6 +46,7 @@ def reset_session(event_loop):
     import cwaf_external_mcp.httpclient.aiohttp_client as client_module
 
     client_module.SESSION = None
+    client_module.SSL_CONTEXT = None
     yield
     if client_module.SESSION and not client_module.SESSION.closed:
         try:
@@ -53,6 +54,7 @@ def reset_session(event_loop):
         except Exception:
             pass
     client_module.SESSION = None
+    client_module.SSL_CONTEXT = None
 
 
 @pytest.mark.asyncio
@@ -265,3 +267,16 @@ async def test_collect_pool_metrics_with_active_session():
     collect_pool_metrics()
 
     await session.close()
+
+
+@pytest.mark.asyncio
+async def test_ssl_context_is_shared_across_session_rebuilds():
+    """Test rebuilt sessions reuse the same SSL context."""
+    from cwaf_external_mcp.httpclient.aiohttp_client import _build_session
+
+    first = _build_session()
+    second = _build_session()
+
+    assert first.connector._ssl is second.connector._ssl
+    await first.close()
+    await second.close()
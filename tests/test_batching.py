@@ -0,0 +1,320 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+import cwaf_external_mcp.httpclient.response_cache as response_cache
+import cwaf_external_mcp.mcp_tools.batching as batching
+import cwaf_external_mcp.mcp_tools.cwaf_tools as cwaf_tools
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.httpclient.priority_lanes import BACKGROUND, INTERACTIVE
+from cwaf_external_mcp.httpclient.upstream_client import (
+    DeadlineExceededError,
+    UpstreamResponse,
+    cache_json,
+)
+from cwaf_external_mcp.mcp_tools.batching import (
+    PointLookupBatcher,
+    get_point_lookup,
+    get_point_lookup_batcher,
+    split_response,
+)
+
+SITES_URL = "https://api.imperva.com/sites-mgmt/v3/sites/extended"
+RULES_URL = "https://my.imperva.com/api/prov/v3/rules"
+
+
+def _fetcher(total_pages=1, status=200):
+    """Fake get_json answering with one item per requested site ID."""
+    calls = []
+
+    async def fetch(url, params, headers, mapper):
+        calls.append(params)
+        ids = str(params.get("siteIds", "")).split(",")
+        data = [SimpleNamespace(id=int(i)) for i in ids if i not in ("", "404")]
+        return UpstreamResponse(
+            status=status,
+            body={"data": data, "meta": {"size": 50, "totalPages": total_pages}},
+            size=100 * len(data),
+        )
+
+    return fetch, calls
+
+
+def _lookups(endpoint: str, result: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "cwaf_upstream_batched_lookups_total",
+            {"endpoint": endpoint, "result": result},
+        )
+        or 0
+    )
+
+
+def test_get_point_lookup():
+    lookup = get_point_lookup(SITES_URL, {"caid": 1, "siteIds": "7"})
+    assert (lookup.id_param, lookup.id_value, lookup.attribute) == (
+        "siteIds",
+        "7",
+        "id",
+    )
+    assert lookup.params == {"caid": 1}
+    assert get_point_lookup(RULES_URL, {"ruleIds": "7"}).attribute == "rule_id"
+
+
+@pytest.mark.parametrize(
+    "url, params",
+    [
+        (SITES_URL, {"caid": 1}),
+        (SITES_URL, {"siteIds": "7,8"}),
+        (SITES_URL, {"siteIds": "7", "page": 2}),
+        (RULES_URL, {"siteIds": "7"}),
+        ("https://example.com/other", {"siteIds": "7"}),
+    ],
+)
+def test_get_point_lookup_rejects_other_requests(url, params):
+    assert get_point_lookup(url, params) is None
+
+
+def test_split_response_by_id():
+    response = UpstreamResponse(
+        status=200,
+        body={
+            "data": [SimpleNamespace(id=1), SimpleNamespace(id=2)],
+            "meta": {"size": 50, "page": 0, "totalElements": 2, "totalPages": 1},
+        },
+        size=200,
+        stale=True,
+    )
+    split = split_response(response, "id", ["1", "2", "3"])
+    assert [item.id for item in split["1"].body["data"]] == [1]
+    assert split["1"].body["meta"] == {
+        "size": 50,
+        "page": 0,
+        "totalElements": 1,
+        "totalPages": 1,
+    }
+    assert split["1"].size == 100
+    assert split["1"].stale
+    assert split["3"].body["data"] == []
+    assert split["3"].body["meta"]["totalPages"] == 0
+
+
+def test_split_response_drops_the_links_of_the_merged_request():
+    response = UpstreamResponse(
+        status=200,
+        body={
+            "data": [SimpleNamespace(id=1)],
+            "meta": {"totalPages": 1},
+            "links": {"self": "https://api/sites?siteIds=1,2"},
+        },
+    )
+    assert "links" not in split_response(response, "id", ["1", "2"])["1"].body
+
+
+def test_split_response_of_projected_items():
+    response = UpstreamResponse(
+        status=200,
+        body={"data": [{"id": 1}, {"id": 2}], "meta": {"totalPages": 1}},
+    )
+    split = split_response(response, "id", ["1", "2"])
+    assert split["2"].body["data"] == [{"id": 2}]
+    response.body["data"] = [{"name": "a"}]
+    assert split_response(response, "id", ["1", "2"]) is None
+
+
+@pytest.mark.parametrize(
+    "status, meta",
+    [
+        (500, {}),
+        (200, {"totalPages": 2}),
+        (200, {"totalElements": 5}),
+    ],
+)
+def test_split_response_rejects_failed_or_incomplete_responses(status, meta):
+    response = UpstreamResponse(
+        status=status, body={"data": [SimpleNamespace(id=1)], "meta": meta}
+    )
+    assert split_response(response, "id", ["1", "2"]) is None
+
+
+async def test_concurrent_lookups_are_batched():
+    fetch, calls = _fetcher()
+    batcher = PointLookupBatcher(window=0.01, max_ids=10)
+    responses = await asyncio.gather(
+        *(
+            batcher.load(fetch, SITES_URL, {"caid": 1, "siteIds": site_id}, {}, str)
+            for site_id in ("1", "2", "2", "404")
+        )
+    )
+    assert calls == [{"caid": 1, "siteIds": "1,2,404", "size": 100}]
+    assert [[item.id for item in r.body["data"]] for r in responses] == [
+        [1],
+        [2],
+        [2],
+        [],
+    ]
+    assert responses[1] is responses[2]
+    assert _lookups("sites", "batched") >= 3
+
+
+async def test_lookups_with_different_filters_are_not_merged():
+    fetch, calls = _fetcher()
+    batcher = PointLookupBatcher(window=0.01, max_ids=10)
+    await asyncio.gather(
+        batcher.load(fetch, SITES_URL, {"caid": 1, "siteIds": "1"}, {}, str),
+        batcher.load(fetch, SITES_URL, {"caid": 2, "siteIds": "2"}, {}, str),
+        batcher.load(fetch, SITES_URL, {"caid": 1, "siteIds": "3"}, {"x": "y"}, str),
+    )
+    assert len(calls) == 3
+
+
+async def test_full_batch_is_sent_before_the_window():
+    fetch, calls = _fetcher()
+    batcher = PointLookupBatcher(window=10, max_ids=2)
+    await asyncio.wait_for(
+        asyncio.gather(
+            batcher.load(fetch, SITES_URL, {"siteIds": "1"}, {}, str),
+            batcher.load(fetch, SITES_URL, {"siteIds": "2"}, {}, str),
+        ),
+        1,
+    )
+    assert calls == [{"siteIds": "1,2", "size": 100}]
+
+
+async def test_incomplete_batch_falls_back_to_single_lookups():
+    fetch, calls = _fetcher(total_pages=2)
+    batcher = PointLookupBatcher(window=0.01, max_ids=10)
+    responses = await asyncio.gather(
+        batcher.load(fetch, SITES_URL, {"siteIds": "1"}, {}, str),
+        batcher.load(fetch, SITES_URL, {"siteIds": "2"}, {}, str),
+    )
+    assert calls == [
+        {"siteIds": "1,2", "size": 100},
+        {"siteIds": "1"},
+        {"siteIds": "2"},
+    ]
+    assert [r.body["data"][0].id for r in responses] == [1, 2]
+    assert _lookups("sites", "fallback") >= 2
+
+
+async def test_batch_errors_are_raised_to_every_lookup():
+    async def fetch(url, params, headers, mapper):
+        raise RuntimeError("down")
+
+    batcher = PointLookupBatcher(window=0.01, max_ids=10)
+    results = await asyncio.gather(
+        batcher.load(fetch, SITES_URL, {"siteIds": "1"}, {}, str),
+        batcher.load(fetch, SITES_URL, {"siteIds": "2"}, {}, str),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_batch_runs_without_the_deadline_of_its_first_lookup():
+    seen = []
+
+    async def fetch(url, params, headers, mapper):
+        seen.append(
+            (context_manager.get_remaining_time(), context_manager.get_priority())
+        )
+        await asyncio.sleep(0.05)
+        data = [SimpleNamespace(id=int(i)) for i in params["siteIds"].split(",")]
+        return UpstreamResponse(200, {"data": data, "meta": {"totalPages": 1}})
+
+    async def lookup(site_id, budget, priority):
+        context_manager.set_deadline(
+            None if budget is None else time.monotonic() + budget
+        )
+        context_manager.set_priority(priority)
+        return await batcher.load(fetch, SITES_URL, {"siteIds": site_id}, {}, str)
+
+    batcher = PointLookupBatcher(window=0.01, max_ids=10)
+    first, second = await asyncio.gather(
+        lookup("1", 0.03, BACKGROUND),
+        lookup("2", None, INTERACTIVE),
+        return_exceptions=True,
+    )
+    assert isinstance(first, DeadlineExceededError)
+    assert second.body["data"][0].id == 2
+    assert seen == [(None, INTERACTIVE)]
+
+
+async def test_cached_lookups_are_not_batched(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "true")
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE", None)
+    fetch, calls = _fetcher()
+    cached = UpstreamResponse(200, {"data": [SimpleNamespace(id=1)], "meta": {}})
+    cache_json(SITES_URL, {"caid": 1, "siteIds": "1"}, {}, str, cached)
+    batcher = PointLookupBatcher(window=0.01, max_ids=10)
+    first, second = await asyncio.gather(
+        batcher.load(fetch, SITES_URL, {"caid": 1, "siteIds": 1}, {}, str),
+        batcher.load(fetch, SITES_URL, {"caid": 1, "siteIds": "2"}, {}, str),
+    )
+    assert calls == [{"caid": 1, "siteIds": "2"}]
+    assert first.source == "cache"
+    assert second.body["data"][0].id == 2
+
+
+async def test_split_responses_are_cached_per_id(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "true")
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE", None)
+    fetch, calls = _fetcher()
+    batcher = PointLookupBatcher(window=0.01, max_ids=10)
+    await asyncio.gather(
+        batcher.load(fetch, SITES_URL, {"siteIds": "1"}, {}, str),
+        batcher.load(fetch, SITES_URL, {"siteIds": "2"}, {}, str),
+    )
+    response = await batcher.load(fetch, SITES_URL, {"siteIds": "2"}, {}, str)
+    assert calls == [{"siteIds": "1,2", "size": 100}]
+    assert response.source == "cache"
+    assert [item.id for item in response.body["data"]] == [2]
+
+
+async def test_other_requests_are_not_delayed():
+    fetch, calls = _fetcher()
+    batcher = PointLookupBatcher(window=10, max_ids=10)
+    await asyncio.wait_for(batcher.load(fetch, SITES_URL, {"caid": 1}, {}, str), 1)
+    assert calls == [{"caid": 1}]
+
+
+def test_get_point_lookup_batcher(monkeypatch):
+    monkeypatch.setattr(batching, "POINT_LOOKUP_BATCHER", None)
+    monkeypatch.delenv("BATCHING_ENABLED", raising=False)
+    assert get_point_lookup_batcher() is None
+    monkeypatch.setenv("BATCHING_ENABLED", "true")
+    monkeypatch.setenv("BATCHING_WINDOW_MS", "20")
+    batcher = get_point_lookup_batcher()
+    assert (batcher.window, batcher.max_ids) == (0.02, 20)
+    assert get_point_lookup_batcher() is batcher
+
+
+async def test_site_lookup_tools_are_batched(monkeypatch):
+    fetch, calls = _fetcher()
+    monkeypatch.setattr(cwaf_tools, "get_json", fetch)
+    monkeypatch.setattr(batching, "POINT_LOOKUP_BATCHER", None)
+    monkeypatch.setenv("BATCHING_ENABLED", "true")
+    results = await asyncio.gather(
+        cwaf_tools.get_account_sites(1, external_site_ids="1"),
+        cwaf_tools.get_account_sites(1, external_site_ids="2"),
+        cwaf_tools.get_account_sites(1, external_site_ids="3", all_pages=True),
+    )
+    assert sorted(call["siteIds"] for call in calls) == ["1,2", "3"]
+    assert [r.data[0].id for r in results] == [1, 2, 3]
+    assert results[0].meta.totalElements == 1
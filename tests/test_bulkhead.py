@@ -0,0 +1,85 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+import cwaf_external_mcp.httpclient.bulkhead as bulkhead_module
+from cwaf_external_mcp.httpclient.bulkhead import (
+    Bulkhead,
+    BulkheadFullError,
+    get_bulkhead,
+)
+
+
+def _sample(name: str, upstream: str) -> float:
+    return REGISTRY.get_sample_value(name, {"upstream": upstream})
+
+
+async def test_acquire_queues_then_rejects():
+    bulkhead = Bulkhead("bh_full", max_concurrent=1, max_queue=1)
+    await bulkhead.acquire()
+    waiter = asyncio.ensure_future(bulkhead.acquire())
+    await asyncio.sleep(0)
+    assert _sample("cwaf_upstream_bulkhead_saturation", "bh_full") == 1
+    with pytest.raises(BulkheadFullError):
+        await bulkhead.acquire()
+    assert _sample("cwaf_upstream_bulkhead_rejected_total", "bh_full") == 1
+
+    bulkhead.release()
+    await waiter
+    assert bulkhead.in_flight == 1
+    assert _sample("cwaf_upstream_bulkhead_queue_depth", "bh_full") == 0
+    bulkhead.release()
+    assert _sample("cwaf_upstream_bulkhead_saturation", "bh_full") == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    bulkhead = Bulkhead("bh_cancel", max_concurrent=1, max_queue=1)
+    await bulkhead.acquire()
+    waiter = asyncio.ensure_future(bulkhead.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    waiter = asyncio.ensure_future(bulkhead.acquire())
+    await asyncio.sleep(0)
+    bulkhead.release()
+    await waiter
+    assert bulkhead.in_flight == 1
+
+
+async def test_bulkheads_are_isolated():
+    policies = Bulkhead("bh_policies", max_concurrent=1, max_queue=0)
+    sites = Bulkhead("bh_sites", max_concurrent=1, max_queue=0)
+    await policies.acquire()
+    with pytest.raises(BulkheadFullError):
+        await policies.acquire()
+    await sites.acquire()
+    assert sites.in_flight == 1
+
+
+def test_get_bulkhead(monkeypatch):
+    monkeypatch.setattr(bulkhead_module, "BULKHEADS", {})
+    monkeypatch.delenv("BULKHEAD_ENABLED", raising=False)
+    assert get_bulkhead("sites") is None
+    monkeypatch.setenv("BULKHEAD_ENABLED", "true")
+    monkeypatch.setenv("BULKHEAD_MAX_CONCURRENT", "4")
+    monkeypatch.setenv("BULKHEAD_MAX_QUEUE_RULES", "2")
+    rules = get_bulkhead("rules")
+    assert (rules.max_concurrent, rules.max_queue) == (4, 2)
+    assert get_bulkhead("rules") is rules
+    assert get_bulkhead("sites").max_queue == 20
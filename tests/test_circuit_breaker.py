@@ -0,0 +1,146 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from unittest import mock
+
+import cwaf_external_mcp.httpclient.circuit_breaker as circuit_breaker
+from cwaf_external_mcp.httpclient.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_failure_status,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Control the monotonic clock used by the breaker."""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _breaker(slow_call_seconds=10.0):
+    return CircuitBreaker(
+        name="test",
+        failure_ratio=0.5,
+        min_calls=4,
+        window_size=4,
+        slow_call_seconds=slow_call_seconds,
+        open_seconds=30,
+    )
+
+
+async def _call(breaker, status):
+    return await breaker.call(
+        mock.AsyncMock(return_value=mock.Mock(status=status)),
+        lambda r: is_failure_status(r.status),
+    )
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_failure_ratio_and_fails_fast(clock):
+    breaker = _breaker()
+    for status in (200, 500, 200, 503):
+        await _call(breaker, status)
+    assert breaker.state == OPEN
+
+    func = mock.AsyncMock()
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(func, lambda r: False)
+    func.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_breaker_stays_closed_below_threshold(clock):
+    breaker = _breaker()
+    for status in (200, 200, 200, 500, 200):
+        await _call(breaker, status)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_counts_exceptions_and_slow_calls(clock):
+    breaker = _breaker(slow_call_seconds=1.0)
+
+    async def slow():
+        clock[0] += 2
+        return mock.Mock(status=200)
+
+    for _ in range(2):
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(
+                mock.AsyncMock(side_effect=asyncio.TimeoutError()), lambda r: False
+            )
+        await breaker.call(slow, lambda r: False)
+    assert breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_probe_closes_on_success(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        await _call(breaker, 500)
+    clock[0] += 31
+    await _call(breaker, 200)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_probe_reopens_on_failure(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        await _call(breaker, 500)
+    clock[0] += 31
+    await _call(breaker, 500)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await _call(breaker, 200)
+
+
+@pytest.mark.asyncio
+async def test_breaker_allows_a_single_half_open_probe(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        await _call(breaker, 500)
+    clock[0] += 31
+    release = asyncio.Event()
+
+    async def probe():
+        await release.wait()
+        return mock.Mock(status=200)
+
+    probe_task = asyncio.create_task(breaker.call(probe, lambda r: False))
+    await asyncio.sleep(0)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        await _call(breaker, 200)
+    release.set()
+    await probe_task
+    assert breaker.state == CLOSED
+
+
+def test_get_circuit_breaker_per_upstream(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "BREAKERS", {})
+    monkeypatch.setenv("CIRCUIT_BREAKER_ENABLED", "false")
+    assert circuit_breaker.get_circuit_breaker("rules") is None
+    monkeypatch.setenv("CIRCUIT_BREAKER_ENABLED", "true")
+    rules = circuit_breaker.get_circuit_breaker("rules")
+    assert rules is circuit_breaker.get_circuit_breaker("rules")
+    assert rules is not circuit_breaker.get_circuit_breaker("sites")
@@ -0,0 +1,127 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from unittest import mock
+
+import cwaf_external_mcp.httpclient.concurrency_limiter as concurrency_limiter
+from cwaf_external_mcp.httpclient.concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+)
+
+
+def _limiter(initial_limit=2, min_limit=1, max_limit=10):
+    return AdaptiveConcurrencyLimiter(
+        name="test",
+        initial_limit=initial_limit,
+        min_limit=min_limit,
+        max_limit=max_limit,
+        smoothing=1.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_acquire_queues_beyond_limit():
+    limiter = _limiter(initial_limit=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    assert len(limiter._waiters) == 1
+
+    limiter.release()
+    await waiter
+    assert limiter.in_flight == 1
+    assert len(limiter._waiters) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = _limiter(initial_limit=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert len(limiter._waiters) == 0
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+def test_limit_grows_while_latency_is_flat_and_saturated():
+    limiter = _limiter(initial_limit=2)
+    limiter.in_flight = 2
+    limiter.release(rtt=0.1)
+    assert limiter.limit == 3
+    limiter.in_flight = 2
+    limiter.release(rtt=0.1)
+    assert limiter.limit == 4
+
+
+def test_limit_does_not_grow_when_underused():
+    limiter = _limiter(initial_limit=8)
+    limiter.in_flight = 1
+    limiter.release(rtt=0.1)
+    assert limiter.limit == 8
+
+
+def test_limit_shrinks_when_latency_rises():
+    limiter = _limiter(initial_limit=8)
+    limiter.in_flight = 1
+    limiter.release(rtt=0.1)
+    limiter.in_flight = 1
+    limiter.release(rtt=0.3)
+    assert limiter.limit == pytest.approx(8 * 2 * 0.1 / 0.3)
+
+
+def test_limit_backs_off_on_drops_within_bounds():
+    limiter = _limiter(initial_limit=2, min_limit=1)
+    for _ in range(10):
+        limiter.in_flight = 1
+        limiter.release(dropped=True)
+    assert limiter.limit == 1
+
+
+@pytest.mark.asyncio
+async def test_run_treats_throttled_responses_as_drops():
+    limiter = _limiter(initial_limit=5)
+    response = mock.Mock(status=429)
+    result = await limiter.run(mock.AsyncMock(return_value=response), lambda r: True)
+    assert result is response
+    assert limiter.limit == pytest.approx(4.5)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_run_treats_timeouts_as_drops():
+    limiter = _limiter(initial_limit=5)
+    with pytest.raises(asyncio.TimeoutError):
+        await limiter.run(
+            mock.AsyncMock(side_effect=asyncio.TimeoutError()), lambda r: False
+        )
+    assert limiter.limit == pytest.approx(4.5)
+    assert limiter.in_flight == 0
+
+
+def test_get_concurrency_limiter_per_upstream(monkeypatch):
+    monkeypatch.setattr(concurrency_limiter, "LIMITERS", {})
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY_ENABLED", "false")
+    assert concurrency_limiter.get_concurrency_limiter("sites") is None
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY_ENABLED", "true")
+    sites = concurrency_limiter.get_concurrency_limiter("sites")
+    assert sites is concurrency_limiter.get_concurrency_limiter("sites")
+    assert sites is not concurrency_limiter.get_concurrency_limiter("rules")
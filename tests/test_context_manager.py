@@ -13,6 +13,8 @@
 # limitations under the License.
 
 
+import time
+
 import pytest
 from contextvars import Token
 
@@ -242,3 +244,42 @@ def test_context_is_mutable_through_reference():
     # In the current implementation, if we just get the context and modify it,
     # the change persists because ContextVar returns the same instance
     assert retrieved_context.trace_id == "modified_trace"
+
+
+def test_set_deadline_keeps_trace_id_and_headers():
+    """Test set_deadline only updates the deadline of the current context."""
+    cm = ContextManager()
+    cm.set_current_context(MCPContext(trace_id="trace", headers={"key": "value"}))
+
+    cm.set_deadline(time.monotonic() + 10)
+
+    assert cm.get_current_trace_id() == "trace"
+    assert cm.get_headers() == {"key": "value"}
+    assert 9 < cm.get_remaining_time() <= 10
+
+
+def test_get_remaining_time_without_deadline():
+    """Test get_remaining_time returns None when no deadline is set."""
+    assert ContextManager().get_remaining_time() is None
+
+
+def test_set_headers_keeps_deadline():
+    """Test set_headers keeps the deadline of the current context."""
+    cm = ContextManager()
+    cm.set_deadline(123.0)
+
+    cm.set_headers({"key": "value"})
+
+    assert cm.get_current_context().deadline == 123.0
+
+
+def test_priority_defaults_to_interactive():
+    """Test the upstream requests are interactive unless set otherwise."""
+    cm = ContextManager()
+    assert cm.get_priority() == "interactive"
+
+    cm.set_current_context(MCPContext(trace_id="trace"))
+    cm.set_priority("background")
+
+    assert cm.get_priority() == "background"
+    assert cm.get_current_trace_id() == "trace"
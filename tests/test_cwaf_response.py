@@ -0,0 +1,52 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from cwaf_external_mcp.model.cwaf_response import CWAFResponse, Meta
+from cwaf_external_mcp.model.rule_dto import Rule
+
+META = Meta(size=2, page=0, totalElements=2, totalPages=1)
+
+
+def test_to_table_leaves_out_null_columns():
+    response = CWAFResponse(
+        data=[{"id": 1, "name": "a", "cloud": None}, {"id": 2, "name": None}],
+        meta=META,
+        stale=True,
+    )
+    table = response.to_table()
+    assert table.columns == ["id", "name"]
+    assert table.rows == [[1, "a"], [2, None]]
+    assert table.meta == META
+    assert table.stale
+
+
+def test_to_table_names_model_columns_by_alias():
+    rule = Rule(rule_id=1, site_id=2, account_id=3, name="r", action="a", to_url="/new")
+    table = CWAFResponse[Rule](data=[rule], meta=META).to_table()
+    assert table.columns == [
+        "rule_id",
+        "site_id",
+        "account_id",
+        "name",
+        "action",
+        "enabled",
+        "to",
+    ]
+    assert table.rows == [[1, 2, 3, "r", "a", True, "/new"]]
+    assert table.model_dump()["rows"] == table.rows
+
+
+def test_to_table_of_an_empty_page():
+    table = CWAFResponse(data=[], meta=META).to_table()
+    assert (table.columns, table.rows) == ([], [])
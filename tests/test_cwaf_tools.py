@@ -12,9 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
+import time
+
 import pytest
 from unittest import mock
+from prometheus_client import REGISTRY
 
+import cwaf_external_mcp.httpclient.upstream_client as upstream_client
+from cwaf_external_mcp.context.context_manager import context_manager
 import cwaf_external_mcp.mcp_tools.cwaf_tools as cwaf_tools
 
 
@@ -27,12 +34,12 @@ def patch_env(monkeypatch):
 @pytest.mark.asyncio
 async def test_get_rules_api_success(monkeypatch):
     mock_client = mock.AsyncMock()
-    mock_response = mock.Mock()
+    mock_response = mock.Mock(content_length=None, headers={})
     mock_response.status = 200
-    mock_response.json = mock.AsyncMock(
-        return_value={"data": [{}], "meta": {}, "links": {}}
+    mock_response.read = mock.AsyncMock(
+        return_value=json.dumps({"data": [{}], "meta": {}, "links": {}}).encode()
     )
-    monkeypatch.setattr(cwaf_tools, "get_async_client", lambda: mock_client)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: mock_client)
     mock_client.get.return_value = mock_response
     monkeypatch.setattr(cwaf_tools, "get_rules_from_response", lambda r: "rule")
     result = await cwaf_tools.get_rules_api(1)
@@ -51,12 +58,12 @@ async def test_get_rules_api_invalid_args(monkeypatch):
 @pytest.mark.asyncio
 async def test_get_polices_of_account_by_filter_api_success(monkeypatch):
     mock_client = mock.AsyncMock()
-    mock_response = mock.Mock()
+    mock_response = mock.Mock(content_length=None, headers={})
     mock_response.status = 200
-    mock_response.json = mock.AsyncMock(
-        return_value={"data": [{}], "meta": {}, "links": {}}
+    mock_response.read = mock.AsyncMock(
+        return_value=json.dumps({"data": [{}], "meta": {}, "links": {}}).encode()
     )
-    monkeypatch.setattr(cwaf_tools, "get_async_client", lambda: mock_client)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: mock_client)
     mock_client.get.return_value = mock_response
     monkeypatch.setattr(cwaf_tools, "get_policy_from_response", lambda r: "policy")
     result = await cwaf_tools.get_polices_of_account_by_filter_api(1)
@@ -67,12 +74,12 @@ async def test_get_polices_of_account_by_filter_api_success(monkeypatch):
 @pytest.mark.asyncio
 async def test_get_site_domains_api_success(monkeypatch):
     mock_client = mock.AsyncMock()
-    mock_response = mock.Mock()
+    mock_response = mock.Mock(content_length=None, headers={})
     mock_response.status = 200
-    mock_response.json = mock.AsyncMock(
-        return_value={"data": [{}], "meta": {}, "links": {}}
+    mock_response.read = mock.AsyncMock(
+        return_value=json.dumps({"data": [{}], "meta": {}, "links": {}}).encode()
     )
-    monkeypatch.setattr(cwaf_tools, "get_async_client", lambda: mock_client)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: mock_client)
     mock_client.get.return_value = mock_response
     monkeypatch.setattr(cwaf_tools, "get_site_domain_from_response", lambda r: "domain")
     result = await cwaf_tools.get_site_domains_api(1)
@@ -83,12 +90,12 @@ async def test_get_site_domains_api_success(monkeypatch):
 @pytest.mark.asyncio
 async def test_get_account_sites_success(monkeypatch):
     mock_client = mock.AsyncMock()
-    mock_response = mock.Mock()
+    mock_response = mock.Mock(content_length=None, headers={})
     mock_response.status = 200
-    mock_response.json = mock.AsyncMock(
-        return_value={"data": [{}], "meta": {}, "links": {}}
+    mock_response.read = mock.AsyncMock(
+        return_value=json.dumps({"data": [{}], "meta": {}, "links": {}}).encode()
     )
-    monkeypatch.setattr(cwaf_tools, "get_async_client", lambda: mock_client)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: mock_client)
     mock_client.get.return_value = mock_response
     monkeypatch.setattr(cwaf_tools, "get_site_from_response", lambda r: "site")
     result = await cwaf_tools.get_account_sites(1)
@@ -96,13 +103,57 @@ async def test_get_account_sites_success(monkeypatch):
     assert result.data == ["site"]
 
 
+@pytest.mark.asyncio
+async def test_get_account_sites_projects_fields(monkeypatch):
+    mock_client = mock.AsyncMock()
+    mock_response = mock.Mock(content_length=None, headers={})
+    mock_response.status = 200
+    site = {"id": 7, "name": "a.com", "siteStatus": "ok", "creationTime": 0}
+    mock_response.read = mock.AsyncMock(
+        return_value=json.dumps({"data": [site], "meta": {}, "links": {}}).encode()
+    )
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: mock_client)
+    mock_client.get.return_value = mock_response
+    result = await cwaf_tools.get_account_sites(1, fields="id,name")
+    assert result.data == [{"id": 7, "name": "a.com"}]
+
+
+@pytest.mark.asyncio
+async def test_get_account_sites_rejects_unknown_fields():
+    result = await cwaf_tools.get_account_sites(1, fields=["id", "unknown"])
+    assert result.errors[0].code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_site_domains_api_table_format(monkeypatch):
+    async def get_json(url, params, headers, item_mapper=None):
+        domain = {"id": 1, "domain": "a.com", "siteId": 2, "status": "ok"}
+        body = {"data": item_mapper.map_page([domain]), "meta": {}}
+        return upstream_client.UpstreamResponse(200, body, 10)
+
+    monkeypatch.setattr(cwaf_tools, "get_json", get_json)
+    result = await cwaf_tools.get_site_domains_api(
+        1, fields=["id", "name", "aRecords"], response_format="table"
+    )
+    assert result.columns == ["id", "name"]
+    assert result.rows == [[1, "a.com"]]
+
+
+@pytest.mark.asyncio
+async def test_get_site_domains_api_rejects_unknown_format():
+    result = await cwaf_tools.get_site_domains_api(1, response_format="csv")
+    assert result.errors[0].code == 400
+
+
 @pytest.mark.asyncio
 async def test_invoke_request_with_pagination_handling_http_error(monkeypatch):
     mock_client = mock.AsyncMock()
-    mock_response = mock.Mock()
+    mock_response = mock.Mock(content_length=None, headers={})
     mock_response.status = 500
-    mock_response.json = mock.AsyncMock(return_value={"errors": [{"code": 500}]})
-    monkeypatch.setattr(cwaf_tools, "get_async_client", lambda: mock_client)
+    mock_response.read = mock.AsyncMock(
+        return_value=json.dumps({"errors": [{"code": 500}]}).encode()
+    )
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: mock_client)
     mock_client.get.return_value = mock_response
     monkeypatch.setattr(
         cwaf_tools, "get_api_error_from_response", lambda r: mock.Mock(code=r["code"])
@@ -112,3 +163,275 @@ async def test_invoke_request_with_pagination_handling_http_error(monkeypatch):
     )
     assert hasattr(res, "errors")
     assert ok is False
+
+
+def _paged_client(pages, total_pages=None, size=2, failing_page=None, slow_from=None):
+    """Build a mock client serving the given pages keyed by the page param."""
+    requested = []
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        page = int(params.get("page", params.get("page_num", 0)) or 0)
+        requested.append(page)
+        if slow_from is not None and page >= slow_from:
+            await asyncio.sleep(1)
+        response = mock.Mock(content_length=None, headers={})
+        meta = {"page": page, "size": size}
+        if total_pages is not None:
+            meta["totalPages"] = total_pages
+        if page == failing_page:
+            response.status = 500
+            body = {"errors": [{"code": 500}]}
+        else:
+            response.status = 200
+            body = {"data": pages[page], "meta": meta, "links": {}}
+        response.read = mock.AsyncMock(return_value=json.dumps(body).encode())
+        return response
+
+    client = mock.Mock()
+    client.get = get
+    return client, requested
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_all_pages_fetches_and_merges_in_order(monkeypatch):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}]]
+    client, requested = _paged_client(pages, total_pages=3)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"], None, all_pages=True
+    )
+    assert ok is True
+    assert res.data == [1, 2, 3, 4, 5]
+    assert sorted(requested) == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_max_items_limits_pages(monkeypatch):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}]]
+    client, requested = _paged_client(pages, total_pages=3)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"], None, max_items=3
+    )
+    assert ok is True
+    assert res.data == [1, 2, 3]
+    assert sorted(requested) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_all_pages_without_total_pages(monkeypatch):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}], []]
+    client, requested = _paged_client(pages)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {"page_num": 0}, lambda r: r["id"], None, "page_num", all_pages=True
+    )
+    assert ok is True
+    assert res.data == [1, 2, 3, 4, 5]
+    assert requested == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_all_pages_error_on_following_page(monkeypatch):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}]]
+    client, _ = _paged_client(pages, total_pages=3, failing_page=2)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"], None, all_pages=True
+    )
+    assert ok is False
+    assert res.errors[0].code == 500
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_fails_fast_when_circuit_is_open(monkeypatch):
+    async def get_json(url, params, headers, item_mapper=None):
+        raise cwaf_tools.CircuitOpenError("rules")
+
+    monkeypatch.setattr(cwaf_tools, "get_json", get_json)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r, None
+    )
+    assert ok is False
+    assert res.errors[0].status == 503
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_fails_fast_when_bulkhead_is_full(monkeypatch):
+    async def get_json(url, params, headers, item_mapper=None):
+        raise cwaf_tools.BulkheadFullError("policies")
+
+    monkeypatch.setattr(cwaf_tools, "get_json", get_json)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r, None
+    )
+    assert ok is False
+    assert res.errors[0].status == 503
+    assert "bulkhead" in res.errors[0].detail
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_marks_stale_responses(monkeypatch):
+    async def get_json(url, params, headers, item_mapper=None):
+        return upstream_client.UpstreamResponse(
+            status=200,
+            body={"data": [item_mapper({"id": 1})], "meta": {}},
+            stale=True,
+        )
+
+    monkeypatch.setattr(cwaf_tools, "get_json", get_json)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"], None
+    )
+    assert ok is True
+    assert res.stale is True
+    assert res.data == [1]
+
+
+@pytest.fixture
+def deadline():
+    """Give the tool call a 0.2s deadline."""
+    token = context_manager.set_deadline(time.monotonic() + 0.2)
+    yield
+    context_manager.reset_token(token)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("total_pages", [4, None])
+async def test_invoke_request_returns_truncated_pages_on_deadline(
+    monkeypatch, deadline, total_pages
+):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}, {"id": 6}]]
+    client, requested = _paged_client(pages + [[]], total_pages, slow_from=2)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"], None, all_pages=True
+    )
+    assert ok is True
+    assert res.data == [1, 2, 3, 4]
+    assert res.truncated is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("total_pages", [4, None])
+async def test_invoke_request_marks_pages_beyond_max_pages_as_truncated(
+    monkeypatch, total_pages
+):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}, {"id": 6}]]
+    client, requested = _paged_client(pages + [[]], total_pages)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    monkeypatch.setattr(cwaf_tools, "PAGINATION_MAX_PAGES", 2)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"], None, all_pages=True
+    )
+    assert ok is True
+    assert res.data == [1, 2, 3, 4]
+    assert res.truncated is True
+    assert res.meta.page == 1
+    assert sorted(requested) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_max_items_within_max_pages_is_not_truncated(
+    monkeypatch,
+):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}, {"id": 6}]]
+    client, _ = _paged_client(pages, total_pages=3)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    monkeypatch.setattr(cwaf_tools, "PAGINATION_MAX_PAGES", 2)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"], None, max_items=4
+    )
+    assert res.data == [1, 2, 3, 4]
+    assert res.truncated is False
+    assert res.meta.page == 0
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_deadline_on_first_page_returns_504(monkeypatch, deadline):
+    client, _ = _paged_client([[{"id": 1}]], slow_from=0)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    res, ok = await cwaf_tools.invoke_request_with_pagination_handling(
+        "url", {}, lambda r: r["id"]
+    )
+    assert ok is False
+    assert res.errors[0].status == 504
+
+
+def _sample(name, endpoint, status_class, source="upstream"):
+    labels = {"endpoint": endpoint, "status_class": status_class}
+    if not name.startswith("cwaf_upstream_response_items"):
+        labels["source"] = source
+    value = REGISTRY.get_sample_value(name, labels)
+    return value or 0
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_observes_page_histograms(monkeypatch):
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+    client, _ = _paged_client(pages, total_pages=2)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    url = "https://api.imperva.com/site-domain-manager/v3/domains"
+    before = _sample("cwaf_upstream_request_duration_seconds_count", "domains", "2xx")
+    items = _sample("cwaf_upstream_response_items_sum", "domains", "2xx")
+    await cwaf_tools.invoke_request_with_pagination_handling(
+        url, {}, lambda r: r["id"], None, all_pages=True
+    )
+    assert (
+        _sample("cwaf_upstream_request_duration_seconds_count", "domains", "2xx")
+        == before + 2
+    )
+    assert _sample("cwaf_upstream_response_items_sum", "domains", "2xx") == items + 3
+    assert _sample("cwaf_upstream_response_bytes_sum", "domains", "2xx") > 0
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_observes_cache_hits_apart(monkeypatch):
+    async def get_json(url, params, headers, item_mapper=None):
+        return upstream_client.UpstreamResponse(
+            status=200, body={"data": [], "meta": {}}, size=10, source="cache"
+        )
+
+    monkeypatch.setattr(cwaf_tools, "get_json", get_json)
+    url = "https://api.imperva.com/policies/v3/policies"
+    upstream = _sample(
+        "cwaf_upstream_request_duration_seconds_count", "policies", "2xx"
+    )
+    cached = _sample(
+        "cwaf_upstream_request_duration_seconds_count", "policies", "2xx", "cache"
+    )
+    await cwaf_tools.invoke_request_with_pagination_handling(url, {}, lambda r: r)
+    assert (
+        _sample("cwaf_upstream_request_duration_seconds_count", "policies", "2xx")
+        == upstream
+    )
+    assert (
+        _sample(
+            "cwaf_upstream_request_duration_seconds_count", "policies", "2xx", "cache"
+        )
+        == cached + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_invoke_request_observes_failed_pages(monkeypatch):
+    client, _ = _paged_client([[]], failing_page=0)
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    url = "https://my.imperva.com/api/prov/v3/rules"
+    before = _sample("cwaf_upstream_request_duration_seconds_count", "rules", "5xx")
+    await cwaf_tools.invoke_request_with_pagination_handling(url, {}, lambda r: r)
+    assert (
+        _sample("cwaf_upstream_request_duration_seconds_count", "rules", "5xx")
+        == before + 1
+    )
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        raise ValueError("boom")
+
+    client.get = get
+    before = _sample("cwaf_upstream_request_duration_seconds_count", "rules", "error")
+    await cwaf_tools.invoke_request_with_pagination_handling(url, {}, lambda r: r)
+    assert (
+        _sample("cwaf_upstream_request_duration_seconds_count", "rules", "error")
+        == before + 1
+    )
@@ -0,0 +1,92 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from unittest import mock
+
+import cwaf_external_mcp.context.deadline_middleware as deadline_middleware
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.context.deadline_middleware import (
+    DeadlineMiddleware,
+    get_time_budget,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_http_headers(monkeypatch):
+    """Run without an HTTP request unless a test sets headers."""
+    headers = {}
+    monkeypatch.setattr(deadline_middleware, "get_http_headers", lambda: headers)
+    monkeypatch.delenv("TOOL_CALL_TIMEOUT", raising=False)
+    return headers
+
+
+def test_time_budget_from_argument(no_http_headers, monkeypatch):
+    no_http_headers["x-request-timeout"] = "20"
+    monkeypatch.setenv("TOOL_CALL_TIMEOUT", "30")
+    assert get_time_budget({"timeout_seconds": "10"}) == 10
+
+
+def test_time_budget_from_header(no_http_headers, monkeypatch):
+    no_http_headers["x-request-timeout"] = "20"
+    monkeypatch.setenv("TOOL_CALL_TIMEOUT", "30")
+    assert get_time_budget({}) == 20
+
+
+def test_time_budget_from_custom_header(no_http_headers, monkeypatch):
+    monkeypatch.setenv("MCP_TIMEOUT_HEADER_NAME", "X-Deadline")
+    no_http_headers["x-deadline"] = "5"
+    assert get_time_budget({}) == 5
+
+
+def test_time_budget_from_config(monkeypatch):
+    monkeypatch.setenv("TOOL_CALL_TIMEOUT", "30")
+    assert get_time_budget({"timeout_seconds": None}) == 30
+
+
+def test_time_budget_ignores_invalid_values(monkeypatch):
+    monkeypatch.setenv("TOOL_CALL_TIMEOUT", "30")
+    assert get_time_budget({"timeout_seconds": "soon"}) == 30
+    assert get_time_budget({"timeout_seconds": 0}) == 30
+
+
+def test_no_time_budget():
+    assert get_time_budget({}) is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_sets_deadline_during_the_call():
+    context = mock.Mock()
+    context.message.arguments = {"timeout_seconds": 10}
+    remaining = []
+
+    async def call_next(ctx):
+        remaining.append(context_manager.get_remaining_time())
+        return "result"
+
+    result = await DeadlineMiddleware().on_call_tool(context, call_next)
+
+    assert result == "result"
+    assert 9 < remaining[0] <= 10
+    assert context_manager.get_remaining_time() is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_without_budget_leaves_no_deadline():
+    context = mock.Mock()
+    context.message.arguments = None
+    call_next = mock.AsyncMock(return_value="result")
+
+    assert await DeadlineMiddleware().on_call_tool(context, call_next) == "result"
+    assert context_manager.get_current_context().deadline is None
@@ -0,0 +1,143 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+import cwaf_external_mcp.httpclient.hedging as hedging
+from cwaf_external_mcp.httpclient.hedging import HedgingPolicy, get_hedging_policy
+from cwaf_external_mcp.httpclient.retry import RetryBudget
+
+
+def _policy(tokens=10, latencies=(0.01,) * 20, **kwargs):
+    policy = HedgingPolicy(
+        "sites",
+        RetryBudget(ratio=0, min_tokens=tokens, max_tokens=10),
+        min_delay=0.01,
+        **kwargs,
+    )
+    policy.latencies.extend(latencies)
+    return policy
+
+
+def _calls(*delays, error=None):
+    """Build a function whose n-th call sleeps delays[n] then returns n."""
+    started = []
+
+    async def func():
+        call = len(started)
+        started.append(call)
+        await asyncio.sleep(delays[call])
+        if error is not None and call == 0:
+            raise error
+        return call
+
+    func.started = started
+    return func
+
+
+def test_threshold_needs_min_samples():
+    assert _policy(latencies=[0.5] * 5, min_samples=10).get_threshold() is None
+
+
+def test_threshold_is_the_latency_percentile():
+    latencies = [i / 100 for i in range(1, 101)]
+    assert _policy(latencies=latencies, percentile=95).get_threshold() == 0.95
+    assert _policy(latencies=latencies, percentile=50).get_threshold() == 0.5
+
+
+def test_threshold_is_floored_at_min_delay():
+    policy = _policy(latencies=[0.001] * 20)
+    assert policy.get_threshold() == 0.01
+
+
+async def test_fast_request_is_not_hedged():
+    func = _calls(0)
+    assert await _policy().call(func) == 0
+    assert func.started == [0]
+
+
+async def test_slow_request_is_hedged_and_first_response_wins():
+    func = _calls(1, 0)
+    wins = hedging.HEDGE_WINS.labels(upstream="sites")._value.get()
+    assert await _policy().call(func) == 1
+    assert func.started == [0, 1]
+    assert hedging.HEDGE_WINS.labels(upstream="sites")._value.get() == wins + 1
+
+
+async def test_slow_request_wins_when_faster_than_hedge():
+    func = _calls(0.05, 1)
+    assert await _policy().call(func) == 0
+    assert func.started == [0, 1]
+
+
+async def test_hedging_is_capped_by_budget():
+    func = _calls(0.05, 0)
+    assert await _policy(tokens=0).call(func) == 0
+    assert func.started == [0]
+
+
+async def test_failed_request_falls_back_to_hedge():
+    func = _calls(0.05, 0.1, error=ValueError("boom"))
+    assert await _policy().call(func) == 1
+
+
+async def test_failed_response_waits_for_the_other_request():
+    func = _calls(0.05, 0)
+    assert await _policy().call(func, lambda result: result == 1) == 0
+    assert func.started == [0, 1]
+
+
+async def test_failed_response_is_returned_when_all_requests_fail():
+    func = _calls(0.05, 0, error=ValueError("boom"))
+    assert await _policy().call(func, lambda result: result == 1) == 1
+
+
+async def test_raises_when_all_requests_fail():
+    async def func():
+        await asyncio.sleep(0.02)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await _policy().call(func)
+
+
+async def test_loser_is_cancelled():
+    calls = []
+    cancelled = []
+
+    async def func():
+        calls.append(len(calls))
+        try:
+            await asyncio.sleep(1 if len(calls) == 1 else 0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "hedge"
+
+    assert await _policy().call(func) == "hedge"
+    await asyncio.sleep(0)
+    assert cancelled == [True]
+
+
+def test_get_hedging_policy_is_configured_per_endpoint(monkeypatch):
+    monkeypatch.setattr(hedging, "HEDGING_POLICIES", {})
+    monkeypatch.setenv("HEDGING_ENABLED", "true")
+    monkeypatch.setenv("HEDGING_ENDPOINTS", "sites, rules")
+    assert get_hedging_policy("sites") is get_hedging_policy("sites")
+    assert get_hedging_policy("rules") is not None
+    assert get_hedging_policy("policies") is None
+    monkeypatch.setenv("HEDGING_ENABLED", "false")
+    assert get_hedging_policy("sites") is None
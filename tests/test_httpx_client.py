@@ -0,0 +1,156 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import ssl
+
+import aiohttp
+import httpx
+import pytest
+from aiohttp import web
+
+import cwaf_external_mcp.httpclient.aiohttp_client as aiohttp_client
+import cwaf_external_mcp.httpclient.upstream_client as upstream_client
+from cwaf_external_mcp.httpclient.httpx_client import (
+    CLOSING_RESPONSES,
+    HttpxSession,
+    _translate_errors,
+    build_httpx_session,
+)
+
+
+@pytest.fixture
+async def server(aiohttp_server):
+    """Local upstream API serving JSON bodies."""
+
+    async def sites(request):
+        return web.json_response({"data": [{"id": 1}], "meta": dict(request.query)})
+
+    async def large(request):
+        return web.Response(body=b"x" * 1024, content_type="application/json")
+
+    async def slow(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for _ in range(20):
+            await response.write(b"x" * 10)
+            await asyncio.sleep(0.02)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/sites", sites)
+    app.router.add_get("/large", large)
+    app.router.add_get("/slow", slow)
+    return await aiohttp_server(app)
+
+
+@pytest.fixture
+async def session(monkeypatch):
+    """httpx backend selected as the shared client."""
+    monkeypatch.setenv("HTTP_CLIENT_BACKEND", "httpx")
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setattr(aiohttp_client, "SESSION", None)
+    client = aiohttp_client.get_async_client()
+    yield client
+    await client.close()
+    aiohttp_client.SESSION = None
+
+
+async def test_get_async_client_selects_httpx_backend(session):
+    assert isinstance(session, HttpxSession)
+    assert aiohttp_client.get_async_client() is session
+
+
+def test_build_client_unknown_backend(monkeypatch):
+    monkeypatch.setenv("HTTP_CLIENT_BACKEND", "requests")
+    with pytest.raises(ValueError):
+        aiohttp_client._build_client()
+
+
+async def test_get_json_over_httpx(server, session):
+    response = await upstream_client.get_json(
+        str(server.make_url("/sites")), {"caid": 1}, {"x-api-id": "1"}
+    )
+    assert response.status == 200
+    assert response.body == {"data": [{"id": 1}], "meta": {"caid": "1"}}
+    assert response.headers["content-type"] == "application/json; charset=utf-8"
+
+
+async def test_streaming_decode_over_httpx(server, session, monkeypatch):
+    monkeypatch.setenv("STREAMING_DECODE_ENABLED", "true")
+    response = await upstream_client.get_json(
+        str(server.make_url("/sites")), {}, {}, lambda item: item["id"]
+    )
+    assert response.body["data"] == [1]
+
+
+async def test_response_size_limit_over_httpx(server, session, monkeypatch):
+    monkeypatch.setenv("MAX_RESPONSE_BYTES", "100")
+    with pytest.raises(upstream_client.ResponseTooLargeError):
+        await upstream_client.get_json(str(server.make_url("/large")), {}, {})
+
+
+async def test_pool_metrics_over_httpx(server, session):
+    await (await session.get(str(server.make_url("/sites")))).read()
+    stats = session.pool_stats()
+    assert stats == {f"{server.host}:{server.port}": (0, 1)}
+    aiohttp_client.collect_pool_metrics()
+    assert aiohttp_client.IDLE.labels(host="*")._value.get() == 1
+
+
+async def test_total_timeout_bounds_the_body_read(server, session):
+    session.total_timeout = 0.1
+    response = await session.get(str(server.make_url("/slow")))
+    chunks = []
+    with pytest.raises(aiohttp.ServerTimeoutError):
+        async for chunk in response.content.iter_chunked(10):
+            chunks.append(chunk)
+    assert 0 < len(chunks) < 20
+    response.close()
+
+
+async def test_close_keeps_a_reference_until_closed(server, session):
+    response = await session.get(str(server.make_url("/slow")))
+    response.close()
+    assert len(CLOSING_RESPONSES) == 1
+    await asyncio.gather(*CLOSING_RESPONSES)
+    await asyncio.sleep(0)
+    assert not CLOSING_RESPONSES
+
+
+async def test_connection_errors_are_raised_as_aiohttp_errors(session):
+    with pytest.raises(aiohttp.ClientError):
+        await session.get("http://127.0.0.1:1/sites")
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (httpx.ReadTimeout("t"), aiohttp.ServerTimeoutError),
+        (httpx.RemoteProtocolError("r"), aiohttp.ServerDisconnectedError),
+        (httpx.ReadError("r"), aiohttp.ClientOSError),
+        (httpx.ConnectError("c"), aiohttp.ClientConnectionError),
+    ],
+)
+def test_translate_errors(error, expected):
+    with pytest.raises(expected):
+        with _translate_errors():
+            raise error
+
+
+async def test_http2_follows_config_and_availability(monkeypatch):
+    monkeypatch.setenv("HTTP2_ENABLED", "false")
+    session = build_httpx_session(ssl.create_default_context())
+    assert not session.http2
+    await session.close()
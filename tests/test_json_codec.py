@@ -0,0 +1,93 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+import cwaf_external_mcp.utilities.json_codec as json_codec
+from cwaf_external_mcp.utilities.json_codec import (
+    JsonCodec,
+    OrjsonCodec,
+    create_codec_from_config,
+    get_json_codec,
+)
+
+PAYLOAD = {"data": [{"id": 1, "name": "été", "ips": ["1.2.3.4"]}], "meta": None}
+
+
+@pytest.fixture(autouse=True)
+def reset_codec(monkeypatch):
+    """Reset the global codec between tests."""
+    monkeypatch.setattr(json_codec, "JSON_CODEC", None)
+
+
+def test_stdlib_codec_round_trip():
+    codec = JsonCodec()
+    assert codec.loads(codec.dumps(PAYLOAD)) == PAYLOAD
+    assert codec.loads(codec.dumps(PAYLOAD).encode()) == PAYLOAD
+
+
+def test_stdlib_codec_dumps_compact_unicode():
+    assert JsonCodec().dumps({"a": [1, "é"]}) == '{"a":[1,"é"]}'
+
+
+def test_stdlib_codec_invalid_json_raises_value_error():
+    with pytest.raises(ValueError):
+        JsonCodec().loads(b"<html>")
+
+
+def test_orjson_codec_matches_stdlib():
+    pytest.importorskip("orjson")
+    codec = OrjsonCodec()
+    assert codec.dumps(PAYLOAD) == JsonCodec().dumps(PAYLOAD)
+    assert codec.loads(codec.dumps(PAYLOAD).encode()) == PAYLOAD
+    with pytest.raises(ValueError):
+        codec.loads(b"<html>")
+
+
+def test_create_codec_stdlib(monkeypatch):
+    monkeypatch.setenv("JSON_CODEC", "stdlib")
+    assert create_codec_from_config().name == "stdlib"
+
+
+def test_create_codec_auto_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setenv("JSON_CODEC", "auto")
+
+    def missing(name):
+        raise ImportError(name)
+
+    monkeypatch.setattr(json_codec.importlib, "import_module", missing)
+    assert create_codec_from_config().name == "stdlib"
+
+
+def test_create_codec_orjson_requires_orjson(monkeypatch):
+    monkeypatch.setenv("JSON_CODEC", "orjson")
+
+    def missing(name):
+        raise ImportError(name)
+
+    monkeypatch.setattr(json_codec.importlib, "import_module", missing)
+    with pytest.raises(ImportError):
+        create_codec_from_config()
+
+
+def test_create_codec_unknown(monkeypatch):
+    monkeypatch.setenv("JSON_CODEC", "simdjson")
+    with pytest.raises(ValueError):
+        create_codec_from_config()
+
+
+def test_get_json_codec_is_built_once(monkeypatch):
+    monkeypatch.setenv("JSON_CODEC", "stdlib")
+    codec = get_json_codec()
+    assert get_json_codec() is codec
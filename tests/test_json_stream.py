@@ -0,0 +1,112 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from cwaf_external_mcp.httpclient.json_stream import StreamingJsonDecoder
+
+BODY = {
+    "data": [
+        {"id": 1, "name": "é", "ips": ["1.1.1.1", "2.2.2.2"]},
+        {"id": 22, "nested": [1, 2.5, {"a": None}], "enabled": True},
+        -1.25e-7,
+        "s",
+        {"text": 'a "quoted" \\ {[value]}', "empty": "", "t": True, "n": None},
+        ["}", "]", '\\"', 10],
+    ],
+    "meta": {"page": 0, "size": 10, "totalPages": 1},
+    "links": {},
+}
+
+
+def _decode(raw: bytes, chunk_size: int, item_mapper=None):
+    decoder = StreamingJsonDecoder(item_mapper)
+    for i in range(0, len(raw), chunk_size):
+        decoder.feed(raw[i : i + chunk_size])
+    return decoder.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100000])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_decode_any_chunking(chunk_size, indent):
+    raw = json.dumps(BODY, ensure_ascii=False, indent=indent).encode()
+    assert _decode(raw, chunk_size) == BODY
+
+
+@pytest.mark.parametrize(
+    "body", [{}, {"data": []}, {"data": None}, {"meta": {}, "data": [1]}]
+)
+def test_decode_edge_cases(body):
+    assert _decode(json.dumps(body).encode(), 1) == body
+
+
+def test_decode_non_object_body():
+    assert _decode(b"[1, 2, 3]", 2) == [1, 2, 3]
+
+
+def test_items_are_mapped_as_they_arrive():
+    decoder = StreamingJsonDecoder(lambda item: item["id"])
+    decoder.feed(b'{"data": [{"id": 1}, {"id": 2}, {"id"')
+    assert decoder.result["data"] == [1, 2]
+    decoder.feed(b': 3}], "meta": {}}')
+    assert decoder.close() == {"data": [1, 2, 3], "meta": {}}
+
+
+def test_only_data_items_are_mapped():
+    body = {"meta": {"size": 1}, "data": [1, 2]}
+    assert _decode(json.dumps(body).encode(), 3, lambda item: item * 10) == {
+        "meta": {"size": 1},
+        "data": [10, 20],
+    }
+
+
+def test_unfinished_item_is_decoded_once(monkeypatch):
+    item = {
+        "id": 1,
+        "rules": [{"name": f"rule {i}", "ips": ["1.1.1.1"]} for i in range(2000)],
+    }
+    raw = json.dumps({"data": [item]}).encode()
+    decoder = StreamingJsonDecoder()
+    calls = []
+    raw_decode = decoder._json_decoder.raw_decode
+    monkeypatch.setattr(
+        decoder._json_decoder,
+        "raw_decode",
+        lambda text, pos: calls.append(pos) or raw_decode(text, pos),
+    )
+    for i in range(0, len(raw), 100):
+        decoder.feed(raw[i : i + 100])
+    assert decoder.close() == {"data": [item]}
+    assert len(calls) == 2  # the "data" key and the item
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b'{"data": [1, 2}',
+        b'{"a" 1}',
+        b'{"a": 1',
+        b'{"a": 1}x',
+        b'{"data": [1,',
+        b'{"data": ["a',
+        b'{"data": [{"a": [1]',
+        b'{"a": tru}',
+        b"",
+    ],
+)
+def test_decode_malformed_body(raw):
+    with pytest.raises(json.JSONDecodeError):
+        _decode(raw, 1)
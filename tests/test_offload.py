@@ -0,0 +1,91 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from prometheus_client import REGISTRY
+
+import cwaf_external_mcp.httpclient.offload as offload
+from cwaf_external_mcp.httpclient.offload import (
+    Offloader,
+    get_offloader,
+    shutdown_offloader,
+)
+
+
+def _sample(name: str, endpoint: str) -> float:
+    return REGISTRY.get_sample_value(name, {"endpoint": endpoint}) or 0
+
+
+async def test_run_in_thread_pool():
+    offloader = Offloader(ThreadPoolExecutor(1), threshold=0)
+    try:
+        assert await offloader.run("off_thread", sum, [1, 2, 3]) == 6
+    finally:
+        offloader.shutdown()
+    assert _sample("cwaf_offloaded_tasks_total", "off_thread") == 1
+    assert _sample("cwaf_offload_queue_seconds_count", "off_thread") == 1
+    assert _sample("cwaf_offload_run_seconds_count", "off_thread") == 1
+    assert REGISTRY.get_sample_value("cwaf_offload_pending_tasks") == 0
+
+
+async def test_run_in_process_pool():
+    offloader = Offloader(ProcessPoolExecutor(1), threshold=0)
+    try:
+        assert await offloader.run("off_process", sorted, [3, 1, 2]) == [1, 2, 3]
+    finally:
+        offloader.shutdown()
+
+
+async def test_run_raises_the_errors_of_the_task():
+    offloader = Offloader(ThreadPoolExecutor(1), threshold=0)
+    try:
+        with pytest.raises(ValueError):
+            await offloader.run("off_error", int, "not a number")
+    finally:
+        offloader.shutdown()
+    assert REGISTRY.get_sample_value("cwaf_offload_pending_tasks") == 0
+
+
+def test_get_offloader(monkeypatch):
+    monkeypatch.setattr(offload, "OFFLOADER", None)
+    monkeypatch.delenv("OFFLOAD_ENABLED", raising=False)
+    assert get_offloader() is None
+    monkeypatch.setenv("OFFLOAD_ENABLED", "true")
+    monkeypatch.setenv("OFFLOAD_MAX_WORKERS", "2")
+    monkeypatch.setenv("OFFLOAD_THRESHOLD_BYTES", "1024")
+    offloader = get_offloader()
+    assert isinstance(offloader.executor, ThreadPoolExecutor)
+    assert offloader.executor._max_workers == 2
+    assert offloader.threshold == 1024
+    assert get_offloader() is offloader
+    shutdown_offloader()
+    assert offload.OFFLOADER is None
+
+
+def test_process_executor_from_config(monkeypatch):
+    monkeypatch.setattr(offload, "OFFLOADER", None)
+    monkeypatch.setenv("OFFLOAD_ENABLED", "true")
+    monkeypatch.setenv("OFFLOAD_EXECUTOR", "process")
+    assert isinstance(get_offloader().executor, ProcessPoolExecutor)
+    shutdown_offloader()
+
+
+def test_unknown_executor(monkeypatch):
+    monkeypatch.setattr(offload, "OFFLOADER", None)
+    monkeypatch.setenv("OFFLOAD_ENABLED", "true")
+    monkeypatch.setenv("OFFLOAD_EXECUTOR", "gpu")
+    with pytest.raises(ValueError):
+        get_offloader()
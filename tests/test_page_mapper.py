@@ -0,0 +1,192 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import pickle
+
+import pytest
+
+from cwaf_external_mcp.httpclient.upstream_client import _decode_and_map
+from cwaf_external_mcp.mcp_tools.cwaf_tools import (
+    get_policy_from_response,
+    get_rules_from_response,
+    get_site_domain_from_response,
+    get_site_from_response,
+)
+from cwaf_external_mcp.mcp_tools.page_mapper import projected_mapper
+from cwaf_external_mcp.model.policy_dto import Policy
+from cwaf_external_mcp.model.rule_dto import Rule
+from cwaf_external_mcp.model.site import Site
+from cwaf_external_mcp.model.timestamps import format_epoch_millis
+
+SITE = {
+    "id": 1,
+    "name": "www.example.com",
+    "accountId": 10,
+    "type": "CLOUD_WAF",
+    "active": True,
+    "cname": "abc.impervadns.net",
+    "creationTime": 1700000000000,
+    "unknownField": "ignored",
+}
+
+DOMAIN = {
+    "id": 2,
+    "domain": "api.example.com",
+    "siteId": 1,
+    "status": "VERIFIED",
+    "creationDate": 1700000000000,
+    "arecords": ["1.2.3.4"],
+    "cname": "abc.impervadns.net",
+}
+
+RULE = {
+    "site_id": 1,
+    "account_id": 10,
+    "rule": {
+        "rule_id": 3,
+        "name": "redirect",
+        "action": "RULE_ACTION_REDIRECT",
+        "enabled": False,
+        "from": "/old",
+        "to": "/new",
+        "responseCode": 302,
+        "rateInterval": 60,
+    },
+}
+
+POLICY = {
+    "id": 4,
+    "policyType": "ACL",
+    "name": "block",
+    "accountId": 10,
+    "enabled": True,
+    "description": "",
+    "lastModified": "2024-01-01",
+    "lastModifiedBy": 10,
+    "policySettings": [
+        {
+            "id": 5,
+            "policyId": 4,
+            "settingsAction": "BLOCK",
+            "policySettingType": "IP",
+            "data": {"ips": ["1.2.3.4"]},
+        }
+    ],
+    "assetsIds": [1],
+    "subaccountIds": None,
+}
+
+
+def test_site_is_validated_from_upstream_keys():
+    site = get_site_from_response(SITE)
+    assert site.cnames == "abc.impervadns.net"
+    assert site.creationTime == "2023-11-14 22:13:20"
+    assert site.cloud is None
+
+
+def test_site_domain_is_validated_from_upstream_keys():
+    domain = get_site_domain_from_response(DOMAIN)
+    assert domain.name == "api.example.com"
+    assert domain.site_id == 1
+    assert domain.creation_date == "2023-11-14 22:13:20"
+    assert domain.aRecords == ["1.2.3.4"]
+
+
+def test_rule_is_validated_from_nested_rule():
+    rule = get_rules_from_response(RULE)
+    assert (rule.rule_id, rule.site_id, rule.account_id) == (3, 1, 10)
+    assert rule.enabled is False
+    assert (rule.from_url, rule.to_url) == ("/old", "/new")
+    assert (rule.response_code, rule.rate_interval) == (302, 60)
+    assert rule.dc_id is None
+
+
+def test_rule_can_still_be_built_by_field_name():
+    rule = Rule(
+        rule_id=3, site_id=1, account_id=10, name="r", action="a", to_url="/new"
+    )
+    assert rule.to_url == "/new"
+    assert rule.model_dump(by_alias=True)["to"] == "/new"
+
+
+def test_policy_settings_are_validated():
+    policy = get_policy_from_response(POLICY)
+    assert policy.policySettings[0].data.ips == ["1.2.3.4"]
+    assert policy.defaultPolicyConfig is None
+
+
+def test_map_page_matches_per_item_mapping():
+    for mapper, item in (
+        (get_site_from_response, SITE),
+        (get_site_domain_from_response, DOMAIN),
+        (get_rules_from_response, RULE),
+        (get_policy_from_response, POLICY),
+    ):
+        assert mapper.map_page([item, item]) == [mapper(item), mapper(item)]
+
+
+def test_decode_and_map_validates_the_page_in_bulk():
+    body = _decode_and_map(
+        200, json.dumps({"data": [SITE], "meta": {}}).encode(), get_site_from_response
+    )
+    assert body["data"] == [get_site_from_response(SITE)]
+
+
+def test_mappers_pickle_by_reference():
+    assert pickle.loads(pickle.dumps(get_site_from_response)) is get_site_from_response
+
+
+def test_format_epoch_millis_leaves_strings_unchanged():
+    assert format_epoch_millis(0) == "1970-01-01 00:00:00"
+    assert format_epoch_millis("2024-01-01 00:00:00") == "2024-01-01 00:00:00"
+
+
+def test_projected_mapper_validates_only_the_requested_fields():
+    mapper = projected_mapper(Policy, ("id", "name"))
+    policy = {**POLICY, "policySettings": [{"invalid": True}]}
+    assert mapper.map_page([policy]) == [{"id": 4, "name": "block"}]
+    assert mapper(policy) == {"id": 4, "name": "block"}
+
+
+def test_projected_mapper_keeps_aliases_validators_and_defaults():
+    sites = projected_mapper(Site, ("id", "creationTime", "cnames", "cloud"))
+    assert sites(SITE) == {
+        "id": 1,
+        "creationTime": "2023-11-14 22:13:20",
+        "cnames": "abc.impervadns.net",
+        "cloud": None,
+    }
+    rules = projected_mapper(Rule, ("rule_id", "to", "from", "dc_id"))
+    assert rules(RULE) == {"rule_id": 3, "to": "/new", "from": "/old", "dc_id": None}
+
+
+def test_projected_mapper_names_fields_like_the_full_output():
+    rule = get_rules_from_response(RULE).model_dump(by_alias=True)
+    projected = projected_mapper(Rule, tuple(rule))(RULE)
+    assert projected == rule
+
+
+def test_projected_mapper_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="Unknown Site fields: siteId"):
+        projected_mapper(Site, ("id", "siteId"))
+    with pytest.raises(ValueError, match="Unknown Rule fields: to_url"):
+        projected_mapper(Rule, ("to_url",))
+
+
+def test_projected_mappers_are_shared_and_pickle():
+    mapper = projected_mapper(Site, ("id", "name"))
+    assert projected_mapper(Site, ("id", "name")) is mapper
+    assert pickle.loads(pickle.dumps(mapper)) is mapper
+    assert mapper.__qualname__ == "Site[id,name]"
@@ -0,0 +1,209 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import inspect
+
+import aiohttp
+import pytest
+from aiohttp import web
+from prometheus_client import REGISTRY
+
+import cwaf_external_mcp.httpclient.aiohttp_client as aiohttp_client
+import cwaf_external_mcp.httpclient.pool_tuner as pool_tuner
+from cwaf_external_mcp.httpclient.pool_tuner import (
+    HostPoolStats,
+    PoolTuner,
+    TunedTCPConnector,
+    get_pool_tuner,
+    host_label,
+)
+
+
+@pytest.fixture
+async def server(aiohttp_server):
+    """Local upstream API answering after a short delay."""
+
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return web.json_response({"data": []})
+
+    app = web.Application()
+    app.router.add_get("/slow", slow)
+    return await aiohttp_server(app)
+
+
+@pytest.fixture
+async def session():
+    """Session with a single connection per host."""
+    async with aiohttp.ClientSession(
+        connector=TunedTCPConnector(host_limit=1, limit=10)
+    ) as session:
+        yield session
+
+
+async def _get(session, url):
+    async with session.get(url) as response:
+        await response.read()
+
+
+def _tuner():
+    return PoolTuner(floor=1, ceiling=3, wait_threshold=0.01)
+
+
+@pytest.mark.parametrize(
+    "name, parameters",
+    [
+        ("_available_connections", ["self", "key"]),
+        ("_wait_for_available_connection", ["self", "key", "traces"]),
+        ("_release_waiter", ["self"]),
+    ],
+)
+def test_overridden_connector_members_exist(name, parameters):
+    # the tuned connector relies on private aiohttp members, an aiohttp upgrade
+    # that renames them must fail here rather than silently skip the limits
+    method = getattr(aiohttp.TCPConnector, name)
+    assert list(inspect.signature(method).parameters) == parameters
+
+
+async def test_connector_state_members_exist():
+    connector = TunedTCPConnector(host_limit=2, limit=10)
+    try:
+        assert isinstance(connector._acquired, set)
+        assert isinstance(connector._acquired_per_host, dict)
+        assert isinstance(connector._conns, dict)
+        assert connector._limit == 10
+    finally:
+        await connector.close()
+
+
+async def test_waiting_host_grows_up_to_ceiling(server, session):
+    url = server.make_url("/slow")
+    await asyncio.gather(*(_get(session, url) for _ in range(3)))
+    connector = session.connector
+    [key] = connector.host_stats
+    assert connector.host_stats[key].waits == 2
+    assert connector.host_stats[key].peak_busy == 1
+
+    _tuner().tune(connector)
+    assert connector.get_host_limit(key) == 2
+    assert connector.host_stats == {}
+    host = host_label(key)
+    assert (
+        REGISTRY.get_sample_value("cwaf_connection_pool_host_limit", {"host": host})
+        == 2
+    )
+
+    await asyncio.gather(*(_get(session, url) for _ in range(4)))
+    assert connector.host_stats[key].peak_busy == 2
+    _tuner().tune(connector)
+    assert connector.get_host_limit(key) == 3
+    assert (
+        REGISTRY.get_sample_value(
+            "cwaf_connection_pool_resizes_total", {"host": host, "direction": "up"}
+        )
+        == 2
+    )
+
+
+async def test_resized_host_resizes_its_priority_gate(server, session, monkeypatch):
+    import cwaf_external_mcp.httpclient.priority_lanes as priority_lanes
+
+    monkeypatch.setenv("PRIORITY_LANES_ENABLED", "true")
+    monkeypatch.setenv("CONNECTION_POOL_MAX_KEEP_ALIVE", "1")
+    monkeypatch.setattr(priority_lanes, "PRIORITY_GATES", {})
+    url = server.make_url("/slow")
+    gate = priority_lanes.get_priority_gate(priority_lanes.url_host(str(url)))
+    await asyncio.gather(*(_get(session, url) for _ in range(3)))
+    _tuner().tune(session.connector)
+    assert (gate.capacity, gate.background_limit) == (2, 1)
+
+
+async def test_raised_limit_releases_waiting_requests(server, session):
+    url = server.make_url("/slow")
+    await _get(session, url)
+    [key] = session.connector._conns
+    session.connector.set_host_limit(key, 0)
+    pending = asyncio.ensure_future(_get(session, url))
+    await asyncio.sleep(0.02)
+    assert not pending.done()
+    session.connector.set_host_limit(key, 1)
+    await asyncio.wait_for(pending, 1)
+
+
+async def test_underused_host_shrinks_to_floor(server):
+    async with aiohttp.ClientSession(
+        connector=TunedTCPConnector(host_limit=4)
+    ) as session:
+        await _get(session, server.make_url("/slow"))
+        connector = session.connector
+        [key] = connector._conns
+        _tuner().tune(connector)
+        assert connector.get_host_limit(key) == 3
+        _tuner().tune(connector)
+        _tuner().tune(connector)
+        assert connector.get_host_limit(key) == 1
+
+
+@pytest.mark.parametrize(
+    "stats, idle, expected",
+    [
+        (HostPoolStats(peak_busy=4, waits=2, wait_seconds=0.1), 0, 6),
+        (HostPoolStats(peak_busy=4, waits=2, wait_seconds=0.001), 0, 4),
+        (HostPoolStats(peak_busy=1), 3, 3),
+        (HostPoolStats(peak_busy=1), 0, 4),
+        (HostPoolStats(peak_busy=3), 1, 4),
+    ],
+)
+def test_get_limit(stats, idle, expected):
+    tuner = PoolTuner(floor=1, ceiling=10, wait_threshold=0.01)
+    assert tuner.get_limit(4, stats, idle) == expected
+
+
+def test_get_pool_tuner(monkeypatch):
+    monkeypatch.setattr(pool_tuner, "POOL_TUNER", None)
+    monkeypatch.delenv("POOL_TUNING_ENABLED", raising=False)
+    assert get_pool_tuner() is None
+    monkeypatch.setenv("POOL_TUNING_ENABLED", "true")
+    monkeypatch.setenv("CONNECTION_POOL_SIZE", "30")
+    tuner = get_pool_tuner()
+    assert (tuner.floor, tuner.ceiling) == (2, 30)
+    assert get_pool_tuner() is tuner
+
+
+async def test_session_uses_tuned_connector(monkeypatch):
+    monkeypatch.setattr(pool_tuner, "POOL_TUNER", None)
+    monkeypatch.setenv("POOL_TUNING_ENABLED", "true")
+    monkeypatch.setenv("CONNECTION_POOL_MAX_KEEP_ALIVE", "7")
+    session = aiohttp_client._build_session()
+    try:
+        assert isinstance(session.connector, TunedTCPConnector)
+        assert session.connector.default_host_limit == 7
+    finally:
+        await session.close()
+
+
+async def test_tune_connection_pools_runs_periodically(monkeypatch):
+    monkeypatch.setattr(pool_tuner, "POOL_TUNER", None)
+    monkeypatch.setenv("POOL_TUNING_ENABLED", "true")
+    connector = TunedTCPConnector(host_limit=1)
+    session = aiohttp.ClientSession(connector=connector)
+    monkeypatch.setattr(aiohttp_client, "SESSION", session)
+    tuned = []
+    monkeypatch.setattr(PoolTuner, "tune", lambda self, c: tuned.append(c))
+    task = asyncio.ensure_future(aiohttp_client.tune_connection_pools(0.01))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await session.close()
+    assert tuned and tuned[0] is connector
@@ -0,0 +1,137 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+import cwaf_external_mcp.httpclient.priority_lanes as priority_lanes
+from cwaf_external_mcp.httpclient.priority_lanes import (
+    BACKGROUND,
+    INTERACTIVE,
+    PriorityGate,
+    get_priority_gate,
+    resize_priority_gate,
+    url_host,
+)
+
+HOST = "api.imperva.com:443"
+
+
+async def test_background_lane_keeps_reserved_slots():
+    gate = PriorityGate(HOST, capacity=3, reserved=1)
+    await gate.acquire(BACKGROUND)
+    await gate.acquire(BACKGROUND)
+    waiter = asyncio.ensure_future(gate.acquire(BACKGROUND))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    await gate.acquire(INTERACTIVE)
+    assert gate.in_flight == {INTERACTIVE: 1, BACKGROUND: 2}
+    gate.release(BACKGROUND)
+    await waiter
+    assert gate.in_flight == {INTERACTIVE: 1, BACKGROUND: 2}
+
+
+async def test_interactive_waiters_are_served_first():
+    gate = PriorityGate(HOST, capacity=1, reserved=0)
+    await gate.acquire(BACKGROUND)
+    order = []
+
+    async def acquire(lane):
+        await gate.acquire(lane)
+        order.append(lane)
+
+    background = asyncio.ensure_future(acquire(BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+    gate.release(BACKGROUND)
+    await interactive
+    assert order == [INTERACTIVE]
+    gate.release(INTERACTIVE)
+    await background
+    assert order == [INTERACTIVE, BACKGROUND]
+
+
+async def test_background_does_not_overtake_waiting_interactive():
+    gate = PriorityGate(HOST, capacity=2, reserved=0)
+    await gate.acquire(INTERACTIVE)
+    await gate.acquire(INTERACTIVE)
+    interactive = asyncio.ensure_future(gate.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+    background = asyncio.ensure_future(gate.acquire(BACKGROUND))
+    await asyncio.sleep(0)
+    gate.release(INTERACTIVE)
+    await interactive
+    assert not background.done()
+    background.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await background
+    assert gate.in_flight == {INTERACTIVE: 2, BACKGROUND: 0}
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    gate = PriorityGate(HOST, capacity=1, reserved=0)
+    await gate.acquire(INTERACTIVE)
+    waiter = asyncio.ensure_future(gate.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    gate.release(INTERACTIVE)
+    assert gate.in_flight == {INTERACTIVE: 0, BACKGROUND: 0}
+    assert (
+        REGISTRY.get_sample_value(
+            "cwaf_upstream_lane_queue_depth", {"host": HOST, "lane": INTERACTIVE}
+        )
+        == 0
+    )
+
+
+def test_get_priority_gate(monkeypatch):
+    monkeypatch.setattr(priority_lanes, "PRIORITY_GATES", {})
+    monkeypatch.delenv("PRIORITY_LANES_ENABLED", raising=False)
+    assert get_priority_gate(HOST) is None
+    monkeypatch.setenv("PRIORITY_LANES_ENABLED", "true")
+    monkeypatch.setenv("CONNECTION_POOL_MAX_KEEP_ALIVE", "8")
+    gate = get_priority_gate(HOST)
+    assert (gate.capacity, gate.background_limit) == (8, 6)
+    assert get_priority_gate(HOST) is gate
+    assert get_priority_gate("my.imperva.com:443") is not gate
+
+
+async def test_resized_gate_releases_waiting_requests(monkeypatch):
+    monkeypatch.setattr(priority_lanes, "PRIORITY_GATES", {})
+    monkeypatch.setenv("PRIORITY_LANES_ENABLED", "true")
+    monkeypatch.setenv("CONNECTION_POOL_MAX_KEEP_ALIVE", "1")
+    gate = get_priority_gate(HOST)
+    await gate.acquire(INTERACTIVE)
+    waiter = asyncio.ensure_future(gate.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    resize_priority_gate(HOST, 8)
+    await waiter
+    assert (gate.capacity, gate.background_limit) == (8, 6)
+
+
+@pytest.mark.parametrize(
+    "url, host",
+    [
+        ("https://api.imperva.com/sites-mgmt/v3/sites", "api.imperva.com:443"),
+        ("http://localhost:8080/sites", "localhost:8080"),
+    ],
+)
+def test_url_host(url, host):
+    assert url_host(url) == host
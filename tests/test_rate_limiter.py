@@ -0,0 +1,132 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+import cwaf_external_mcp.httpclient.rate_limiter as rate_limiter
+from cwaf_external_mcp.httpclient.rate_limiter import (
+    RateLimiters,
+    TokenBucket,
+    get_rate_limiters,
+)
+
+
+def _throttled(endpoint: str, source: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "cwaf_upstream_throttled_total", {"endpoint": endpoint, "source": source}
+        )
+        or 0
+    )
+
+
+async def test_acquire_within_burst_does_not_wait():
+    bucket = TokenBucket(rate=1, burst=3)
+    started_at = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire("rl_burst")
+    assert time.monotonic() - started_at < 0.1
+    assert _throttled("rl_burst", "local") == 0
+
+
+async def test_acquire_queues_beyond_burst():
+    bucket = TokenBucket(rate=20, burst=1)
+    started_at = time.monotonic()
+    await asyncio.gather(*(bucket.acquire("rl_queue") for _ in range(3)))
+    assert time.monotonic() - started_at >= 0.09
+    assert _throttled("rl_queue", "local") == 2
+    assert (
+        REGISTRY.get_sample_value(
+            "cwaf_upstream_rate_limit_wait_seconds_count", {"endpoint": "rl_queue"}
+        )
+        == 3
+    )
+
+
+async def test_cancelled_waiter_keeps_the_token():
+    bucket = TokenBucket(rate=10, burst=1)
+    await bucket.acquire("rl_cancel")
+    waiter = asyncio.ensure_future(bucket.acquire("rl_cancel"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0.1)
+    assert bucket._get_wait() == 0
+
+
+def test_throttled_response_pauses_for_retry_after():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.update("rl_429", 429, {"Retry-After": "2"})
+    assert bucket.tokens == 0
+    assert 2 < bucket._get_wait() <= 2.1
+    assert _throttled("rl_429", "upstream") == 1
+
+
+def test_rate_tuned_from_headers():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.update(
+        "rl_tune", 200, {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "10"}
+    )
+    assert bucket.tokens == 5
+    assert bucket.rate == 0.5
+
+
+def test_rate_tuned_from_epoch_reset():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.update(
+        "rl_epoch",
+        200,
+        {"RateLimit-Remaining": "4", "RateLimit-Reset": str(time.time() + 2)},
+    )
+    assert bucket.rate == pytest.approx(2, rel=0.1)
+
+
+def test_exhausted_window_pauses_until_reset():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.update("rl_reset", 200, {"RateLimit-Remaining": "0", "RateLimit-Reset": "3"})
+    assert 3 < bucket._get_wait() <= 3.2
+
+
+def test_responses_without_headers_keep_the_bucket():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.update("rl_none", 200, {"RateLimit-Remaining": "soon"})
+    bucket.update("rl_none", 200, {})
+    assert bucket.rate == 10
+    assert bucket.tokens == 10
+
+
+def test_buckets_per_credential(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_MAX_BUCKETS", 2)
+    limiters = RateLimiters(rate=1, burst=1)
+    first = limiters.get_bucket("a")
+    assert limiters.get_bucket("a") is first
+    assert limiters.get_bucket("b") is not first
+    limiters.get_bucket("c")
+    assert limiters.get_bucket("a") is not first
+
+
+def test_get_rate_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMITERS", None)
+    monkeypatch.delenv("RATE_LIMIT_ENABLED", raising=False)
+    assert get_rate_limiters() is None
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATE_LIMIT_REQUESTS_PER_SECOND", "4")
+    limiters = get_rate_limiters()
+    assert (limiters.rate, limiters.burst) == (4, 4)
+    assert get_rate_limiters() is limiters
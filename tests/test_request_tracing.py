@@ -0,0 +1,110 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from prometheus_client import REGISTRY
+
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.httpclient.request_tracing import (
+    RequestTimings,
+    build_trace_config,
+)
+
+
+@pytest.fixture
+async def server(aiohttp_server):
+    """Local upstream API."""
+
+    async def sites(request):
+        return web.json_response({"data": []})
+
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return web.json_response({"data": []})
+
+    app = web.Application()
+    app.router.add_get("/sites", sites)
+    app.router.add_get("/slow", slow)
+    return await aiohttp_server(app)
+
+
+@pytest.fixture
+async def session():
+    """Session timing the requests, with a single connection."""
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=1),
+        trace_configs=[build_trace_config()],
+    ) as session:
+        yield session
+
+
+def _count(endpoint: str, phase: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "cwaf_upstream_phase_duration_seconds_count",
+            {"endpoint": endpoint, "phase": phase},
+        )
+        or 0
+    )
+
+
+async def test_new_connection_timings(server, session):
+    timings = RequestTimings("trace_new")
+    async with session.get(server.make_url("/sites"), trace_request_ctx=timings):
+        pass
+    assert set(timings.phases) == {"connect", "ttfb"}
+    assert all(seconds >= 0 for seconds in timings.phases.values())
+    assert _count("trace_new", "connect") == 1
+    assert _count("trace_new", "ttfb") == 1
+
+
+async def test_reused_connection_has_no_connect(server, session):
+    async with session.get(server.make_url("/sites")) as response:
+        await response.read()
+    timings = RequestTimings("trace_reused")
+    async with session.get(server.make_url("/sites"), trace_request_ctx=timings):
+        pass
+    assert set(timings.phases) == {"ttfb"}
+
+
+async def test_pool_wait_timing(server, session):
+    first = asyncio.ensure_future(session.get(server.make_url("/slow")))
+    await asyncio.sleep(0.01)
+    timings = RequestTimings("trace_pool")
+    async with session.get(server.make_url("/sites"), trace_request_ctx=timings):
+        pass
+    (await first).release()
+    assert "pool_wait" in timings.phases
+    assert _count("trace_pool", "pool_wait") == 1
+
+
+async def test_requests_without_timings_are_ignored(server, session):
+    async with session.get(server.make_url("/sites")) as response:
+        assert response.status == 200
+
+
+def test_timings_take_the_current_trace_id():
+    token = context_manager.set_current_trace_id("abc")
+    try:
+        timings = RequestTimings("trace_id")
+    finally:
+        context_manager.reset_token(token)
+    timings.observe("body", 0.01)
+    assert timings.trace_id == "abc"
+    assert timings.phases == {"body": 0.01}
+    assert _count("trace_id", "body") == 1
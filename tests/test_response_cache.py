@@ -0,0 +1,107 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+import cwaf_external_mcp.httpclient.response_cache as response_cache
+from cwaf_external_mcp.httpclient.response_cache import (
+    ResponseCache,
+    build_cache_key,
+    get_ttl,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Control the monotonic clock used by the cache."""
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_fresh_entry(clock):
+    cache = ResponseCache(max_bytes=100, stale_ttl=10)
+    cache.put("k", "value", size=10, ttl=5)
+    entry = cache.get("k")
+    assert entry.value == "value"
+    assert entry.is_fresh(clock[0])
+
+
+def test_get_returns_stale_entry_within_stale_window(clock):
+    cache = ResponseCache(max_bytes=100, stale_ttl=10)
+    cache.put("k", "value", size=10, ttl=5)
+    clock[0] += 7
+    entry = cache.get("k")
+    assert entry.value == "value"
+    assert not entry.is_fresh(clock[0])
+
+
+def test_get_drops_entry_after_stale_window(clock):
+    cache = ResponseCache(max_bytes=100, stale_ttl=10)
+    cache.put("k", "value", size=10, ttl=5)
+    clock[0] += 16
+    assert cache.get("k") is None
+    assert cache.current_bytes == 0
+    assert len(cache) == 0
+
+
+def test_put_evicts_least_recently_used_by_size(clock):
+    cache = ResponseCache(max_bytes=30, stale_ttl=0)
+    cache.put("a", "a", size=10, ttl=5)
+    cache.put("b", "b", size=10, ttl=5)
+    cache.put("c", "c", size=10, ttl=5)
+    cache.get("a")
+    cache.put("d", "d", size=10, ttl=5)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.current_bytes == 30
+
+
+def test_put_skips_oversized_values_and_zero_ttl(clock):
+    cache = ResponseCache(max_bytes=30, stale_ttl=0)
+    cache.put("big", "big", size=31, ttl=5)
+    cache.put("no-ttl", "no-ttl", size=1, ttl=0)
+    assert len(cache) == 0
+
+
+def test_cache_key_normalizes_params_and_hashes_credentials():
+    headers = {"x-api-id": "1", "x-api-key": "secret"}
+    key1 = build_cache_key("url", {"b": 2, "a": "1"}, headers)
+    key2 = build_cache_key("url", {"a": 1, "b": "2"}, dict(reversed(headers.items())))
+    key3 = build_cache_key("url", {"a": 1, "b": 2}, {**headers, "x-api-key": "x"})
+    assert key1 == key2
+    assert key1 != key3
+    assert "secret" not in str(key1)
+
+
+def test_get_ttl_per_endpoint(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_TTL", "20")
+    monkeypatch.setenv("RESPONSE_CACHE_TTL_RULES", "5")
+    assert get_ttl("rules") == 5
+    assert get_ttl("sites") == 20
+
+
+def test_get_response_cache_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("RESPONSE_CACHE_ENABLED", raising=False)
+    assert response_cache.get_response_cache() is None
+
+
+def test_peek_returns_retained_entry_without_counting(clock):
+    cache = ResponseCache(max_bytes=100, stale_ttl=10, stale_if_error_ttl=60)
+    cache.put("k", "value", size=10, ttl=5)
+    clock[0] += 30
+    assert cache.get("k") is None
+    assert cache.peek("k").value == "value"
+    clock[0] += 60
+    assert cache.peek("k") is None
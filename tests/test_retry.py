@@ -0,0 +1,174 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import email.utils
+import time
+
+import aiohttp
+import pytest
+from unittest import mock
+
+import cwaf_external_mcp.httpclient.retry as retry
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.httpclient.retry import (
+    RetryBudget,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+def _policy(max_attempts=3, max_delay=5.0, tokens=10):
+    return RetryPolicy(
+        max_attempts=max_attempts,
+        base_delay=0,
+        max_delay=max_delay,
+        budget=RetryBudget(ratio=0.1, min_tokens=tokens, max_tokens=100),
+    )
+
+
+def _response(status, headers=None):
+    return mock.Mock(status=status, headers=headers or {})
+
+
+def _func(*results):
+    """Build an async function returning or raising the given results in order."""
+    calls = mock.AsyncMock(side_effect=list(results))
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_call_returns_successful_response_without_retry():
+    func = _func(_response(200))
+    response = await _policy().call(func)
+    assert response.status == 200
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_retries_retryable_statuses():
+    func = _func(_response(429), _response(502), _response(200))
+    response = await _policy().call(func)
+    assert response.status == 200
+    assert func.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_call_does_not_retry_client_errors():
+    func = _func(_response(400), _response(200))
+    response = await _policy().call(func)
+    assert response.status == 400
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_gives_up_after_max_attempts():
+    func = _func(_response(503), _response(503), _response(503), _response(200))
+    response = await _policy(max_attempts=3).call(func)
+    assert response.status == 503
+    assert func.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_call_gives_up_when_budget_is_exhausted():
+    func = _func(_response(503), _response(200))
+    response = await _policy(tokens=0).call(func)
+    assert response.status == 503
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_gives_up_when_retry_after_exceeds_max_delay():
+    func = _func(_response(429, {"Retry-After": "60"}), _response(200))
+    response = await _policy(max_delay=5).call(func)
+    assert response.status == 429
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_gives_up_when_retry_after_exceeds_the_deadline():
+    func = _func(_response(429, {"Retry-After": "2"}), _response(200))
+    token = context_manager.set_deadline(time.monotonic() + 1)
+    try:
+        response = await _policy(max_delay=5).call(func)
+    finally:
+        context_manager.reset_token(token)
+    assert response.status == 429
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_retries_stale_connection_immediately_without_budget():
+    func = _func(aiohttp.ServerDisconnectedError(), _response(200))
+    response = await _policy(max_attempts=1, tokens=0).call(func)
+    assert response.status == 200
+    assert func.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error",
+    [
+        aiohttp.ClientOSError(),
+        aiohttp.ClientConnectorError(mock.Mock(), OSError(111, "refused")),
+    ],
+)
+async def test_call_does_not_retry_os_errors_without_budget(error):
+    func = _func(error, _response(200))
+    with pytest.raises(type(error)):
+        await _policy(max_attempts=3, tokens=0).call(func)
+    assert func.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_raises_connection_errors_after_retries():
+    error = aiohttp.ClientConnectionError("refused")
+    func = _func(error, error, error)
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await _policy(max_attempts=3).call(func)
+    assert func.await_count == 3
+
+
+def test_get_delay_uses_full_jitter(monkeypatch):
+    policy = RetryPolicy(
+        max_attempts=5,
+        base_delay=1.0,
+        max_delay=3.0,
+        budget=RetryBudget(ratio=0.1, min_tokens=1, max_tokens=1),
+    )
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+    assert policy.get_delay(1) == 1.0
+    assert policy.get_delay(2) == 2.0
+    assert policy.get_delay(3) == 3.0
+    assert policy.get_delay(1, retry_after=2.5) == 2.5
+
+
+def test_retry_budget_deposit_and_withdraw():
+    budget = RetryBudget(ratio=0.5, min_tokens=1, max_tokens=2)
+    assert budget.withdraw() is True
+    assert budget.withdraw() is False
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw() is True
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"Retry-After": "3"}) == 3.0
+    assert parse_retry_after({}) is None
+    assert parse_retry_after(None) is None
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    http_date = email.utils.formatdate(time.time() + 10, usegmt=True)
+    assert 8 <= parse_retry_after({"Retry-After": http_date}) <= 10
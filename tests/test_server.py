@@ -109,3 +109,24 @@ def test_main_with_http_transport(monkeypatch):
             assert call_kwargs["transport"] == "streamable-http"
             assert call_kwargs["host"] == "0.0.0.0"
             assert call_kwargs["port"] == 8050
+
+
+@pytest.mark.asyncio
+async def test_tool_output_schemas_describe_a_single_item_model():
+    """Each tool's output schema only describes the items it returns."""
+    import json
+
+    from fastmcp import Client
+
+    from cwaf_external_mcp.server import cwaf_mcp
+
+    async with Client(cwaf_mcp) as client:
+        schemas = {
+            tool.name: json.dumps(tool.outputSchema)
+            for tool in await client.list_tools()
+        }
+
+    assert "policySettings" not in schemas["get_domains_by_filters_tool"]
+    assert "rule_id" not in schemas["get_sites_details_of_a_given_account_tool"]
+    assert "deploymentKeys" not in schemas["get_rules_of_account_tool"]
+    assert "cname" not in schemas["get_polices_of_account_by_filter_tool"]
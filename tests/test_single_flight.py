@@ -0,0 +1,107 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from cwaf_external_mcp.httpclient.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def func():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    waiters = [asyncio.create_task(single_flight.do("k", func)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert calls == 1
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_do_not_share():
+    single_flight = SingleFlight()
+
+    async def func(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        single_flight.do("a", lambda: func("a")),
+        single_flight.do("b", lambda: func("b")),
+    )
+    assert results == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_exception_is_propagated_to_all_callers():
+    single_flight = SingleFlight()
+
+    async def func():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        single_flight.do("k", func),
+        single_flight.do("k", func),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def func():
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(single_flight.do("k", func))
+    second = asyncio.create_task(single_flight.do("k", func))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == "result"
+
+
+@pytest.mark.asyncio
+async def test_shared_call_is_cancelled_when_no_caller_waits():
+    single_flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def func():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(single_flight.do("k", func))
+    await asyncio.sleep(0.01)
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert len(single_flight) == 0
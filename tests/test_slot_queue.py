@@ -0,0 +1,59 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from cwaf_external_mcp.httpclient.slot_queue import SlotQueue
+
+
+async def test_waiters_are_woken_up_in_order():
+    queue = SlotQueue()
+    woken = []
+    slots = [2]
+
+    async def wait(name):
+        await queue.wait(lambda: None)
+        woken.append(name)
+
+    tasks = [asyncio.ensure_future(wait(name)) for name in "abc"]
+    await asyncio.sleep(0)
+    assert len(queue) == 3
+
+    def start():
+        slots[0] -= 1
+
+    queue.wake_up(lambda: slots[0] > 0, start)
+    await asyncio.sleep(0)
+    assert woken == ["a", "b"]
+    assert len(queue) == 1
+    tasks[2].cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await tasks[2]
+    assert len(queue) == 0
+
+
+async def test_slot_handed_over_to_a_cancelled_waiter_is_given_back():
+    changes = []
+    queue = SlotQueue(lambda: changes.append(len(queue)))
+    given_back = []
+    waiter = asyncio.ensure_future(queue.wait(lambda: given_back.append(True)))
+    await asyncio.sleep(0)
+    queue.wake_up(lambda: True, lambda: None)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert given_back == [True]
+    assert changes == [1, 0]
@@ -0,0 +1,72 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from fastmcp import Client, FastMCP
+
+from cwaf_external_mcp.mcp_tools.tool_result import json_codec_tool
+from cwaf_external_mcp.model.api_error import ApiError
+from cwaf_external_mcp.model.cwaf_error_response import CWAFErrorResponse
+from cwaf_external_mcp.model.cwaf_response import CWAFResponse, Meta
+from cwaf_external_mcp.model.site_domain import SiteDomain
+
+RESPONSE = CWAFResponse(
+    data=[
+        SiteDomain(
+            id=1,
+            name="www.example.com",
+            site_id=2,
+            status="VERIFIED",
+            creation_date="2026-01-01",
+            cname="x.impervadns.net",
+        )
+    ],
+    meta=Meta(size=1, page=0, totalElements=None, totalPages=None),
+)
+
+
+def _servers():
+    """Build the same tool registered with FastMCP and with the JSON codec."""
+    servers = []
+    for register in (lambda s: s.tool(), json_codec_tool):
+        server = FastMCP(name="test")
+
+        @register(server)
+        async def get_domains(fail: bool = False) -> CWAFResponse | CWAFErrorResponse:
+            """Get the domains."""
+            if fail:
+                return CWAFErrorResponse(errors=[ApiError(status=500, title="x")])
+            return RESPONSE
+
+        servers.append(server)
+    return servers
+
+
+async def test_json_codec_tool_matches_fastmcp_serialization():
+    for arguments in ({}, {"fail": True}):
+        results = []
+        for server in _servers():
+            async with Client(server) as client:
+                results.append(await client.call_tool("get_domains", arguments))
+        default, codec = results
+        assert codec.content[0].text == default.content[0].text
+        assert codec.structured_content == default.structured_content
+        assert codec.data == default.data
+
+
+async def test_json_codec_tool_keeps_output_schema():
+    default, codec = _servers()
+    async with Client(default) as client:
+        expected = (await client.list_tools())[0].outputSchema
+    async with Client(codec) as client:
+        assert (await client.list_tools())[0].outputSchema == expected
@@ -0,0 +1,61 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+import pytest
+
+import cwaf_external_mcp.context.trace_middleware as trace_middleware
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.context.trace_middleware import TraceIdMiddleware, get_trace_id
+
+
+@pytest.fixture(autouse=True)
+def no_http_headers(monkeypatch):
+    """Run without an HTTP request unless a test sets headers."""
+    headers = {}
+    monkeypatch.setattr(trace_middleware, "get_http_headers", lambda: headers)
+    return headers
+
+
+def test_trace_id_from_header(no_http_headers):
+    no_http_headers["x-trace-id"] = "abc"
+    assert get_trace_id() == "abc"
+
+
+def test_trace_id_from_custom_header(no_http_headers, monkeypatch):
+    monkeypatch.setenv("MCP_TRACE_ID_HEADER_NAME", "X-Correlation-Id")
+    no_http_headers["x-correlation-id"] = "abc"
+    assert get_trace_id() == "abc"
+
+
+def test_trace_id_generated():
+    first, second = get_trace_id(), get_trace_id()
+    assert len(first) == 32
+    assert first != second
+
+
+async def test_middleware_sets_trace_id_during_call(no_http_headers):
+    no_http_headers["x-trace-id"] = "abc"
+    seen = []
+    before = context_manager.get_current_trace_id()
+
+    async def call_next(context):
+        seen.append(context_manager.get_current_trace_id())
+        return "result"
+
+    result = await TraceIdMiddleware().on_call_tool(mock.Mock(), call_next)
+    assert result == "result"
+    assert seen == ["abc"]
+    assert context_manager.get_current_trace_id() == before
@@ -0,0 +1,653 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import time
+
+import pytest
+from unittest import mock
+
+import cwaf_external_mcp.httpclient.response_cache as response_cache
+import cwaf_external_mcp.httpclient.upstream_client as upstream_client
+from cwaf_external_mcp.context.context_manager import context_manager
+from cwaf_external_mcp.httpclient.circuit_breaker import CircuitOpenError
+
+SITES_URL = "https://api.imperva.com/sites-mgmt/v3/sites/extended"
+
+
+@pytest.fixture(autouse=True)
+def reset_cache(monkeypatch):
+    """Enable a fresh response cache for each test."""
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "true")
+    monkeypatch.setenv("RESPONSE_CACHE_TTL", "60")
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE", None)
+    yield
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    """Mock the aiohttp session returning a new body on every call."""
+    client = mock.Mock()
+    calls = []
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        calls.append(params)
+        response = mock.Mock(content_length=None, headers={})
+        response.status = 200
+        body = {"data": [len(calls)], "meta": {}}
+        response.read = mock.AsyncMock(return_value=json.dumps(body).encode())
+        return response
+
+    client.get = get
+    client.calls = calls
+    monkeypatch.setattr(upstream_client, "get_async_client", lambda: client)
+    return client
+
+
+def test_endpoint_label():
+    assert upstream_client.endpoint_label(SITES_URL) == "sites"
+    assert (
+        upstream_client.endpoint_label("https://my.imperva.com/api/prov/v3/rules")
+        == "rules"
+    )
+    assert upstream_client.endpoint_label("https://example.com/other") == "other"
+
+
+@pytest.mark.asyncio
+async def test_get_json_serves_repeated_requests_from_cache(mock_client):
+    first = await upstream_client.get_json(SITES_URL, {"caid": 1}, {"x-api-id": "1"})
+    second = await upstream_client.get_json(SITES_URL, {"caid": 1}, {"x-api-id": "1"})
+    assert first.body == second.body == {"data": [1], "meta": {}}
+    assert len(mock_client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_json_does_not_share_entries_between_credentials(mock_client):
+    await upstream_client.get_json(SITES_URL, {}, {"x-api-id": "1"})
+    other = await upstream_client.get_json(SITES_URL, {}, {"x-api-id": "2"})
+    assert other.body["data"] == [2]
+    assert len(mock_client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_json_does_not_cache_errors(mock_client, monkeypatch):
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        mock_client.calls.append(params)
+        response = mock.Mock(content_length=None, headers={})
+        response.status = 500
+        response.read = mock.AsyncMock(return_value=b'{"errors": []}')
+        return response
+
+    mock_client.get = get
+    await upstream_client.get_json(SITES_URL, {}, {})
+    await upstream_client.get_json(SITES_URL, {}, {})
+    assert len(mock_client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_json_serves_stale_and_refreshes_in_background(
+    mock_client, monkeypatch
+):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(upstream_client.time, "monotonic", lambda: now[0])
+    monkeypatch.setenv("RESPONSE_CACHE_STALE_TTL", "30")
+
+    await upstream_client.get_json(SITES_URL, {}, {})
+    now[0] += 70
+    stale = await upstream_client.get_json(SITES_URL, {}, {})
+    assert stale.body["data"] == [1]
+
+    await asyncio.gather(*upstream_client.REFRESH_TASKS.values())
+    refreshed = await upstream_client.get_json(SITES_URL, {}, {})
+    assert refreshed.body["data"] == [2]
+    assert len(mock_client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_json_coalesces_concurrent_identical_requests(
+    mock_client, monkeypatch
+):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    responses = await asyncio.gather(
+        *(upstream_client.get_json(SITES_URL, {"caid": 1}, {}) for _ in range(5))
+    )
+    assert len(mock_client.calls) == 1
+    assert all(r.body is responses[0].body for r in responses)
+    assert [r.source for r in responses] == ["upstream"] + ["coalesced"] * 4
+
+    await upstream_client.get_json(SITES_URL, {"caid": 1}, {})
+    assert len(mock_client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_json_retries_throttled_requests(mock_client, monkeypatch):
+    import cwaf_external_mcp.httpclient.retry as retry
+
+    monkeypatch.setenv("RETRY_BASE_DELAY", "0")
+    monkeypatch.setattr(retry, "RETRY_POLICY", None)
+    statuses = [429, 200]
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        mock_client.calls.append(params)
+        response = mock.Mock(content_length=None, headers={})
+        response.status = statuses.pop(0)
+        response.headers = {"Retry-After": "0"}
+        response.read = mock.AsyncMock(return_value=b'{"data": [], "meta": {}}')
+        return response
+
+    mock_client.get = get
+    response = await upstream_client.get_json(SITES_URL, {}, {})
+    assert response.status == 200
+    assert len(mock_client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_json_serves_stale_response_when_upstream_fails(
+    mock_client, monkeypatch
+):
+    import cwaf_external_mcp.httpclient.retry as retry
+
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setenv("RESPONSE_CACHE_STALE_TTL", "0")
+    monkeypatch.setenv("RESPONSE_CACHE_STALE_IF_ERROR_TTL", "600")
+    monkeypatch.setenv("RETRY_MAX_ATTEMPTS", "1")
+    monkeypatch.setattr(retry, "RETRY_POLICY", None)
+
+    fresh = await upstream_client.get_json(SITES_URL, {}, {})
+    assert fresh.stale is False
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        raise CircuitOpenError("sites")
+
+    mock_client.get = get
+    now[0] += 120
+    stale = await upstream_client.get_json(SITES_URL, {}, {})
+    assert stale.stale is True
+    assert stale.body == fresh.body
+
+    now[0] += 600
+    with pytest.raises(CircuitOpenError):
+        await upstream_client.get_json(SITES_URL, {}, {})
+
+
+def _streamed_response(raw, content_length=None, chunk_size=8):
+    response = mock.Mock(content_length=content_length, status=200, headers={})
+
+    async def iter_chunked(size):
+        for i in range(0, len(raw), chunk_size):
+            yield raw[i : i + chunk_size]
+
+    response.content.iter_chunked = iter_chunked
+    return response
+
+
+@pytest.mark.asyncio
+async def test_get_json_streams_and_maps_items(mock_client, monkeypatch):
+    monkeypatch.setenv("STREAMING_DECODE_ENABLED", "true")
+    raw = json.dumps({"data": [{"id": 1}, {"id": 2}], "meta": {}}).encode()
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        return _streamed_response(raw)
+
+    mock_client.get = get
+    response = await upstream_client.get_json(SITES_URL, {}, {}, lambda r: r["id"])
+    assert response.body == {"data": [1, 2], "meta": {}}
+    assert response.size == len(raw)
+
+
+@pytest.mark.asyncio
+async def test_get_json_maps_items_without_streaming(mock_client):
+    response = await upstream_client.get_json(SITES_URL, {}, {}, lambda r: r * 10)
+    assert response.body["data"] == [10]
+
+
+@pytest.mark.asyncio
+async def test_get_json_rejects_too_large_responses(mock_client, monkeypatch):
+    monkeypatch.setenv("STREAMING_DECODE_ENABLED", "true")
+    monkeypatch.setenv("MAX_RESPONSE_BYTES", "16")
+    raw = json.dumps({"data": [{"id": 1}, {"id": 2}], "meta": {}}).encode()
+    responses = [_streamed_response(raw, content_length=len(raw))]
+    responses.append(_streamed_response(raw))
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        return responses.pop(0)
+
+    mock_client.get = get
+    for _ in range(2):
+        with pytest.raises(upstream_client.ResponseTooLargeError):
+            await upstream_client.get_json(SITES_URL, {"page": len(responses)}, {})
+
+
+@pytest.fixture
+def etag_client(mock_client, monkeypatch):
+    """Mock upstream answering 304 when the If-None-Match matches its ETag."""
+    clock = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(upstream_client.time, "monotonic", lambda: clock[0])
+    mock_client.clock = clock
+    mock_client.etag = '"v1"'
+    mock_client.sent_headers = []
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        mock_client.sent_headers.append(headers)
+        response = mock.Mock(content_length=None)
+        response.headers = {"ETag": mock_client.etag}
+        if headers.get("If-None-Match") == mock_client.etag:
+            response.status = 304
+            response.read = mock.AsyncMock(return_value=b"")
+        else:
+            response.status = 200
+            body = {"data": [{"id": 1}], "meta": {}}
+            response.read = mock.AsyncMock(return_value=json.dumps(body).encode())
+        return response
+
+    mock_client.get = get
+    return mock_client
+
+
+@pytest.mark.asyncio
+async def test_get_json_revalidates_and_reuses_mapped_entities(etag_client):
+    mapped = []
+
+    def mapper(item):
+        mapped.append(item)
+        return item["id"]
+
+    first = await upstream_client.get_json(SITES_URL, {}, {"x-api-id": "1"}, mapper)
+    etag_client.clock[0] += 200
+    second = await upstream_client.get_json(SITES_URL, {}, {"x-api-id": "1"}, mapper)
+
+    assert etag_client.sent_headers[1] == {"x-api-id": "1", "If-None-Match": '"v1"'}
+    assert second is first
+    assert second.body["data"] == [1]
+    assert len(mapped) == 1
+    assert (
+        response_cache.CACHE_REVALIDATIONS.labels(
+            endpoint="sites", result="not_modified"
+        )._value.get()
+        >= 1
+    )
+
+    etag_client.clock[0] += 10
+    third = await upstream_client.get_json(SITES_URL, {}, {"x-api-id": "1"}, mapper)
+    assert third.body is first.body
+    assert third.source == "cache"
+    assert len(etag_client.sent_headers) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_json_revalidation_downloads_modified_responses(etag_client):
+    first = await upstream_client.get_json(SITES_URL, {}, {})
+    etag_client.etag = '"v2"'
+    etag_client.clock[0] += 200
+    second = await upstream_client.get_json(SITES_URL, {}, {})
+    assert etag_client.sent_headers[1] == {"If-None-Match": '"v1"'}
+    assert second is not first
+    assert second.headers["ETag"] == '"v2"'
+
+
+@pytest.mark.asyncio
+async def test_get_json_revalidation_can_be_disabled(etag_client, monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_REVALIDATION_ENABLED", "false")
+    await upstream_client.get_json(SITES_URL, {}, {})
+    etag_client.clock[0] += 200
+    await upstream_client.get_json(SITES_URL, {}, {})
+    assert etag_client.sent_headers == [{}, {}]
+
+
+def test_conditional_headers():
+    response = upstream_client.UpstreamResponse(
+        status=200,
+        body=None,
+        headers={"ETag": '"a"', "Last-Modified": "Wed, 21 Oct 2026 07:28:00 GMT"},
+    )
+    assert upstream_client._conditional_headers(response) == {
+        "If-None-Match": '"a"',
+        "If-Modified-Since": "Wed, 21 Oct 2026 07:28:00 GMT",
+    }
+    assert (
+        upstream_client._conditional_headers(
+            upstream_client.UpstreamResponse(status=200, body=None)
+        )
+        == {}
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_json_raises_deadline_exceeded_on_slow_upstream(mock_client):
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        await asyncio.sleep(1)
+
+    mock_client.get = get
+    token = context_manager.set_deadline(time.monotonic() + 0.05)
+    try:
+        with pytest.raises(upstream_client.DeadlineExceededError):
+            await upstream_client.get_json(SITES_URL, {}, {})
+        with pytest.raises(upstream_client.DeadlineExceededError):
+            await upstream_client.get_json(SITES_URL, {"page": 1}, {})
+    finally:
+        context_manager.reset_token(token)
+
+
+@pytest.mark.asyncio
+async def test_coalesced_callers_wait_until_their_own_deadline(mock_client):
+    release = asyncio.Event()
+
+    async def get(url, headers=None, params=None, trace_request_ctx=None):
+        await release.wait()
+        response = mock.Mock(content_length=None, headers={}, status=200)
+        response.read = mock.AsyncMock(return_value=b'{"data": [1], "meta": {}}')
+        return response
+
+    mock_client.get = get
+
+    async def call(budget):
+        token = context_manager.set_deadline(
+            None if budget is None else time.monotonic() + budget
+        )
+        try:
+            return await upstream_client.get_json(SITES_URL, {}, {})
+        finally:
+            context_manager.reset_token(token)
+
+    leader = asyncio.create_task(call(0.05))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(call(None))
+    short_joiner = asyncio.create_task(call(0.01))
+    start = time.monotonic()
+    with pytest.raises(upstream_client.DeadlineExceededError):
+        await short_joiner
+    assert time.monotonic() - start < 0.04
+    with pytest.raises(upstream_client.DeadlineExceededError):
+        await leader
+    release.set()
+    assert (await joiner).body["data"] == [1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("single_flight", ["true", "false"])
+async def test_get_json_keeps_the_caller_deadline(
+    mock_client, monkeypatch, single_flight
+):
+    monkeypatch.setenv("SINGLE_FLIGHT_ENABLED", single_flight)
+    remaining = []
+    get = mock_client.get
+
+    async def get_with_deadline(url, headers=None, params=None, trace_request_ctx=None):
+        remaining.append(context_manager.get_remaining_time())
+        return await get(url, headers=headers, params=params)
+
+    mock_client.get = get_with_deadline
+    token = context_manager.set_deadline(time.monotonic() + 5)
+    try:
+        await upstream_client.get_json(SITES_URL, {}, {})
+        assert context_manager.get_remaining_time() is not None
+    finally:
+        context_manager.reset_token(token)
+    assert (remaining[0] is not None) == (single_flight == "false")
+
+
+@pytest.mark.asyncio
+async def test_get_json_within_deadline(mock_client):
+    token = context_manager.set_deadline(time.monotonic() + 5)
+    try:
+        response = await upstream_client.get_json(SITES_URL, {}, {})
+    finally:
+        context_manager.reset_token(token)
+    assert response.body["data"] == [1]
+
+
+@pytest.mark.asyncio
+async def test_get_json_hedges_slow_requests(mock_client, monkeypatch):
+    import cwaf_external_mcp.httpclient.hedging as hedging
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("HEDGING_ENABLED", "true")
+    monkeypatch.setenv("HEDGING_MIN_DELAY", "0.01")
+    monkeypatch.setattr(hedging, "HEDGING_POLICIES", {})
+    policy = hedging.get_hedging_policy("sites")
+    policy.budget.tokens = 10
+    policy.latencies.extend([0.01] * 20)
+    get = mock_client.get
+
+    async def slow_first_get(url, headers=None, params=None, trace_request_ctx=None):
+        if not mock_client.calls:
+            mock_client.calls.append(params)
+            await asyncio.sleep(1)
+        return await get(url, headers=headers, params=params)
+
+    mock_client.get = slow_first_get
+    response = await upstream_client.get_json(SITES_URL, {}, {})
+    assert response.body["data"] == [2]
+    assert len(mock_client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_json_does_not_hedge_throttle_waits(mock_client, monkeypatch):
+    import cwaf_external_mcp.httpclient.hedging as hedging
+    import cwaf_external_mcp.httpclient.rate_limiter as rate_limiter
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("HEDGING_ENABLED", "true")
+    monkeypatch.setenv("HEDGING_MIN_DELAY", "0.01")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATE_LIMIT_REQUESTS_PER_SECOND", "10")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "1")
+    monkeypatch.setattr(hedging, "HEDGING_POLICIES", {})
+    monkeypatch.setattr(rate_limiter, "RATE_LIMITERS", None)
+    policy = hedging.get_hedging_policy("sites")
+    policy.budget.tokens = 10
+    policy.latencies.extend([0.001] * 20)
+
+    await asyncio.gather(
+        upstream_client.get_json(SITES_URL, {"page": 1}, {}),
+        upstream_client.get_json(SITES_URL, {"page": 2}, {}),
+    )
+    assert len(mock_client.calls) == 2
+    assert max(policy.latencies) < 0.05
+
+
+async def test_get_json_rate_limits_per_credential(mock_client, monkeypatch):
+    import cwaf_external_mcp.httpclient.rate_limiter as rate_limiter
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATE_LIMIT_REQUESTS_PER_SECOND", "20")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "1")
+    monkeypatch.setattr(rate_limiter, "RATE_LIMITERS", None)
+
+    async def call(api_id, page):
+        token = context_manager.set_headers({"x-api-id": api_id})
+        try:
+            return await upstream_client.get_json(
+                SITES_URL, {"page": page}, {"x-api-id": api_id}
+            )
+        finally:
+            context_manager.reset_token(token)
+
+    started_at = time.monotonic()
+    await asyncio.gather(call("1", 1), call("2", 1))
+    assert time.monotonic() - started_at < 0.04
+    await asyncio.gather(call("1", 2), call("1", 3))
+    assert time.monotonic() - started_at >= 0.09
+    assert len(mock_client.calls) == 4
+
+
+async def test_get_json_throttle_waits_do_not_trip_the_breaker(
+    mock_client, monkeypatch
+):
+    import cwaf_external_mcp.httpclient.circuit_breaker as circuit_breaker
+    import cwaf_external_mcp.httpclient.rate_limiter as rate_limiter
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATE_LIMIT_REQUESTS_PER_SECOND", "20")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "1")
+    monkeypatch.setenv("CIRCUIT_BREAKER_ENABLED", "true")
+    monkeypatch.setenv("CIRCUIT_BREAKER_MIN_CALLS", "2")
+    monkeypatch.setenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "0.03")
+    monkeypatch.setattr(rate_limiter, "RATE_LIMITERS", None)
+    monkeypatch.setattr(circuit_breaker, "BREAKERS", {})
+
+    await asyncio.gather(
+        *(upstream_client.get_json(SITES_URL, {"page": page}, {}) for page in range(4))
+    )
+    assert len(mock_client.calls) == 4
+    assert circuit_breaker.get_circuit_breaker("sites").state == circuit_breaker.CLOSED
+
+
+async def test_get_json_rate_limit_wait_is_bounded_by_deadline(
+    mock_client, monkeypatch
+):
+    import cwaf_external_mcp.httpclient.rate_limiter as rate_limiter
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("RATE_LIMIT_REQUESTS_PER_SECOND", "0.1")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "1")
+    monkeypatch.setattr(rate_limiter, "RATE_LIMITERS", None)
+    await upstream_client.get_json(SITES_URL, {}, {})
+    token = context_manager.set_deadline(time.monotonic() + 0.05)
+    try:
+        with pytest.raises(upstream_client.DeadlineExceededError):
+            await upstream_client.get_json(SITES_URL, {"page": 2}, {})
+    finally:
+        context_manager.reset_token(token)
+    assert len(mock_client.calls) == 1
+
+
+async def test_get_json_refreshes_in_background_lane(mock_client, monkeypatch):
+    import cwaf_external_mcp.httpclient.priority_lanes as priority_lanes
+
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(upstream_client.time, "monotonic", lambda: now[0])
+    monkeypatch.setenv("RESPONSE_CACHE_STALE_TTL", "30")
+    monkeypatch.setenv("PRIORITY_LANES_ENABLED", "true")
+    monkeypatch.setattr(priority_lanes, "PRIORITY_GATES", {})
+    gate = priority_lanes.get_priority_gate(priority_lanes.url_host(SITES_URL))
+    lanes = []
+    acquire = gate.acquire
+
+    async def record_acquire(lane):
+        lanes.append(lane)
+        await acquire(lane)
+
+    monkeypatch.setattr(gate, "acquire", record_acquire)
+    await upstream_client.get_json(SITES_URL, {}, {})
+    now[0] += 70
+    token = context_manager.set_deadline(now[0] + 1)
+    try:
+        await upstream_client.get_json(SITES_URL, {}, {})
+    finally:
+        context_manager.reset_token(token)
+    now[0] += 5
+    await asyncio.gather(*upstream_client.REFRESH_TASKS.values())
+    assert lanes == ["interactive", "background"]
+    assert len(mock_client.calls) == 2
+    assert gate.in_flight == {"interactive": 0, "background": 0}
+
+
+async def test_get_json_rejects_calls_beyond_the_bulkhead(mock_client, monkeypatch):
+    import cwaf_external_mcp.httpclient.bulkhead as bulkhead
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("BULKHEAD_ENABLED", "true")
+    monkeypatch.setenv("BULKHEAD_MAX_CONCURRENT", "1")
+    monkeypatch.setenv("BULKHEAD_MAX_QUEUE", "1")
+    monkeypatch.setattr(bulkhead, "BULKHEADS", {})
+    get = mock_client.get
+
+    async def slow_get(url, headers=None, params=None, trace_request_ctx=None):
+        await asyncio.sleep(0.05)
+        return await get(url, headers=headers, params=params)
+
+    mock_client.get = slow_get
+    results = await asyncio.gather(
+        *(upstream_client.get_json(SITES_URL, {"page": page}, {}) for page in range(3)),
+        return_exceptions=True,
+    )
+    assert [r.status for r in results[:2]] == [200, 200]
+    assert isinstance(results[2], bulkhead.BulkheadFullError)
+    assert len(mock_client.calls) == 2
+    assert bulkhead.BULKHEADS["sites"].in_flight == 0
+
+
+async def test_bulkhead_slot_is_not_held_between_retries(mock_client, monkeypatch):
+    import cwaf_external_mcp.httpclient.bulkhead as bulkhead
+    import cwaf_external_mcp.httpclient.retry as retry
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("BULKHEAD_ENABLED", "true")
+    monkeypatch.setenv("BULKHEAD_MAX_CONCURRENT", "1")
+    monkeypatch.setenv("BULKHEAD_MAX_QUEUE", "0")
+    monkeypatch.setattr(bulkhead, "BULKHEADS", {})
+    policy = retry.RetryPolicy(
+        max_attempts=2,
+        base_delay=0,
+        max_delay=1,
+        budget=retry.RetryBudget(ratio=0, min_tokens=10, max_tokens=10),
+    )
+    monkeypatch.setattr(policy, "get_delay", lambda attempt, retry_after: 0.05)
+    monkeypatch.setattr(retry, "RETRY_POLICY", policy)
+    get = mock_client.get
+
+    async def flaky_get(url, headers=None, params=None, trace_request_ctx=None):
+        response = await get(url, headers=headers, params=params)
+        if len(mock_client.calls) == 1:
+            response.status = 503
+        return response
+
+    mock_client.get = flaky_get
+    retried = asyncio.ensure_future(upstream_client.get_json(SITES_URL, {}, {}))
+    await asyncio.sleep(0.01)
+    other = await upstream_client.get_json(SITES_URL, {"page": 1}, {})
+    assert other.status == 200
+    assert (await retried).status == 200
+    assert bulkhead.BULKHEADS["sites"].in_flight == 0
+
+
+def _double(item):
+    return item * 2
+
+
+@pytest.mark.parametrize("threshold, offloaded", [("1", 1), ("1000000", 0)])
+async def test_get_json_offloads_large_responses(
+    mock_client, monkeypatch, threshold, offloaded
+):
+    import cwaf_external_mcp.httpclient.offload as offload
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("OFFLOAD_ENABLED", "true")
+    monkeypatch.setenv("OFFLOAD_THRESHOLD_BYTES", threshold)
+    monkeypatch.setattr(offload, "OFFLOADER", None)
+    runs = []
+    run = offload.Offloader.run
+
+    async def record_run(self, endpoint, func, *args):
+        runs.append(endpoint)
+        return await run(self, endpoint, func, *args)
+
+    monkeypatch.setattr(offload.Offloader, "run", record_run)
+    try:
+        response = await upstream_client.get_json(
+            SITES_URL, {}, {}, item_mapper=_double
+        )
+    finally:
+        offload.shutdown_offloader()
+    assert response.body["data"] == [2]
+    assert len(runs) == offloaded
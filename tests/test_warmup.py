@@ -0,0 +1,106 @@
+# Copyright Thales 2026
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from unittest import mock
+
+import pytest
+from aiohttp import web
+from fastmcp import Client
+
+import cwaf_external_mcp.httpclient.aiohttp_client as aiohttp_client
+import cwaf_external_mcp.httpclient.warmup as warmup
+from cwaf_external_mcp.httpclient.warmup import get_origins, warm_up_connections
+
+
+@pytest.fixture
+async def server(aiohttp_server):
+    """Local upstream API answering every request with 404."""
+    return await aiohttp_server(web.Application())
+
+
+@pytest.fixture
+async def session(monkeypatch):
+    """Fresh shared aiohttp session."""
+    monkeypatch.setattr(aiohttp_client, "SESSION", None)
+    yield
+    if aiohttp_client.SESSION is not None:
+        await aiohttp_client.SESSION.close()
+    aiohttp_client.SESSION = None
+
+
+def test_get_origins_deduplicates_hosts():
+    assert get_origins(
+        [
+            "https://api.imperva.com/sites-mgmt",
+            "https://api.imperva.com/policies",
+            "https://my.imperva.com/api/prov",
+            "http://localhost:8080/x",
+        ]
+    ) == ["http://localhost:8080", "https://api.imperva.com", "https://my.imperva.com"]
+
+
+async def test_warm_up_opens_keep_alive_connections(server, session):
+    opened = await warm_up_connections(
+        [str(server.make_url("/sites-mgmt"))], connections_per_host=3, timeout=5
+    )
+    assert opened == 3
+    connector = aiohttp_client.get_async_client().connector
+    assert sum(len(conns) for conns in connector._conns.values()) == 3
+    host = f"{server.host}:{server.port}"
+    assert warmup.WARMUP_CONNECTIONS.labels(host=host)._value.get() == 3
+
+
+async def test_warm_up_failures_do_not_raise(session):
+    opened = await warm_up_connections(
+        ["http://127.0.0.1:1/api"], connections_per_host=2, timeout=5
+    )
+    assert opened == 0
+
+
+async def test_warm_up_timeout_counts_the_opened_connections(
+    server, session, aiohttp_server
+):
+    async def slow(request):
+        await asyncio.sleep(5)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_route("HEAD", "/", slow)
+    slow_server = await aiohttp_server(app)
+    opened = await warm_up_connections(
+        [str(server.make_url("/sites-mgmt")), str(slow_server.make_url("/api"))],
+        connections_per_host=2,
+        timeout=0.5,
+    )
+    assert opened == 2
+    slow_host = f"{slow_server.host}:{slow_server.port}"
+    assert warmup.WARMUP_CONNECTIONS.labels(host=slow_host)._value.get() == 0
+
+
+async def test_lifespan_warms_up_and_reports_ready(monkeypatch):
+    import cwaf_external_mcp.server as server_module
+
+    monkeypatch.setenv("CONNECTION_WARMUP_ENABLED", "true")
+    monkeypatch.setenv("CONNECTION_WARMUP_PER_HOST", "4")
+    warm_up = mock.AsyncMock(return_value=8)
+    monkeypatch.setattr(server_module, "warm_up_connections", warm_up)
+
+    async with Client(server_module.cwaf_mcp):
+        pass
+
+    urls = warm_up.call_args.args[0]
+    assert server_module.BASE_RULES_URL in urls
+    assert warm_up.call_args.kwargs["connections_per_host"] == 4
+    assert warmup.TIME_TO_FIRST_READY._value.get() > 0